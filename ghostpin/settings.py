@@ -92,7 +92,28 @@ DATABASES = {
         'PORT': '5432',
     }
 }
- 
+
+# ── Cache ─────────────────────────────────────────────────────
+# Backs the notification rate limiter (places/rate_limit.py).
+# Single node, single process — per-process memory is enough:
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ghostpin-default',
+    }
+}
+
+# Several workers or nodes — share the buckets through Redis (or
+# Memcached, PyMemcacheCache). The limiter relies on the backend's
+# atomic add(); DatabaseCache and FileBasedCache don't guarantee one.
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#         'LOCATION': 'redis://127.0.0.1:6379/1',
+#         'KEY_PREFIX': 'ghostpin',
+#     }
+# }
+
 # ── DRF ───────────────────────────────────────────────────────
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -175,6 +196,12 @@ STATIC_ROOT = BASE_DIR / 'staticfiles' # Directory where static files will be co
 MEDIA_URL = '/media/'   # URL to access media files
 MEDIA_ROOT = BASE_DIR / 'media' # Directory where media files are stored
 
+# Uploads are stored once per distinct content, under their SHA-256 (places/storage.py)
+STORAGES = {
+    'default':     {'BACKEND': 'places.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 # During development — emails print in your terminal:
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.utils import timezone
+from .caching import bump_model_version
+from .related import refresh_related_places_later
 from .models import (
     UserProfile,
     ExpertArea,
@@ -83,7 +86,7 @@ class PlaceAdmin(admin.ModelAdmin):
         "visit_count",
         "created_at",
     ]
-    list_filter = ["status", "difficulty", "created_at", "category"]
+    list_filter = ["status", "difficulty", "district", "created_at", "category"]
     search_fields = ["name", "description", "legends_stories"]
     actions = ["approve_places", "reject_places"]
     inlines = [PlaceImageInline]
@@ -93,7 +96,7 @@ class PlaceAdmin(admin.ModelAdmin):
     filter_horizontal = ("category",)
     fieldsets = (
         ("Basic Information", {"fields": ("name", "description", "legends_stories", "image")}),
-        ("Location", {"fields": ("latitude", "longitude")}),
+        ("Location", {"fields": ("latitude", "longitude", "district")}),
         ("Categorization", {"fields": ("category", "difficulty")}),
         ("Additional Info", {"fields": ("accessibility_info", "best_time_to_visit", "safety_rating")}),
         ("Status & Metadata", {
@@ -109,12 +112,18 @@ class PlaceAdmin(admin.ModelAdmin):
     get_categories.short_description = "Categories"
 
     def approve_places(self, request, queryset):
-        queryset.update(status="approved")
+        pks = list(queryset.values_list("pk", flat=True))
+        queryset.update(status="approved", updated_at=timezone.now())
+        bump_model_version(Place)  # update() skips post_save
+        refresh_related_places_later(pks)
         self.message_user(request, f"{queryset.count()} places approved.")
     approve_places.short_description = "Approve selected places"
 
     def reject_places(self, request, queryset):
-        queryset.update(status="rejected")
+        pks = list(queryset.values_list("pk", flat=True))
+        queryset.update(status="rejected", updated_at=timezone.now())
+        bump_model_version(Place)  # update() skips post_save
+        refresh_related_places_later(pks)
         self.message_user(request, f"{queryset.count()} places rejected.")
     reject_places.short_description = "Reject selected places"
 
@@ -209,12 +218,12 @@ class NotificationAdmin(admin.ModelAdmin):
     actions = ["mark_as_read", "mark_as_unread"]
 
     def mark_as_read(self, request, queryset):
-        queryset.update(is_read=True)
+        queryset.update(is_read=True, updated_at=timezone.now())
         self.message_user(request, f"{queryset.count()} notifications marked as read.")
     mark_as_read.short_description = "Mark selected notifications as read"
 
     def mark_as_unread(self, request, queryset):
-        queryset.update(is_read=False)
+        queryset.update(is_read=False, updated_at=timezone.now())
         self.message_user(request, f"{queryset.count()} notifications marked as unread.")
     mark_as_unread.short_description = "Mark selected notifications as unread"
 
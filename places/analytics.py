@@ -0,0 +1,214 @@
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Category, CheckIn, DailyCategoryStats, DailyStats, Place
+
+ACTIVE_WINDOWS = (7, 30, 90)      # days — active_users_{n}d columns
+TREND_WINDOWS  = (7, 30, 90)      # days — dashboard range selector
+
+STATS_FIELDS = [
+    'new_users', 'new_places', 'new_checkins',
+    'active_users', 'active_users_7d', 'active_users_30d', 'active_users_90d',
+    'total_users', 'total_places', 'approved_places', 'pending_places', 'total_checkins',
+]
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _days(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def _per_day(queryset, field, *group_by, **aggregate):
+    """{(day, *group_by values): n} from one GROUP BY over TruncDate(field)."""
+    rows = (
+        queryset.order_by().annotate(day=TruncDate(field))
+        .values('day', *group_by).annotate(**aggregate)
+    )
+    key = next(iter(aggregate))
+    return {tuple(r[k] for k in ('day', *group_by)): r[key] for r in rows}
+
+
+# ─────────────────────────────────────────────────────────
+# Rollup
+# ─────────────────────────────────────────────────────────
+
+def default_rollup_start():
+    """The last rolled-up day (it may have been partial) or the first day with data."""
+    last = DailyStats.objects.order_by('-date').values_list('date', flat=True).first()
+    if last:
+        return last
+    firsts = [
+        User.objects.aggregate(d=Min('date_joined'))['d'],
+        Place.objects.aggregate(d=Min('created_at'))['d'],
+        CheckIn.objects.aggregate(d=Min('created_at'))['d'],
+    ]
+    firsts = [timezone.localdate(d) for d in firsts if d]
+    return min(firsts) if firsts else timezone.localdate()
+
+
+def rollup_daily_stats(start=None, end=None):
+    """
+    (Re)build DailyStats / DailyCategoryStats for start..end inclusive.
+
+    A fixed number of grouped queries regardless of how many days are
+    covered: per-day counts via GROUP BY TruncDate, running totals from a
+    baseline count before `start`, and the active-user windows from one
+    pass over distinct (day, user) check-in pairs. Returns days written.
+    """
+    start = start or default_rollup_start()
+    end   = end or timezone.localdate()
+    if start > end:
+        return 0
+    since = _day_start(start)
+    until = _day_start(end + timedelta(days=1))
+
+    users    = User.objects.filter(date_joined__lt=until)
+    places   = Place.objects.filter(created_at__lt=until)
+    checkins = CheckIn.objects.filter(created_at__lt=until)
+    through  = Place.category.through.objects.filter(place__created_at__lt=until)
+
+    new_users    = _per_day(users.filter(date_joined__gte=since), 'date_joined', n=Count('id'))
+    new_places   = _per_day(places.filter(created_at__gte=since), 'created_at', 'status', n=Count('id'))
+    new_checkins = _per_day(checkins.filter(created_at__gte=since), 'created_at', n=Count('id'))
+    new_in_cat   = _per_day(
+        through.filter(place__created_at__gte=since), 'place__created_at', 'category_id', n=Count('id')
+    )
+
+    total_users    = users.filter(date_joined__lt=since).count()
+    total_checkins = checkins.filter(created_at__lt=since).count()
+    by_status      = Counter(dict(
+        places.filter(created_at__lt=since).order_by()
+        .values_list('status').annotate(n=Count('id'))
+    ))
+    by_category    = Counter(dict(
+        through.filter(place__created_at__lt=since).order_by()
+        .values_list('category_id').annotate(n=Count('id'))
+    ))
+
+    # Distinct (day, user) pairs, reaching back far enough to fill the
+    # widest active-user window on the first day being rolled up.
+    lookback = _day_start(start - timedelta(days=max(ACTIVE_WINDOWS)))
+    daily_active = defaultdict(set)
+    for day, user_id in (
+        checkins.filter(created_at__gte=lookback).order_by()
+        .annotate(day=TruncDate('created_at')).values_list('day', 'user_id').distinct()
+    ):
+        daily_active[day].add(user_id)
+
+    # Each window is a multiset of users over its days; seeded with the n
+    # days before `start` so the first step can drop day start - n.
+    windows = {n: Counter() for n in ACTIVE_WINDOWS}
+    for day in _days(start - timedelta(days=max(ACTIVE_WINDOWS)), start - timedelta(days=1)):
+        for n, seen in windows.items():
+            if day >= start - timedelta(days=n):
+                seen.update(daily_active.get(day, ()))
+
+    stats_rows, category_rows = [], []
+    category_ids = list(Category.objects.values_list('id', flat=True))
+
+    for day in _days(start, end):
+        today_users = daily_active.get(day, set())
+        active = {}
+        for n, seen in windows.items():
+            seen.update(today_users)
+            dropped = day - timedelta(days=n)
+            seen.subtract(daily_active.get(dropped, ()))
+            seen += Counter()   # drop users whose count fell to zero
+            active[n] = len(seen)
+
+        places_today = {
+            status: new_places.get((day, status), 0) for status, _ in Place.STATUS_CHOICES
+        }
+        total_users    += new_users.get((day,), 0)
+        total_checkins += new_checkins.get((day,), 0)
+        by_status.update(places_today)
+
+        stats_rows.append(DailyStats(
+            date             = day,
+            new_users        = new_users.get((day,), 0),
+            new_places       = sum(places_today.values()),
+            new_checkins     = new_checkins.get((day,), 0),
+            active_users     = len(today_users),
+            active_users_7d  = active[7],
+            active_users_30d = active[30],
+            active_users_90d = active[90],
+            total_users      = total_users,
+            total_places     = sum(by_status.values()),
+            approved_places  = by_status['approved'],
+            pending_places   = by_status['pending'],
+            total_checkins   = total_checkins,
+        ))
+
+        for category_id in category_ids:
+            added = new_in_cat.get((day, category_id), 0)
+            by_category[category_id] += added
+            category_rows.append(DailyCategoryStats(
+                date=day, category_id=category_id,
+                new_places=added, place_count=by_category[category_id],
+            ))
+
+    DailyStats.objects.bulk_create(
+        stats_rows, batch_size=500,
+        update_conflicts=True, unique_fields=['date'], update_fields=STATS_FIELDS,
+    )
+    DailyCategoryStats.objects.bulk_create(
+        category_rows, batch_size=500,
+        update_conflicts=True, unique_fields=['date', 'category'],
+        update_fields=['new_places', 'place_count'],
+    )
+    return len(stats_rows)
+
+
+# ─────────────────────────────────────────────────────────
+# Dashboard
+# ─────────────────────────────────────────────────────────
+
+def dashboard_stats():
+    """
+    Everything the analytics page shows, read from the rollup tables only:
+    headline totals from the latest row, per-window sums and a daily series
+    long enough for the widest trend window.
+    """
+    widest = max(TREND_WINDOWS)
+    rows   = list(DailyStats.objects.order_by('-date')[:widest])[::-1]
+    latest = rows[-1] if rows else DailyStats(date=timezone.localdate())
+
+    trends = {}
+    for n in TREND_WINDOWS:
+        window = rows[-n:]
+        trends[n] = {
+            'new_users':    sum(r.new_users for r in window),
+            'new_places':   sum(r.new_places for r in window),
+            'new_checkins': sum(r.new_checkins for r in window),
+            'active_users': getattr(latest, f'active_users_{n}d'),
+        }
+
+    categories = list(
+        DailyCategoryStats.objects.filter(date=latest.date)
+        .select_related('category').order_by('category__name')
+    )
+
+    return {
+        'latest':  latest if rows else None,
+        'trends':  trends,
+        'series':  {
+            'labels':       [r.date.isoformat() for r in rows],
+            'new_users':    [r.new_users for r in rows],
+            'new_places':   [r.new_places for r in rows],
+            'new_checkins': [r.new_checkins for r in rows],
+            'active_users': [r.active_users for r in rows],
+        },
+        'category_labels': [c.category.name for c in categories],
+        'category_data':   [c.place_count for c in categories],
+    }
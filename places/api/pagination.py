@@ -0,0 +1,56 @@
+# places/api/pagination.py
+from rest_framework.pagination import (
+    BasePagination, CursorPagination, PageNumberPagination,
+)
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset pagination on (created_at, id) — no COUNT, no OFFSET."""
+    page_size = 20
+    ordering  = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        get_keyset_ordering = getattr(view, 'get_keyset_ordering', None)
+        if get_keyset_ordering is not None:
+            return get_keyset_ordering()
+        return self.ordering
+
+
+class KeysetOrPageNumberPagination(BasePagination):
+    """
+    Default for infinite-scroll endpoints.
+
+    Cursor pagination unless the client sends ?page= (old app builds) or the
+    view's current sort has no keyset ordering, in which case the previous
+    PageNumberPagination response shape is returned unchanged.
+    """
+
+    def __init__(self):
+        self.cursor_paginator = CreatedAtCursorPagination()
+        self.page_paginator   = PageNumberPagination()
+        self.active           = self.cursor_paginator
+
+    def _use_page_numbers(self, request, view):
+        if self.page_paginator.page_query_param in request.query_params:
+            return True
+        get_keyset_ordering = getattr(view, 'get_keyset_ordering', None)
+        return get_keyset_ordering is not None and get_keyset_ordering() is None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self._use_page_numbers(request, view):
+            self.active = self.page_paginator
+        else:
+            self.active = self.cursor_paginator
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.cursor_paginator.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.cursor_paginator.get_schema_operation_parameters(view)
+            + self.page_paginator.get_schema_operation_parameters(view)
+        )
@@ -13,6 +13,23 @@ from ..models import (
     Category,
     TourPackage, TourOffering, TourItineraryDay,
 )
+from ..image_variants import variant_urls
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Read-only: srcset-ready URLs of an ImageField's resized variants
+    ({'src', 'thumbnail', 'srcset', 'webp_srcset'}), or null until the
+    upload has been processed — clients then fall back to the *_url field.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        return variant_urls(value, request.build_absolute_uri if request else None)
 
 
 # ─────────────────────────────────────────────────────────
@@ -122,12 +139,13 @@ class CategorySerializer(serializers.ModelSerializer):
 # ─────────────────────────────────────────────────────────
 
 class PlaceImageSerializer(serializers.ModelSerializer):
-    image_url   = serializers.SerializerMethodField()
-    uploaded_by = UserBasicSerializer(read_only=True)
+    image_url      = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField(source='image')
+    uploaded_by    = UserBasicSerializer(read_only=True)
 
     class Meta:
         model  = PlaceImage
-        fields = ['id', 'image_url', 'uploaded_by', 'is_challenge_photo',
+        fields = ['id', 'image_url', 'image_variants', 'uploaded_by', 'is_challenge_photo',
                   'challenge_description', 'created_at']
 
     def get_image_url(self, obj):
@@ -147,15 +165,17 @@ class PlaceListSerializer(serializers.ModelSerializer):
     """Compact — used in lists / map pins."""
     category       = CategorySerializer(many=True, read_only=True)
     image_url      = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField(source='image')
     average_rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model  = Place
         fields = [
             'id', 'name', 'slug', 'description',
-            'latitude', 'longitude', 'image_url',
-            'category', 'difficulty', 'safety_rating',
-            'average_rating', 'visit_count', 'status',
+            'latitude', 'longitude', 'image_url', 'image_variants',
+            'category', 'difficulty', 'safety_rating', 'district',
+            'average_rating', 'rating_count', 'checkin_count', 'comment_count',
+            'visit_count', 'status',
         ]
 
     def get_image_url(self, obj):
@@ -206,7 +226,7 @@ class PlaceCreateSerializer(serializers.ModelSerializer):
         fields = [
             'name', 'description', 'legends_stories',
             'latitude', 'longitude', 'image',
-            'category', 'difficulty', 'safety_rating',
+            'category', 'difficulty', 'safety_rating', 'district',
             'accessibility_info', 'best_time_to_visit',
         ]
 
@@ -249,13 +269,14 @@ class CommentCreateSerializer(serializers.ModelSerializer):
 # ─────────────────────────────────────────────────────────
 
 class CheckInSerializer(serializers.ModelSerializer):
-    place     = PlaceListSerializer(read_only=True)
-    photo_url = serializers.SerializerMethodField()
+    place          = PlaceListSerializer(read_only=True)
+    photo_url      = serializers.SerializerMethodField()
+    photo_variants = ImageVariantsField(source='photo_proof')
 
     class Meta:
         model  = CheckIn
         fields = [
-            'id', 'place', 'photo_url', 'notes',
+            'id', 'place', 'photo_url', 'photo_variants', 'notes',
             'location_verified', 'points_awarded', 'created_at',
         ]
 
@@ -291,17 +312,18 @@ class TrailPlaceSerializer(serializers.ModelSerializer):
 
 
 class TrailListSerializer(serializers.ModelSerializer):
-    category    = CategorySerializer(many=True, read_only=True)
-    place_count = serializers.IntegerField(source='places.count', read_only=True)
-    cover_url   = serializers.SerializerMethodField()
-    created_by  = UserBasicSerializer(read_only=True)
+    category       = CategorySerializer(many=True, read_only=True)
+    place_count    = serializers.IntegerField(source='places.count', read_only=True)
+    cover_url      = serializers.SerializerMethodField()
+    cover_variants = ImageVariantsField(source='cover_image')
+    created_by     = UserBasicSerializer(read_only=True)
 
     class Meta:
         model  = Trail
         fields = [
             'id', 'name', 'description', 'difficulty',
             'distance', 'estimated_duration', 'category',
-            'cover_url', 'place_count', 'is_public',
+            'cover_url', 'cover_variants', 'place_count', 'is_public',
             'required_points', 'created_by', 'created_at',
         ]
 
@@ -333,14 +355,15 @@ class TrailDetailSerializer(TrailListSerializer):
 # ─────────────────────────────────────────────────────────
 
 class BadgeSerializer(serializers.ModelSerializer):
-    image_url = serializers.SerializerMethodField()
-    is_earned = serializers.SerializerMethodField()
-    earned_at = serializers.SerializerMethodField()
+    image_url      = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField(source='image')
+    is_earned      = serializers.SerializerMethodField()
+    earned_at      = serializers.SerializerMethodField()
 
     class Meta:
         model  = Badge
         fields = [
-            'id', 'name', 'description', 'icon', 'image_url',
+            'id', 'name', 'description', 'icon', 'image_url', 'image_variants',
             'category', 'points_required', 'is_earned', 'earned_at',
         ]
 
@@ -435,6 +458,7 @@ class TourItineraryDaySerializer(serializers.ModelSerializer):
 
 class TourListSerializer(serializers.ModelSerializer):
     image_url      = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField(source='image')
     offerings      = TourOfferingSerializer(many=True, read_only=True)
     trail_count    = serializers.IntegerField(source='trails.count', read_only=True)
     duration_display = serializers.CharField(read_only=True)
@@ -443,7 +467,7 @@ class TourListSerializer(serializers.ModelSerializer):
         model  = TourPackage
         fields = [
             'id', 'name', 'slug', 'description',
-            'image_url', 'duration_display', 'price_lkr',
+            'image_url', 'image_variants', 'duration_display', 'price_lkr',
             'event_date', 'event_time',
             'starting_location', 'ending_location',
             'trail_count', 'offerings',
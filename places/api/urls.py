@@ -16,6 +16,7 @@ from .views import (
     MarkAllNotificationsReadView, UnreadNotificationCountView,
     TourListView, TourDetailView,
     LeaderboardView, CategoryListView, HomeStatsView,
+    AutocompleteView, AlsoVisitedView, RecommendationsView,
 )
 
 urlpatterns = [
@@ -40,6 +41,8 @@ urlpatterns = [
     path('places/<slug:slug>/favorite/',    ToggleFavoriteView.as_view(),  name='api-toggle-favorite'),
     path('places/<slug:slug>/vote/',        VotePlaceView.as_view(),       name='api-vote-place'),
     path('places/<slug:slug>/comments/',    PlaceCommentsView.as_view(),   name='api-place-comments'),
+    path('places/<slug:slug>/also-visited/', AlsoVisitedView.as_view(),   name='api-also-visited'),
+    path('recommendations/',                RecommendationsView.as_view(), name='api-recommendations'),
 
     # ── Check-ins ─────────────────────────────────────────
     path('checkin/',                        CheckInView.as_view(),         name='api-checkin'),
@@ -67,4 +70,5 @@ urlpatterns = [
     path('leaderboard/',                    LeaderboardView.as_view(),     name='api-leaderboard'),
     path('categories/',                     CategoryListView.as_view(),    name='api-categories'),
     path('stats/',                          HomeStatsView.as_view(),       name='api-stats'),
+    path('autocomplete/',                   AutocompleteView.as_view(),    name='api-autocomplete'),
 ]
\ No newline at end of file
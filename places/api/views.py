@@ -3,7 +3,7 @@ import math
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count, F
+from django.db.models import F
 
 from rest_framework import generics, status, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
@@ -21,7 +21,7 @@ from ..models import (
     Challenge, UserChallengeCompletion,
     Notification,
     UserProfile, Category,
-    TourPackage,
+    TourPackage, TourOffering,
 )
 from ..views import (
     evaluate_badges_for_user,
@@ -29,8 +29,20 @@ from ..views import (
     award_trail_completions,
     _recalculate_level,
     get_challenge_progress,
+    _home_totals,
     CHECKIN_COOLDOWN_SECONDS,
 )
+from ..caching import cached_section
+from ..conditional import conditional_api_view
+from ..visit_counter import record_visit, live_visit_count
+from ..search import search
+from ..recommendations import also_visited, recommend_for_user
+from ..facets import apply_facet_filters, facet_counts, filter_bbox, parse_bbox, parse_facet_filters
+from ..autocomplete import autocomplete, DEFAULT_LIMIT as AUTOCOMPLETE_DEFAULT_LIMIT
+from ..checkin_trust import compute_trust_score
+from ..perceptual_hash import dhash, find_near_duplicates
+from ..upload_inspection import inspect_upload
+from .pagination import KeysetOrPageNumberPagination
 from .serializers import (
     RegisterSerializer,
     UserProfileSerializer, UserProfileUpdateSerializer,
@@ -129,27 +141,47 @@ class UserProfileView(generics.RetrieveAPIView):
 # Places
 # ─────────────────────────────────────────────────────────
 
+@conditional_api_view(Place, Category, CheckIn, Comment, Vote)
 class PlaceListView(generics.ListAPIView):
-    """GET /api/places/  — supports ?search=, ?category=, ?difficulty=, ?sort="""
+    """
+    GET /api/places/  — supports ?search=, ?category=, ?difficulty=, ?safety=,
+    ?district=, ?bbox=min_lng,min_lat,max_lng,max_lat, ?sort=, ?cursor=
+
+    ?facets=1 adds per-value counts for category / difficulty / safety /
+    district alongside the page of results.
+    """
     serializer_class   = PlaceListSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class   = KeysetOrPageNumberPagination
 
-    def get_queryset(self):
-        qs = Place.objects.filter(status='approved').prefetch_related('category')
+    def get_sort(self):
+        default = 'relevance' if self.request.query_params.get('search') else '-created_at'
+        return self.request.query_params.get('sort', default)
+
+    def get_keyset_ordering(self):
+        sort = self.get_sort()
+        if sort == 'created_at':
+            return ('created_at', 'id')
+        if sort == '-created_at':
+            return ('-created_at', '-id')
+        return None  # relevance / name / visit_count sorts stay on page numbers
+
+    def get_base_queryset(self):
+        """Text query and bbox applied; facet selections not yet."""
+        qs = Place.objects.filter(status='approved')
+        qs = filter_bbox(qs, parse_bbox(self.request.query_params.get('bbox')))
 
         q = self.request.query_params.get('search', '')
         if q:
-            qs = qs.filter(Q(name__icontains=q) | Q(description__icontains=q))
-
-        category = self.request.query_params.get('category', '')
-        if category:
-            qs = qs.filter(category__slug=category)
+            qs = search(qs, q)
+        return qs
 
-        difficulty = self.request.query_params.get('difficulty', '')
-        if difficulty:
-            qs = qs.filter(difficulty=difficulty)
+    def get_queryset(self):
+        selected = parse_facet_filters(self.request.query_params)
+        qs       = apply_facet_filters(self.get_base_queryset(), selected)
+        qs       = qs.prefetch_related('category')
 
-        sort = self.request.query_params.get('sort', '-created_at')
+        sort = self.get_sort()
         allowed_sorts = ['name', '-name', 'visit_count', '-visit_count',
                          'created_at', '-created_at']
         if sort in allowed_sorts:
@@ -157,6 +189,14 @@ class PlaceListView(generics.ListAPIView):
 
         return qs
 
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('facets') in ('1', 'true'):
+            response.data['facets'] = facet_counts(
+                self.get_base_queryset(), parse_facet_filters(request.query_params)
+            )
+        return response
+
 
 class PlaceDetailView(generics.RetrieveAPIView):
     """GET /api/places/<slug>/"""
@@ -171,8 +211,8 @@ class PlaceDetailView(generics.RetrieveAPIView):
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Increment visit count
-        Place.objects.filter(pk=instance.pk).update(visit_count=F('visit_count') + 1)
+        record_visit(instance.pk)
+        instance.visit_count = live_visit_count(instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -231,6 +271,43 @@ class NearbyPlacesView(APIView):
         return Response(results)
 
 
+class AlsoVisitedView(generics.ListAPIView):
+    """GET /api/places/<slug>/also-visited/  — people who checked in here also went to…"""
+    serializer_class   = PlaceListSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class   = None
+
+    def get_queryset(self):
+        place = get_object_or_404(Place, slug=self.kwargs['slug'], status='approved')
+        return also_visited(place, limit=10)
+
+
+class RecommendationsView(APIView):
+    """GET /api/recommendations/?lat=&lng=&distance=30&limit=10"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            lat    = request.query_params.get('lat')
+            lng    = request.query_params.get('lng')
+            lat    = float(lat) if lat else None
+            lng    = float(lng) if lng else None
+            max_km = float(request.query_params.get('distance', 30))
+            limit  = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            return Response({'error': 'lat, lng, distance and limit must be numbers.'}, status=400)
+
+        results = []
+        for place in recommend_for_user(request.user, lat, lng, limit=max(limit, 1), radius_km=max_km):
+            data = PlaceListSerializer(place, context={'request': request}).data
+            data['score']  = place.recommendation_score
+            data['reason'] = place.recommendation_reason
+            if hasattr(place, 'distance_km'):
+                data['distance_km'] = place.distance_km
+            results.append(data)
+        return Response(results)
+
+
 class TrendingPlacesView(generics.ListAPIView):
     """GET /api/places/trending/"""
     serializer_class   = PlaceListSerializer
@@ -238,9 +315,8 @@ class TrendingPlacesView(generics.ListAPIView):
 
     def get_queryset(self):
         return Place.objects.filter(status='approved').annotate(
-            vote_count=Count('vote', distinct=True),
-            ci_count=Count('checkin', distinct=True),
-        ).order_by('-visit_count', '-ci_count', '-vote_count')[:20]
+            vote_count=F('approval_votes') + F('rejection_votes'),
+        ).order_by('-visit_count', '-checkin_count', '-vote_count')[:20]
 
 
 class ToggleFavoriteView(APIView):
@@ -288,11 +364,8 @@ class VotePlaceView(APIView):
                 vote.vote_type = vote_type
                 vote.save()
 
-        Place.objects.filter(pk=place.pk).update(
-            approval_votes=Vote.objects.filter(place=place, vote_type='up').count(),
-            rejection_votes=Vote.objects.filter(place=place, vote_type='down').count(),
-        )
-        place.refresh_from_db()
+        # Counters are maintained by the Vote signals in places/signals.py
+        place.refresh_from_db(fields=['approval_votes', 'rejection_votes'])
         return Response({
             'approval_votes':  place.approval_votes,
             'rejection_votes': place.rejection_votes,
@@ -359,19 +432,37 @@ class CheckInView(APIView):
                     status=429
                 )
 
-        checkin = serializer.save(user=request.user)
+        # Same anti-cheat checks and trust scoring as the web check-in
+        photo       = serializer.validated_data.get('photo_proof')
+        inspection  = inspect_upload(photo) if photo else None
+        photo_dhash = None
+        if inspection:
+            duplicate = CheckIn.objects.filter(photo_hash=inspection.sha256).exists()
+            if not duplicate:
+                photo_dhash = dhash(photo)
+                duplicate   = photo_dhash is not None and bool(
+                    find_near_duplicates(photo_dhash, user=request.user)
+                )
+            if duplicate:
+                return Response(
+                    {'detail': 'This photo has already been used for a check-in.'}, status=400
+                )
 
-        # Points
-        points = 10
-        if checkin.photo_proof:
-            points += 5
-        if checkin.location_verified:
-            points += 5
-        checkin.points_awarded = points
-        checkin.save()
+        unsaved = CheckIn(
+            photo_proof=photo,
+            location_verified=serializer.validated_data.get('location_verified', False),
+        )
+        trust   = compute_trust_score(unsaved, place, inspection=inspection)
+        checkin = serializer.save(
+            user=request.user,
+            photo_hash=inspection.sha256 if inspection else None,
+            photo_dhash=photo_dhash,
+            trust_score=trust['score'],
+            points_awarded=trust['points'],
+        )
 
         profile, _ = UserProfile.objects.get_or_create(user=request.user)
-        profile.points += points
+        profile.points += checkin.points_awarded
         profile.save()
         _recalculate_level(profile)
 
@@ -389,6 +480,7 @@ class MyCheckInsView(generics.ListAPIView):
     """GET /api/checkins/mine/"""
     serializer_class   = CheckInSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class   = KeysetOrPageNumberPagination
 
     def get_queryset(self):
         return CheckIn.objects.filter(
@@ -400,6 +492,7 @@ class MyCheckInsView(generics.ListAPIView):
 # Trails
 # ─────────────────────────────────────────────────────────
 
+@conditional_api_view(Trail, TrailPlace, Category, User, UserProfile)
 class TrailListView(generics.ListAPIView):
     """GET /api/trails/  — supports ?search=, ?difficulty=, ?category="""
     serializer_class   = TrailListSerializer
@@ -408,10 +501,6 @@ class TrailListView(generics.ListAPIView):
     def get_queryset(self):
         qs = Trail.objects.filter(is_public=True).prefetch_related('places', 'category')
 
-        q = self.request.query_params.get('search', '')
-        if q:
-            qs = qs.filter(Q(name__icontains=q) | Q(description__icontains=q))
-
         difficulty = self.request.query_params.get('difficulty', '')
         if difficulty:
             qs = qs.filter(difficulty=difficulty)
@@ -420,6 +509,9 @@ class TrailListView(generics.ListAPIView):
         if category:
             qs = qs.filter(category__slug=category)
 
+        q = self.request.query_params.get('search', '')
+        if q:
+            return search(qs, q)
         return qs.order_by('-created_at')
 
 
@@ -438,6 +530,7 @@ class TrailDetailView(generics.RetrieveAPIView):
 # Badges & Challenges
 # ─────────────────────────────────────────────────────────
 
+@conditional_api_view(Badge, UserBadge, per_user=True)
 class BadgeListView(generics.ListAPIView):
     """GET /api/badges/"""
     serializer_class   = BadgeSerializer
@@ -467,6 +560,7 @@ class NotificationListView(generics.ListAPIView):
     """GET /api/notifications/"""
     serializer_class   = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class   = KeysetOrPageNumberPagination
 
     def get_queryset(self):
         return Notification.objects.filter(
@@ -492,7 +586,7 @@ class MarkAllNotificationsReadView(APIView):
     def post(self, request):
         count = Notification.objects.filter(
             user=request.user, is_read=False
-        ).update(is_read=True)
+        ).update(is_read=True, updated_at=timezone.now())
         return Response({'updated': count})
 
 
@@ -511,16 +605,22 @@ class UnreadNotificationCountView(APIView):
 # Tours
 # ─────────────────────────────────────────────────────────
 
+@conditional_api_view(TourPackage, TourOffering, Trail)
 class TourListView(generics.ListAPIView):
-    """GET /api/tours/"""
+    """GET /api/tours/  — supports ?search="""
     serializer_class   = TourListSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        return TourPackage.objects.filter(
+        qs = TourPackage.objects.filter(
             is_active=True
         ).prefetch_related('trails', 'offerings')
 
+        q = self.request.query_params.get('search', '')
+        if q:
+            qs = search(qs, q)
+        return qs
+
 
 class TourDetailView(generics.RetrieveAPIView):
     """GET /api/tours/<slug>/"""
@@ -548,6 +648,7 @@ class LeaderboardView(generics.ListAPIView):
         return UserProfile.objects.select_related('user').order_by('-points')[:50]
 
 
+@conditional_api_view(Category)
 class CategoryListView(generics.ListAPIView):
     """GET /api/categories/"""
     serializer_class   = CategorySerializer
@@ -555,6 +656,27 @@ class CategoryListView(generics.ListAPIView):
     queryset           = Category.objects.all().order_by('name')
 
 
+# ─────────────────────────────────────────────────────────
+# Autocomplete
+# ─────────────────────────────────────────────────────────
+
+class AutocompleteView(APIView):
+    """GET /api/autocomplete/?q=sig  — optional ?types=place,trail&limit=8"""
+    authentication_classes = []   # public, and no session/user lookup per keystroke
+    permission_classes     = [permissions.AllowAny]
+
+    def get(self, request):
+        q = request.query_params.get('q', '').strip()
+        try:
+            limit = int(request.query_params.get('limit', AUTOCOMPLETE_DEFAULT_LIMIT))
+        except ValueError:
+            limit = AUTOCOMPLETE_DEFAULT_LIMIT
+        types = {
+            t for t in request.query_params.get('types', '').split(',') if t
+        } or None
+        return Response({'query': q, 'results': autocomplete(q, limit, types)})
+
+
 # ─────────────────────────────────────────────────────────
 # Stats (dashboard data for home screen)
 # ─────────────────────────────────────────────────────────
@@ -565,12 +687,9 @@ class HomeStatsView(APIView):
 
     def get(self, request):
         from ..models import UserProfile
-        data = {
-            'total_places': Place.objects.filter(status='approved').count(),
-            'total_trails': Trail.objects.filter(is_public=True).count(),
-            'total_tours':  TourPackage.objects.filter(is_active=True).count(),
-            'total_users':  UserProfile.objects.count(),
-        }
+        data = dict(cached_section(
+            'home:totals', (Place, Trail, UserProfile, TourPackage), _home_totals
+        ))
         if request.user.is_authenticated:
             profile, _ = UserProfile.objects.get_or_create(user=request.user)
             data['my_points']  = profile.points
@@ -0,0 +1,253 @@
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.urls import reverse
+
+from .caching import get_model_versions
+from .models import Category, Place, TourPackage, Trail, TrailPlace
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT       = 8
+MAX_LIMIT           = 20
+TOP_PREFIX_LENGTH   = 2      # prefixes this short are answered from a precomputed top list
+VERSION_CHECK_EVERY = 5.0    # seconds between version probes — keystrokes never wait on the cache
+MAX_INDEX_AGE       = 900    # seconds — popularity counters move without a version bump
+
+# Ties on popularity go to the kind people most often mean.
+TYPE_BOOST = {
+    'place':    1.0,
+    'trail':    0.6,
+    'tour':     0.5,
+    'category': 0.3,
+}
+
+INDEXED_MODELS = (Place, Trail, Category, TourPackage)
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text):
+    """Fold accents, case and punctuation: "Ella’s  Rock" -> "ellas rock"."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("'", '').replace('’', '')
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+# ─────────────────────────────────────────────────────────
+# Prefix index
+# ─────────────────────────────────────────────────────────
+
+class PrefixIndex:
+    """
+    Sorted array of (key, entry id) where each name is filed under every
+    word start ("sigiriya rock" and "rock"), so "roc" finds it too.
+
+    A query bisects out the matching key range and keeps the best
+    `limit` of it with a heap. Very short prefixes match a large slice of
+    the array, so their answers are precomputed instead, overall and per
+    type.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries                      # [{type, name, url, …, score}]
+        pairs = []
+        for i, entry in enumerate(entries):
+            words = normalize(entry['name']).split()
+            for w in range(len(words)):
+                pairs.append((' '.join(words[w:]), i))
+        pairs.sort()
+        self.keys = [k for k, _ in pairs]
+        self.ids  = [i for _, i in pairs]
+        self.top  = self._precompute_top()
+
+    def _range(self, prefix):
+        # Keys only hold [0-9a-z ], so every key starting with `prefix`
+        # sorts before prefix + '~'
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + '~')
+
+    def _score(self, i):
+        return self.entries[i]['score']
+
+    def _rank(self, ids, limit):
+        return [self.entries[i] for i in heapq.nlargest(limit, set(ids), key=self._score)]
+
+    def _precompute_top(self):
+        """{(prefix, type or None): best MAX_LIMIT entries} for the short prefixes."""
+        groups = {}
+        for key, i in zip(self.keys, self.ids):
+            kind = self.entries[i]['type']
+            for n in range(1, min(len(key), TOP_PREFIX_LENGTH) + 1):
+                groups.setdefault((key[:n], None), []).append(i)
+                groups.setdefault((key[:n], kind), []).append(i)
+        return {group: self._rank(ids, MAX_LIMIT) for group, ids in groups.items()}
+
+    def lookup(self, query, limit=DEFAULT_LIMIT, types=None):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        if len(prefix) <= TOP_PREFIX_LENGTH:
+            if not types:
+                return self.top.get((prefix, None), [])[:limit]
+            lists = [self.top.get((prefix, kind), []) for kind in set(types)]
+            return heapq.nlargest(limit, (e for top in lists for e in top), key=lambda e: e['score'])
+        lo, hi = self._range(prefix)
+        ids    = self.ids[lo:hi]
+        if types:
+            ids = [i for i in ids if self.entries[i]['type'] in types]
+        return self._rank(ids, limit)
+
+
+def _score(popularity, kind):
+    return math.log1p(max(popularity, 0)) + TYPE_BOOST[kind]
+
+
+def build_entries():
+    """Everything the index serves — four queries, run only on rebuild."""
+    entries = []
+
+    for p in Place.objects.filter(status='approved').values(
+        'name', 'slug', 'latitude', 'longitude',
+        'visit_count', 'checkin_count', 'approval_votes',
+    ):
+        entries.append({
+            'type':      'place',
+            'name':      p['name'],
+            'url':       reverse('places:place_detail', kwargs={'slug': p['slug']}),
+            'slug':      p['slug'],
+            'latitude':  p['latitude'],
+            'longitude': p['longitude'],
+            'score':     _score(p['visit_count'] + 5 * p['checkin_count'] + 2 * p['approval_votes'], 'place'),
+        })
+
+    checkins = (
+        TrailPlace.objects.filter(trail=OuterRef('pk')).order_by()
+        .values('trail').annotate(n=Sum('place__checkin_count')).values('n')
+    )
+    for t in Trail.objects.filter(is_public=True).annotate(
+        checkins=Subquery(checkins)
+    ).values('pk', 'name', 'checkins'):
+        entries.append({
+            'type':  'trail',
+            'name':  t['name'],
+            'url':   reverse('places:trail_detail', kwargs={'pk': t['pk']}),
+            'id':    t['pk'],
+            'score': _score(t['checkins'] or 0, 'trail'),
+        })
+
+    for c in Category.objects.annotate(
+        n=Count('places', distinct=True)
+    ).values('name', 'slug', 'n'):
+        entries.append({
+            'type':  'category',
+            'name':  c['name'],
+            'url':   reverse('places:search_results') + f"?category={c['slug']}",
+            'slug':  c['slug'],
+            'score': _score(c['n'], 'category'),
+        })
+
+    for tour in TourPackage.objects.filter(is_active=True).annotate(
+        n=Count('trails', distinct=True)
+    ).values('name', 'slug', 'n'):
+        entries.append({
+            'type':  'tour',
+            'name':  tour['name'],
+            'url':   reverse('places:tour_detail', kwargs={'slug': tour['slug']}),
+            'slug':  tour['slug'],
+            'score': _score(tour['n'], 'tour'),
+        })
+
+    return entries
+
+
+# ─────────────────────────────────────────────────────────
+# Process-wide index, rebuilt on model version bumps
+# ─────────────────────────────────────────────────────────
+
+_state = {
+    'index':      None,
+    'versions':   None,
+    'built_at':   0.0,
+    'checked_at': 0.0,
+    'rebuilding': False,
+}
+_lock       = threading.Lock()
+_build_lock = threading.Lock()      # held by the first, inline build only
+
+
+def _rebuild(versions):
+    try:
+        index = PrefixIndex(build_entries())
+    except Exception:
+        logger.exception("Autocomplete index rebuild failed")
+        with _lock:
+            _state['rebuilding'] = False
+        return
+    with _lock:
+        _state.update(
+            index=index, versions=versions, built_at=time.monotonic(), rebuilding=False,
+        )
+
+
+def _rebuild_in_background(versions):
+    from django.db import connection
+
+    def run():
+        try:
+            _rebuild(versions)
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name='autocomplete-rebuild', daemon=True).start()
+
+
+def get_index():
+    """
+    The current PrefixIndex. The first call builds it inline; afterwards a
+    version change found by the periodic probe triggers a background
+    rebuild while the old index keeps serving.
+    """
+    now = time.monotonic()
+    with _lock:
+        index      = _state['index']
+        due        = now - _state['checked_at'] >= VERSION_CHECK_EVERY
+        rebuilding = _state['rebuilding']
+        if due:
+            _state['checked_at'] = now
+    if index is not None and (not due or rebuilding):
+        return index
+
+    if index is None:
+        # Concurrent first requests wait for one build instead of each
+        # running their own
+        with _build_lock:
+            if _state['index'] is None:
+                _rebuild(get_model_versions(*INDEXED_MODELS))
+        return _state['index'] or PrefixIndex([])
+
+    versions = get_model_versions(*INDEXED_MODELS)
+    stale = versions != _state['versions'] or now - _state['built_at'] > MAX_INDEX_AGE
+    if stale:
+        with _lock:
+            if _state['rebuilding']:
+                return index
+            _state['rebuilding'] = True
+        _rebuild_in_background(versions)
+    return index
+
+
+def autocomplete(query, limit=DEFAULT_LIMIT, types=None):
+    """Top `limit` suggestions for a typed prefix — no database access once warm."""
+    limit = max(1, min(limit, MAX_LIMIT))
+    return [
+        {k: v for k, v in entry.items() if k != 'score'}
+        for entry in get_index().lookup(query, limit, types)
+    ]
@@ -0,0 +1,127 @@
+import logging
+import time
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ModelVersion
+
+logger = logging.getLogger(__name__)
+
+SECTION_PREFIX = "section"
+
+SECTION_TIMEOUT      = 300    # seconds — upper bound on staleness for un-signalled writes
+SECTION_LOCK_TIMEOUT = 10     # seconds — a crashed builder can't hold the lock longer
+SECTION_LOCK_WAIT    = 2.0    # seconds a follower waits for the leader's result
+SECTION_LOCK_POLL    = 0.05
+
+
+# ─────────────────────────────────────────────────────────
+# Per-model version counters
+# ─────────────────────────────────────────────────────────
+# Kept in the database (ModelVersion), not the cache: every worker and
+# every management command must see the same counter, or ETags differ
+# per process and writes made elsewhere never invalidate anything.
+
+def _label(model):
+    return model._meta.label_lower
+
+
+def _seed_version():
+    # Seeded from the clock so a recreated counter never comes back at a
+    # value an older cached section was stored under.
+    return int(time.time() * 1000)
+
+
+def model_version_rows(models):
+    """{label: (version, changed_at)} for `models`, creating missing rows."""
+    labels = {_label(m) for m in models}
+    rows   = {
+        label: (version, changed_at)
+        for label, version, changed_at in ModelVersion.objects.filter(label__in=labels)
+        .values_list("label", "version", "changed_at")
+    }
+    for label in labels - rows.keys():
+        row, _ = ModelVersion.objects.get_or_create(
+            label=label, defaults={"version": _seed_version(), "changed_at": timezone.now()},
+        )
+        rows[label] = (row.version, row.changed_at)
+    return rows
+
+
+def get_model_versions(*models):
+    """Return {label: version} for the given models, seeding missing counters."""
+    return {label: version for label, (version, _) in model_version_rows(models).items()}
+
+
+def bump_model_version(model):
+    """
+    Invalidate everything cached against `model`. Called from signals,
+    and by code that writes with update() / bulk_*(). Inside a
+    transaction the bump commits or rolls back with the write.
+    """
+    label = _label(model)
+    stamp = timezone.now()
+    bump  = ModelVersion.objects.filter(label=label)
+    if not bump.update(version=F("version") + 1, changed_at=stamp):
+        _, created = ModelVersion.objects.get_or_create(
+            label=label, defaults={"version": _seed_version(), "changed_at": stamp},
+        )
+        if not created:
+            bump.update(version=F("version") + 1, changed_at=stamp)
+
+
+def get_models_last_modified(*models):
+    """
+    Latest write time across `models`, as an aware datetime.
+
+    Stamped with every version bump, so it moves on deletes too (which
+    MAX(updated_at) would miss). A new counter starts at "now", so
+    nothing ever looks falsely unchanged.
+    """
+    return max(changed_at for _, changed_at in model_version_rows(models).values())
+
+
+# ─────────────────────────────────────────────────────────
+# Versioned sections with single-flight rebuild
+# ─────────────────────────────────────────────────────────
+
+def _section_key(name, depends_on):
+    versions = get_model_versions(*depends_on)
+    stamp    = ".".join(str(versions[label]) for label in sorted(versions))
+    return f"{SECTION_PREFIX}:{name}:{stamp}"
+
+
+def cached_section(name, depends_on, builder, timeout=SECTION_TIMEOUT):
+    """
+    Return builder() from the cache, keyed on the versions of `depends_on`.
+
+    Any save/delete of a dependency bumps its version and so moves the key;
+    old entries simply age out. On a miss only one caller rebuilds (cache.add
+    lock) — the rest wait briefly for its result instead of stampeding the
+    database, and fall back to building it themselves if it never arrives.
+    """
+    key   = _section_key(name, depends_on)
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, timeout=SECTION_LOCK_TIMEOUT):
+        try:
+            value = builder()
+            cache.set(key, value, timeout=timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + SECTION_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(SECTION_LOCK_POLL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+    logger.debug("Section %s not ready after %.1fs; building uncached", name, SECTION_LOCK_WAIT)
+    return builder()
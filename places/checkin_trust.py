@@ -17,6 +17,24 @@ LOCATION_POINTS  = 3   # client GPS verified flag
 MAX_EXIF_TIME_DELTA_HOURS = 12
 MAX_GPS_DISTANCE_KM       = 0.5   # 500m
 
+# ── Tiers ─────────────────────────────────────────────────
+VERIFIED_MIN_SCORE = 4
+LIKELY_MIN_SCORE   = 2
+TIER_POINTS        = {
+    "verified":   BASE_POINTS + PHOTO_POINTS + EXIF_GPS_POINTS + EXIF_TIME_POINTS + LOCATION_POINTS,
+    "likely":     BASE_POINTS + PHOTO_POINTS + EXIF_TIME_POINTS,
+    "unverified": BASE_POINTS,
+}
+EARTH_RADIUS_KM = 6371.0
+
+
+def trust_tier(score) -> str:
+    if score >= VERIFIED_MIN_SCORE:
+        return "verified"
+    if score >= LIKELY_MIN_SCORE:
+        return "likely"
+    return "unverified"
+
 
 def compute_photo_hash(image_file) -> str:
     """
@@ -97,7 +115,7 @@ def _dms_to_decimal(dms_values, ref) -> float:
 def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """Return the great-circle distance in kilometres between two lat/lng points."""
     import math
-    R = 6371.0
+    R = EARTH_RADIUS_KM
     dlat = math.radians(lat2 - lat1)
     dlng = math.radians(lng2 - lng1)
     a = (
@@ -109,10 +127,13 @@ def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
-def compute_trust_score(checkin, place, submitted_at=None) -> dict:
+def compute_trust_score(checkin, place, submitted_at=None, inspection=None) -> dict:
     """
     Compute a trust score for a check-in based on available evidence.
 
+    Pass the photo's `inspection` (upload_inspection.inspect_upload) when
+    there is one; its EXIF fields are used instead of re-reading the file.
+
     Scoring breakdown (max 5 raw points → 'verified' tier):
       +1  photo present
       +2  EXIF GPS within 500m of place
@@ -146,11 +167,14 @@ def compute_trust_score(checkin, place, submitted_at=None) -> dict:
         flags.append("photo_present")
 
         # ── 2. EXIF analysis ──────────────────────────────
-        try:
-            checkin.photo_proof.seek(0)
-            exif_info = extract_exif(checkin.photo_proof)
-        except Exception:
-            exif_info = None
+        if inspection is not None:
+            exif_info = inspection.exif_info
+        else:
+            try:
+                checkin.photo_proof.seek(0)
+                exif_info = extract_exif(checkin.photo_proof)
+            except Exception:
+                exif_info = None
 
         if exif_info:
             # ── 2a. GPS proximity ────────────────────────
@@ -192,20 +216,50 @@ def compute_trust_score(checkin, place, submitted_at=None) -> dict:
         flags.append("client_gps")
 
     # ── 4. Tier + points ──────────────────────────────────
-    if score >= 4:
-        tier   = "verified"
-        points = BASE_POINTS + PHOTO_POINTS + EXIF_GPS_POINTS + EXIF_TIME_POINTS + LOCATION_POINTS
-    elif score >= 2:
-        tier   = "likely"
-        points = BASE_POINTS + PHOTO_POINTS + EXIF_TIME_POINTS
-    else:
-        tier   = "unverified"
-        points = BASE_POINTS
+    tier = trust_tier(score)
 
     return {
         "score":     score,
         "tier":      tier,
-        "points":    points,
+        "points":    TIER_POINTS[tier],
         "exif_info": exif_info,
         "flags":     flags,
-    }
\ No newline at end of file
+    }
+
+
+def compute_trust_scores(has_photo, exif_lat, exif_lng, taken_at,
+                         place_lat, place_lng, submitted_at, location_verified):
+    """
+    compute_trust_score() over whole arrays at once, for re-scoring
+    history. Every argument is a numpy array of equal length: booleans
+    for has_photo / location_verified, floats for the rest with NaN for
+    "missing"; taken_at and submitted_at are POSIX timestamps.
+
+    Returns (scores, tiers, points) arrays.
+    """
+    import numpy as np
+
+    lat1, lng1 = np.radians(exif_lat), np.radians(exif_lng)
+    lat2, lng2 = np.radians(place_lat), np.radians(place_lng)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    with np.errstate(invalid="ignore"):
+        km          = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        gps_match   = has_photo & (km <= MAX_GPS_DISTANCE_KM)                    # NaN compares False
+        delta_hours = np.abs(submitted_at - taken_at) / 3600
+        time_match  = has_photo & (delta_hours <= MAX_EXIF_TIME_DELTA_HOURS)
+
+    scores = (
+        has_photo.astype(np.int64) + 2 * gps_match + time_match + location_verified
+    ).astype(np.int64)
+    tiers  = np.select(
+        [scores >= VERIFIED_MIN_SCORE, scores >= LIKELY_MIN_SCORE],
+        ["verified", "likely"], "unverified",
+    )
+    points = np.select(
+        [scores >= VERIFIED_MIN_SCORE, scores >= LIKELY_MIN_SCORE],
+        [TIER_POINTS["verified"], TIER_POINTS["likely"]], TIER_POINTS["unverified"],
+    )
+    return scores, tiers, points
\ No newline at end of file
@@ -0,0 +1,60 @@
+import hashlib
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .caching import model_version_rows
+
+
+# ─────────────────────────────────────────────────────────
+# Conditional GET (ETag / Last-Modified) from model versions
+# ─────────────────────────────────────────────────────────
+
+def _rows(request, models):
+    # condition() asks for the ETag and Last-Modified separately; read
+    # the counters once per request
+    memo = request.__dict__.setdefault("_model_versions", {})
+    if models not in memo:
+        memo[models] = model_version_rows(models)
+    return memo[models]
+
+
+def _etag(models, per_user):
+    def etag_func(request, *args, **kwargs):
+        rows  = _rows(request, models)
+        parts = [f"{label}={rows[label][0]}" for label in sorted(rows)]
+        if per_user:
+            user = getattr(request, "user", None)
+            parts.append(f"u={user.pk if user and user.is_authenticated else 0}")
+        return hashlib.md5("|".join(parts).encode()).hexdigest()
+    return etag_func
+
+
+def _last_modified(models):
+    def last_modified_func(request, *args, **kwargs):
+        return max(changed_at for _, changed_at in _rows(request, models).values())
+    return last_modified_func
+
+
+def conditional_on(*models, per_user=False):
+    """
+    View decorator: answer If-None-Match / If-Modified-Since with a 304
+    before the view runs, so an unchanged payload is never queried or
+    serialised.
+
+    Validators come from the per-model version counters in
+    places/caching.py — one indexed query, shared by every worker. Pass every model the response
+    renders; per_user=True for responses that differ by viewer (HTML pages
+    with a nav bar, serializers that read request.user).
+
+    Clients opt in simply by echoing back the ETag / Last-Modified they got.
+    """
+    return condition(
+        etag_func=_etag(models, per_user),
+        last_modified_func=_last_modified(models),
+    )
+
+
+def conditional_api_view(*models, per_user=False):
+    """Class decorator for DRF GET views; runs after auth and permission checks."""
+    return method_decorator(conditional_on(*models, per_user=per_user), name="get")
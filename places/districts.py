@@ -0,0 +1,58 @@
+import math
+
+# Sri Lanka's 25 administrative districts → approximate (lat, lng) of the
+# district's geographic centre (not its capital: several capitals sit on
+# the coast, far from most of the district).
+DISTRICT_CENTRES = {
+    'ampara':       (7.15, 81.60),
+    'anuradhapura': (8.35, 80.50),
+    'badulla':      (7.00, 81.10),
+    'batticaloa':   (7.70, 81.55),
+    'colombo':      (6.88, 80.02),
+    'galle':        (6.20, 80.30),
+    'gampaha':      (7.08, 80.05),
+    'hambantota':   (6.25, 81.10),
+    'jaffna':       (9.65, 80.10),
+    'kalutara':     (6.55, 80.10),
+    'kandy':        (7.28, 80.75),
+    'kegalle':      (7.15, 80.35),
+    'kilinochchi':  (9.40, 80.40),
+    'kurunegala':   (7.70, 80.25),
+    'mannar':       (8.85, 80.05),
+    'matale':       (7.65, 80.70),
+    'matara':       (6.05, 80.55),
+    'monaragala':   (6.75, 81.30),
+    'mullaitivu':   (9.15, 80.65),
+    'nuwara-eliya': (6.98, 80.70),
+    'polonnaruwa':  (7.95, 81.10),
+    'puttalam':     (8.00, 79.90),
+    'ratnapura':    (6.60, 80.50),
+    'trincomalee':  (8.50, 81.10),
+    'vavuniya':     (8.80, 80.45),
+}
+
+DISTRICT_CHOICES = [
+    (slug, slug.replace('-', ' ').title()) for slug in DISTRICT_CENTRES
+]
+
+# Loose box around the island — coordinates outside it (including the
+# 0, 0 default) are never assigned a district.
+ISLAND_BOUNDS = (5.8, 79.4, 9.9, 82.0)   # min_lat, min_lng, max_lat, max_lng
+
+
+def nearest_district(lat, lng):
+    """
+    Best guess at the district containing (lat, lng): the one whose centre
+    is closest. Good enough to pre-fill the field; editors can correct it.
+    """
+    if lat is None or lng is None:
+        return ''
+    min_lat, min_lng, max_lat, max_lng = ISLAND_BOUNDS
+    if not (min_lat <= lat <= max_lat and min_lng <= lng <= max_lng):
+        return ''
+    scale = math.cos(math.radians(lat))   # shrink longitude degrees to match latitude ones
+    return min(
+        DISTRICT_CENTRES,
+        key=lambda d: (DISTRICT_CENTRES[d][0] - lat) ** 2
+                      + ((DISTRICT_CENTRES[d][1] - lng) * scale) ** 2,
+    )
@@ -0,0 +1,522 @@
+"""
+Streaming export of the database (manage.py export_all_data).
+
+Each model is read in its own thread with values_list().iterator(), in
+chunks of `chunk_size` rows, and handed to a writer as it arrives.
+Writers that produce one file per sheet (CSV, Parquet) write from the
+worker threads; the xlsx writer has to write sheet by sheet, so workers
+read ahead into bounded queues instead. Either way memory depends on the
+chunk size and the number of workers, never on the size of a table.
+
+ExportReader reads any of the formats back, for restore_export.
+"""
+
+import csv
+import datetime
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, models
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+EXPORT_WORKERS  = 4
+CHUNK_ROWS      = 2000
+PREFETCH_CHUNKS = 4         # per sheet, read ahead of the xlsx writer
+
+# Per sheet, after its row count, in the index of every export
+MANIFEST_COLUMNS = ("model", "mode", "since", "until")
+
+# Sheet order; each is a model of the app that owns Place
+EXPORT_MODELS = (
+    "ExpertArea", "Category",
+    "Place", "PlaceImage", "PlaceVideo",
+    "CheckIn",
+    "Trail", "TrailPlace", "TrailCompletion",
+    "Comment", "Vote",
+    "Favorite", "TrailFavorite",
+    "Badge", "UserBadge",
+    "Challenge", "UserChallengeCompletion",
+    "Notification",
+    "TourOffering", "TourPackage", "TourItineraryDay",
+    "UserProfile",
+)
+
+
+def export_models():
+    """
+    ([(sheet name, model)], [missing model names]) in export order —
+    the users first, then EXPORT_MODELS, each followed by the tables of
+    its plain many-to-many fields (e.g. "Place_category").
+    """
+    app_label = None
+    for app_config in apps.get_app_configs():
+        try:
+            app_config.get_model("Place")
+            app_label = app_config.label
+            break
+        except LookupError:
+            pass
+    if not app_label:
+        raise ImproperlyConfigured("Could not detect app label — is 'Place' registered?")
+
+    sheets, missing = [("Users", User)], []
+    for name in EXPORT_MODELS:
+        try:
+            model = apps.get_model(app_label, name)
+        except LookupError:
+            missing.append(name)
+            continue
+        sheets.append((name, model))
+        for field in model._meta.local_many_to_many:
+            if field.remote_field.through._meta.auto_created:
+                sheets.append((f"{name}_{field.name}", field.remote_field.through))
+    return sheets, missing
+
+
+def export_fields(model):
+    """The model's columns; foreign keys export their raw id."""
+    return list(model._meta.concrete_fields)
+
+
+def cell_value(val):
+    """How a value appears in the xlsx and CSV exports."""
+    if val is None:
+        return ""
+    if isinstance(val, (list, dict)):
+        return json.dumps(val)
+    if hasattr(val, "isoformat"):
+        return val.isoformat()
+    return str(val)
+
+
+# ─────────────────────────────────────────────────────────
+# Reading
+# ─────────────────────────────────────────────────────────
+
+def read_chunks(queryset, fields, chunk_size=CHUNK_ROWS):
+    """Lists of up to chunk_size value tuples (in `fields` order)."""
+    rows  = queryset.values_list(*[f.attname for f in fields]).iterator(chunk_size=chunk_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _produce(queryset, fields, chunk_size, out, stop):
+    """Worker: read `queryset` into the queue `out`, ending with None (or the exception)."""
+    def put(item):
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        for chunk in read_chunks(queryset, fields, chunk_size):
+            if not put(chunk):
+                return
+        put(None)
+    except Exception as exc:
+        put(exc)
+    finally:
+        connections.close_all()     # this thread's connections
+
+
+def _consume(out):
+    while True:
+        item = out.get()
+        if item is None:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def _write_sheet(writer, sheet, queryset, fields, chunk_size):
+    """Worker: read and write one sheet (writers with parallel = True)."""
+    try:
+        return writer.write_sheet(sheet, fields, read_chunks(queryset, fields, chunk_size))
+    finally:
+        connections.close_all()
+
+
+def export(sheets, writer, workers=EXPORT_WORKERS, chunk_size=CHUNK_ROWS, querysets=None,
+           on_sheet=None, manifest=None):
+    """
+    Export [(sheet name, model)] through `writer` and close it.
+
+    `querysets` can narrow what a sheet exports (sheet name → queryset);
+    by default it's every row, in primary-key order. on_sheet(sheet,
+    result) is called in sheet order as each finishes, with the row
+    count or the exception that stopped it. `manifest` (sheet → dict of
+    MANIFEST_COLUMNS) goes into the index. Returns [(sheet, result)].
+    """
+    querysets = querysets or {}
+    jobs      = []
+    for sheet, model in sheets:
+        qs = querysets.get(sheet)
+        jobs.append((sheet, export_fields(model), model.objects.order_by("pk") if qs is None else qs))
+
+    summary = []
+
+    def done(sheet, result):
+        summary.append((sheet, result))
+        if on_sheet:
+            on_sheet(sheet, result)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        if writer.parallel:
+            futures = [
+                pool.submit(_write_sheet, writer, sheet, qs, fields, chunk_size)
+                for sheet, fields, qs in jobs
+            ]
+            for (sheet, _, _), future in zip(jobs, futures):
+                try:
+                    done(sheet, future.result())
+                except Exception as exc:
+                    done(sheet, exc)
+        else:
+            # Sheets are submitted in the order they're written, so the
+            # one being written always has a worker
+            feeds = []
+            for sheet, fields, qs in jobs:
+                out, stop = queue.Queue(maxsize=PREFETCH_CHUNKS), threading.Event()
+                pool.submit(_produce, qs, fields, chunk_size, out, stop)
+                feeds.append((out, stop))
+            try:
+                for (sheet, fields, _), (out, stop) in zip(jobs, feeds):
+                    try:
+                        done(sheet, writer.write_sheet(sheet, fields, _consume(out)))
+                    except Exception as exc:
+                        done(sheet, exc)
+                    finally:
+                        stop.set()
+            finally:
+                for _, stop in feeds:
+                    stop.set()
+
+    writer.close(summary, manifest or {})
+    return summary
+
+
+# ─────────────────────────────────────────────────────────
+# Writers
+# ─────────────────────────────────────────────────────────
+
+HEADER_FILL  = PatternFill("solid", start_color="1F4E79")
+ALT_ROW_FILL = PatternFill("solid", start_color="D9E1F2")
+HEADER_FONT  = Font(name="Arial", bold=True, color="FFFFFF", size=10)
+BODY_FONT    = Font(name="Arial", size=9)
+CENTER       = Alignment(horizontal="center", vertical="center")
+WRAP         = Alignment(horizontal="left", vertical="top", wrap_text=True)
+THIN         = Border(
+    left=Side(style="thin", color="BFBFBF"),   right=Side(style="thin", color="BFBFBF"),
+    top=Side(style="thin", color="BFBFBF"),    bottom=Side(style="thin", color="BFBFBF"),
+)
+
+WIDTH_SAMPLE = 200          # rows looked at to size the columns
+MAX_WIDTH    = 60
+
+
+class XlsxExport:
+    """
+    One workbook, written with openpyxl's write-only mode: rows go
+    straight to disk, and every cell refers to one of a few named styles
+    instead of carrying its own. Column widths come from the first
+    WIDTH_SAMPLE rows, the only ones still in memory when they're set.
+    """
+    parallel = False
+
+    def __init__(self, path):
+        self.path = path
+        self.wb   = Workbook(write_only=True)
+        for style in (
+            NamedStyle("export_header", font=HEADER_FONT, fill=HEADER_FILL, alignment=CENTER, border=THIN),
+            NamedStyle("export_body", font=BODY_FONT, alignment=WRAP, border=THIN),
+            NamedStyle("export_body_alt", font=BODY_FONT, fill=ALT_ROW_FILL, alignment=WRAP, border=THIN),
+            NamedStyle("export_title", font=Font(name="Arial", bold=True, size=14, color="1F4E79")),
+            NamedStyle("export_note", font=Font(name="Arial", size=9, color="888888")),
+            NamedStyle("export_label", font=Font(name="Arial", bold=True, size=10)),
+            NamedStyle("export_total", font=Font(name="Arial", bold=True, size=9)),
+            NamedStyle("export_text", font=BODY_FONT),
+            NamedStyle("export_text_alt", font=BODY_FONT, fill=ALT_ROW_FILL),
+        ):
+            self.wb.add_named_style(style)
+
+    def _cell(self, ws, value, style):
+        cell       = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    def write_sheet(self, sheet, fields, chunks):
+        ws     = self.wb.create_sheet(title=sheet[:31])
+        names  = [f.name for f in fields]
+        chunks = iter(chunks)
+        first  = [[cell_value(v) for v in row] for row in next(chunks, [])]
+
+        # Widths must be set before the first row is written
+        for ci, name in enumerate(names):
+            width = len(name)
+            for row in first[:WIDTH_SAMPLE]:
+                if row[ci]:
+                    width = max(width, min(len(row[ci]), MAX_WIDTH))
+            ws.column_dimensions[get_column_letter(ci + 1)].width = width + 2
+        ws.freeze_panes = "A2"
+
+        ws.append([self._cell(ws, name, "export_header") for name in names])
+        count = 0
+
+        # append() serialises a row immediately, so one styled cell per
+        # column can be reused for every row
+        styled = [[self._cell(ws, None, style) for _ in names]
+                  for style in ("export_body", "export_body_alt")]
+
+        def write(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                cells  = styled[count % 2]
+                for cell, value in zip(cells, row):
+                    cell.value = value
+                ws.append(cells)
+
+        write(first)
+        for chunk in chunks:
+            write([cell_value(v) for v in row] for row in chunk)
+        return count
+
+    def close(self, summary, manifest):
+        ws = self.wb.create_sheet(title="Index", index=0)
+        for col, width in zip("ABCDEF", (28, 14, 30, 12, 34, 34)):
+            ws.column_dimensions[col].width = width
+        ws.freeze_panes = "A5"
+
+        exported = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ws.append([self._cell(ws, "Database Backup", "export_title")])
+        ws.append([self._cell(ws, f"Exported: {exported}", "export_note")])
+        ws.append([])
+        ws.append([self._cell(ws, label, "export_label") for label in (
+            "Sheet / Model", "Row Count", *(column.title() for column in MANIFEST_COLUMNS)
+        )])
+        for i, (sheet, result) in enumerate(summary, 5):
+            style = "export_text_alt" if i % 2 == 0 else "export_text"
+            count = result if isinstance(result, int) else "ERROR"
+            entry = manifest.get(sheet, {})
+            ws.append([self._cell(ws, value, style) for value in (
+                sheet, count, *(entry.get(column, "") for column in MANIFEST_COLUMNS)
+            )])
+
+        last = len(summary) + 4
+        ws.append([self._cell(ws, "TOTAL", "export_total"),
+                   self._cell(ws, f"=SUM(B5:B{last})", "export_total")])
+        self.wb.save(self.path)
+
+
+class _DirectoryExport:
+    """A directory with one file (or folder) per sheet, plus index.csv."""
+    parallel = True
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def close(self, summary, manifest):
+        with open(os.path.join(self.path, "index.csv"), "w", newline="", encoding="utf-8") as fh:
+            out = csv.writer(fh)
+            out.writerow(["sheet", "rows", *MANIFEST_COLUMNS])
+            for sheet, result in summary:
+                entry = manifest.get(sheet, {})
+                out.writerow([
+                    sheet, result if isinstance(result, int) else "ERROR",
+                    *(entry.get(column, "") for column in MANIFEST_COLUMNS),
+                ])
+
+
+class CsvExport(_DirectoryExport):
+    """<path>/<sheet>.csv, UTF-8, values formatted as in the xlsx export."""
+
+    def write_sheet(self, sheet, fields, chunks):
+        count = 0
+        with open(os.path.join(self.path, f"{sheet}.csv"), "w", newline="", encoding="utf-8") as fh:
+            out = csv.writer(fh)
+            out.writerow([f.name for f in fields])
+            for chunk in chunks:
+                out.writerows([cell_value(v) for v in row] for row in chunk)
+                count += len(chunk)
+        return count
+
+
+INTEGER_TYPES = {
+    "AutoField", "BigAutoField", "SmallAutoField",
+    "IntegerField", "BigIntegerField", "SmallIntegerField",
+    "PositiveIntegerField", "PositiveBigIntegerField", "PositiveSmallIntegerField",
+}
+
+
+def _parquet_column(field, values):
+    """One typed column; the type depends only on the field, so every part has the same schema."""
+    target = field.target_field if field.is_relation else field
+    kind   = target.get_internal_type()
+    if kind in INTEGER_TYPES:
+        return pd.array(values, dtype="Int64")
+    if kind == "FloatField":
+        return pd.array(values, dtype="Float64")
+    if kind == "BooleanField":
+        return pd.array(values, dtype="boolean")
+    if kind == "DateTimeField":
+        stamps = pd.to_datetime(pd.Series(values, dtype=object), utc=True)
+        return stamps.astype("datetime64[us, UTC]").array
+    if kind == "JSONField":
+        values = [None if v is None else json.dumps(v) for v in values]
+    else:
+        values = [None if v is None else (v.isoformat() if hasattr(v, "isoformat") else str(v))
+                  for v in values]
+    return pd.array(values, dtype="string")
+
+
+class ParquetExport(_DirectoryExport):
+    """
+    <path>/<sheet>/part-NNNNN.parquet, one file per chunk; read a sheet
+    back with pd.read_parquet("<path>/<sheet>"). Numbers, booleans and
+    timestamps keep their types; everything else is a string column.
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            try:
+                import fastparquet  # noqa: F401
+            except ImportError:
+                raise ImproperlyConfigured(
+                    "Parquet export needs pyarrow (or fastparquet): pip install pyarrow"
+                ) from None
+        super().__init__(path)
+
+    def write_sheet(self, sheet, fields, chunks):
+        folder = os.path.join(self.path, sheet)
+        os.makedirs(folder, exist_ok=True)
+        count = part = 0
+        for chunk in chunks:
+            self._write_part(folder, part, fields, chunk)
+            count += len(chunk)
+            part  += 1
+        if not part:
+            self._write_part(folder, 0, fields, [])     # keep the schema of an empty table
+        return count
+
+    def _write_part(self, folder, part, fields, rows):
+        columns = list(zip(*rows)) if rows else [()] * len(fields)
+        frame   = pd.DataFrame({
+            f.name: _parquet_column(f, list(values)) for f, values in zip(fields, columns)
+        })
+        frame.to_parquet(os.path.join(folder, f"part-{part:05d}.parquet"), index=False)
+
+
+WRITERS = {
+    "xlsx":    XlsxExport,
+    "csv":     CsvExport,
+    "parquet": ParquetExport,
+}
+
+
+# ─────────────────────────────────────────────────────────
+# Reading an export back (manage.py restore_export)
+# ─────────────────────────────────────────────────────────
+
+def _batched(columns, rows, chunk_size):
+    width = len(columns)
+    chunk = []
+    for row in rows:
+        chunk.append(tuple(row) + (None,) * (width - len(row)))
+        if len(chunk) >= chunk_size:
+            yield columns, chunk
+            chunk = []
+    if chunk:
+        yield columns, chunk
+
+
+class ExportReader:
+    """
+    An export written by any of the WRITERS. `manifest` lists its sheets
+    in the order they were written, as dicts of sheet, rows and
+    MANIFEST_COLUMNS (blank in exports made before there was a
+    manifest); chunks() streams one sheet back.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.wb   = None
+        keys      = ("sheet", "rows", *MANIFEST_COLUMNS)
+        if os.path.isdir(path):
+            with open(os.path.join(path, "index.csv"), newline="", encoding="utf-8") as fh:
+                self.manifest = [{key: row.get(key) or "" for key in keys} for row in csv.DictReader(fh)]
+            return
+
+        self.wb       = load_workbook(path, read_only=True)
+        self.manifest = []
+        for row in self.wb["Index"].iter_rows(min_row=5, values_only=True):
+            if row[0] in (None, "TOTAL"):
+                break
+            entry = dict.fromkeys(keys, "")
+            entry.update((key, str(value)) for key, value in zip(keys, row) if value is not None)
+            self.manifest.append(entry)
+
+    def chunks(self, sheet, chunk_size=CHUNK_ROWS):
+        """(column names, [row tuples]) for one sheet, up to chunk_size rows at a time."""
+        if self.wb is not None:
+            rows = self.wb[sheet[:31]].iter_rows(values_only=True)
+            yield from _batched(next(rows, ()), rows, chunk_size)
+            return
+
+        folder = os.path.join(self.path, sheet)
+        if os.path.isdir(folder):
+            for part in sorted(os.listdir(folder)):
+                frame = pd.read_parquet(os.path.join(folder, part))
+                frame = frame.astype(object).where(frame.notna(), None)
+                yield from _batched(tuple(frame.columns), frame.itertuples(index=False, name=None),
+                                    chunk_size)
+            return
+
+        with open(f"{folder}.csv", newline="", encoding="utf-8") as fh:
+            rows = csv.reader(fh)
+            yield from _batched(tuple(next(rows, ())), rows, chunk_size)
+
+    def close(self):
+        if self.wb is not None:
+            self.wb.close()
+
+
+def from_export(field, value):
+    """A value read back from an export, as `field` stores it."""
+    if value is None or value == "":
+        if field.null:
+            return None
+        return "" if field.empty_strings_allowed else None
+    if isinstance(field, models.JSONField):
+        if isinstance(value, str):
+            try:
+                return json.loads(value)
+            except ValueError:
+                return value
+        return value
+    if hasattr(value, "to_pydatetime"):
+        value = value.to_pydatetime()
+    target = field.target_field if field.is_relation else field
+    return target.to_python(value)
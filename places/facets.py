@@ -0,0 +1,146 @@
+from collections import Counter
+
+from django.db.models import Count, Q
+
+from .models import Category, Place
+
+# ─────────────────────────────────────────────────────────
+# Facet definitions
+# ─────────────────────────────────────────────────────────
+#
+# name → (request parameter, column, filter lookup).
+# Category is many-to-many, so a place contributes to every category it
+# is in; the other facets are plain columns.
+
+FACETS = {
+    'category':   ('category',   'category__slug', 'category__slug'),
+    'difficulty': ('difficulty', 'difficulty',     'difficulty'),
+    'safety':     ('safety',     'safety_rating',  'safety_rating'),
+    'district':   ('district',   'district',       'district'),
+}
+
+FACET_TITLES = {
+    'category':   'Category',
+    'difficulty': 'Difficulty',
+    'safety':     'Safety',
+    'district':   'District',
+}
+
+FACET_LABELS = {
+    'difficulty': dict(Place.DIFFICULTY_CHOICES),
+    'safety':     dict(Place.SAFETY_CHOICES),
+    'district':   dict(Place._meta.get_field('district').choices),
+}
+
+# Values in declared order; categories (and anything unlisted) sort by label.
+FACET_ORDER = {
+    'difficulty': [v for v, _ in Place.DIFFICULTY_CHOICES],
+    'safety':     [v for v, _ in reversed(Place.SAFETY_CHOICES)],
+}
+
+
+def parse_bbox(value):
+    """
+    "min_lng,min_lat,max_lng,max_lat" (the order Leaflet's
+    getBounds().toBBoxString() produces) → tuple of floats, or None.
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in (value or '').split(','))
+    except ValueError:
+        return None
+    if min_lat > max_lat or min_lng > max_lng:
+        return None
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def filter_bbox(queryset, bbox):
+    if not bbox:
+        return queryset
+    min_lng, min_lat, max_lng, max_lat = bbox
+    return queryset.filter(
+        latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng),
+    )
+
+
+def parse_facet_filters(params):
+    """{facet: value} for every facet selected in `params` (request.GET / query_params)."""
+    selected = {}
+    for name, (param, _, _) in FACETS.items():
+        value = params.get(param, '')
+        if not value:
+            continue
+        if name == 'safety':
+            try:
+                value = int(value)
+            except ValueError:
+                continue
+        selected[name] = value
+    return selected
+
+
+def apply_facet_filters(queryset, selected):
+    for name, value in selected.items():
+        queryset = queryset.filter(**{FACETS[name][2]: value})
+    return queryset
+
+
+# ─────────────────────────────────────────────────────────
+# Counting
+# ─────────────────────────────────────────────────────────
+
+def facet_counts(queryset, selected=None):
+    """
+    Counts for every facet value over `queryset` — already narrowed by the
+    text query and bbox, but NOT by the facet selections themselves.
+
+    One aggregate query: a conditional COUNT(DISTINCT pk) per facet value,
+    all taken in the same pass over the matching places. Each facet is
+    counted against the places that match all the *other* selected
+    facets, so picking "easy" still shows how many "moderate" places
+    there are instead of collapsing the list to one entry. Values come
+    from the field choices and the (small) category table.
+
+    Returns {facet: [{'value', 'label', 'count', 'selected'}, …]}.
+    """
+    selected = selected or {}
+    labels   = dict(FACET_LABELS, category=dict(Category.objects.values_list('slug', 'name')))
+    # Counted over the matching pks, so the ranking annotations and
+    # ordering of a search queryset stay out of the aggregate
+    base     = queryset.model.objects.filter(pk__in=queryset.order_by().values('pk'))
+
+    columns  = {}
+    for name, (_, _, lookup) in FACETS.items():
+        others = Q(**{FACETS[other][2]: value for other, value in selected.items() if other != name})
+        for i, value in enumerate(labels[name]):
+            alias          = f'{name}_{i}'
+            columns[alias] = (name, value, Count('pk', distinct=True, filter=Q(**{lookup: value}) & others))
+
+    totals = base.order_by().aggregate(**{alias: count for alias, (_, _, count) in columns.items()})
+    counts = {name: Counter() for name in FACETS}
+    for alias, (name, value, _) in columns.items():
+        if totals[alias]:
+            counts[name][value] = totals[alias]
+
+    return {
+        name: _buckets(name, counts[name], labels[name], selected.get(name))
+        for name in FACETS
+    }
+
+
+def _buckets(name, counter, labels, chosen):
+    if chosen is not None and chosen not in counter:
+        counter[chosen] = 0     # keep the active selection visible even when empty
+    order = FACET_ORDER.get(name)
+    if order:
+        values = [v for v in order if v in counter]
+    else:
+        values = sorted(counter, key=lambda v: str(labels.get(v, v)).lower())
+    return [
+        {
+            'value':    value,
+            'label':    str(labels.get(value, value)),
+            'count':    counter[value],
+            'selected': value == chosen,
+        }
+        for value in values
+    ]
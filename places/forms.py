@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.utils import timezone
+from PIL import Image
 from .models import (
     Place,
     Category,
@@ -17,6 +18,7 @@ from .models import (
     TourOffering,
     #   , AudioGuide, Report
 )
+from .upload_inspection import inspect_upload
 
 
 class PlaceForm(forms.ModelForm):
@@ -41,6 +43,7 @@ class PlaceForm(forms.ModelForm):
             "image",
             "difficulty",
             "safety_rating",
+            "district",
             "category",
             "accessibility_info",
             "best_time_to_visit",
@@ -96,6 +99,11 @@ class PlaceForm(forms.ModelForm):
                     "class": "w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-green-500"
                 }
             ),
+            "district": forms.Select(
+                attrs={
+                    "class": "w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-green-500"
+                }
+            ),
             "accessibility_info": forms.Textarea(
                 attrs={
                     "class": "w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-green-500",
@@ -175,16 +183,24 @@ class RegisterForm(UserCreationForm):
 
 
 class CheckInForm(forms.ModelForm):
+    # A plain FileField rather than ImageField: the photo is validated by
+    # inspect_upload() in the same read that hashes it and pulls its EXIF,
+    # instead of a separate Pillow pass. The result is kept on
+    # `self.inspection` for the rest of the check-in pipeline.
+    photo_proof = forms.FileField(
+        required=False,
+        widget=forms.FileInput(
+            attrs={
+                "class": "w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-green-500",
+                "accept": "image/*",
+            }
+        ),
+    )
+
     class Meta:
         model = CheckIn
         fields = ["photo_proof", "notes"]
         widgets = {
-            "photo_proof": forms.FileInput(
-                attrs={
-                    "class": "w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-green-500",
-                    "accept": "image/*",
-                }
-            ),
             "notes": forms.Textarea(
                 attrs={
                     "class": "w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-green-500",
@@ -194,6 +210,37 @@ class CheckInForm(forms.ModelForm):
             ),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inspection = None
+
+    def clean_photo_proof(self):
+        photo = self.cleaned_data.get("photo_proof")
+        if not photo:
+            return photo
+
+        inspection = inspect_upload(photo)
+        if not inspection.is_valid_image:
+            # Only a JPEG whose frame header lies beyond the bytes the
+            # inspector keeps gets a second, Pillow, read.
+            if inspection.format != "jpeg" or inspection.width or not _pillow_verifies(photo):
+                raise forms.ValidationError(
+                    forms.ImageField.default_error_messages["invalid_image"],
+                    code="invalid_image",
+                )
+        self.inspection = inspection
+        return photo
+
+
+def _pillow_verifies(upload):
+    try:
+        Image.open(upload).verify()
+        return True
+    except Exception:
+        return False
+    finally:
+        upload.seek(0)
+
 
 class TrailForm(forms.ModelForm):
     """
@@ -0,0 +1,201 @@
+import hashlib
+import logging
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from io import BytesIO
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+from tqdm import tqdm
+
+from .storage import ContentAddressedStorage, blob_extension, blob_name, is_blob_name
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS    = 8
+CHUNK_SIZE        = 1024 * 1024
+TRY_EXTENSIONS    = ('', '.jpg', '.jpeg', '.png', '.webp', '.gif')
+WEB_FORMATS       = {'JPEG', 'PNG', 'WEBP', 'GIF'}     # stored as they are
+TRANSCODE_QUALITY = 90                                # anything else becomes a JPEG
+
+
+# ─────────────────────────────────────────────────────────
+# Finding files
+# ─────────────────────────────────────────────────────────
+
+class ImageDirectory:
+    """
+    Case-insensitive index of an images folder, read with a single
+    os.scandir. find() resolves a spreadsheet's filename the way the
+    importers always have — as given, then with each of TRY_EXTENSIONS
+    appended — with dictionary lookups instead of a stat per attempt.
+    """
+
+    def __init__(self, root):
+        self.root  = root
+        self.files = {}
+        if os.path.isdir(root):
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        self.files.setdefault(entry.name.lower(), entry.path)
+
+    def __len__(self):
+        return len(self.files)
+
+    def find(self, filename):
+        """Path of the image for `filename`, or None."""
+        key = filename.strip().lower()
+        for ext in TRY_EXTENSIONS:
+            path = self.files.get(key if key.endswith(ext) else key + ext)
+            if path:
+                return path
+        return None
+
+
+# ─────────────────────────────────────────────────────────
+# Copying into storage
+# ─────────────────────────────────────────────────────────
+
+@dataclass
+class IngestReport:
+    names:      dict = field(default_factory=dict)    # key → stored name
+    errors:     dict = field(default_factory=dict)    # key → reason
+    blobs:      dict = field(default_factory=dict)    # stored blob name → (sha256, size)
+    copied:     int = 0
+    reused:     int = 0     # identical content already in storage
+    transcoded: int = 0
+
+
+def _sha256(fh):
+    sha  = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+        sha.update(chunk)
+        size += len(chunk)
+    fh.seek(0)
+    return sha.hexdigest(), size
+
+
+def _transcode(fh):
+    img = Image.open(fh)
+    img.load()
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    buf = BytesIO()
+    img.save(buf, format='JPEG', quality=TRANSCODE_QUALITY, optimize=True)
+    return buf.getvalue()
+
+
+def _ingest(storage, path, name):
+    """
+    Store one file (runs in a worker thread). Returns
+    (stored name, sha256, size, outcome) with outcome one of 'copied',
+    'reused' or 'transcoded'. Reference counts are left to the caller,
+    so workers never touch the database.
+    """
+    with open(path, 'rb') as fh:
+        try:
+            with Image.open(fh) as img:
+                fmt = img.format
+        except UnidentifiedImageError:
+            raise ValueError("not a recognised image format") from None
+        fh.seek(0)
+
+        if fmt not in WEB_FORMATS:
+            name    = os.path.splitext(name)[0] + '.jpg'
+            content = ContentFile(_transcode(fh))
+            outcome = 'transcoded'
+        else:
+            content = File(fh)
+            outcome = 'copied'
+
+        if not isinstance(storage, ContentAddressedStorage):
+            return storage.save(name, content), None, None, outcome
+
+        if outcome == 'copied':
+            # Hash first: content that is already stored is never copied
+            sha256, size = _sha256(fh)
+            target       = blob_name(sha256, blob_extension(name))
+            if storage.claim(target):
+                return target, sha256, size, 'reused'
+        return (*storage.put(name, content), outcome)
+
+
+def ingest_images(items, storage, workers=INGEST_WORKERS, progress=True):
+    """
+    Copy local images into `storage` in a thread pool.
+
+    `items` maps any key (a place name, a badge name…) to
+    (local path, upload name); the upload name is what the field's
+    upload_to produced. Each distinct path is read once however many keys
+    share it, and at most 2 × workers files are in flight at a time.
+
+    Returns an IngestReport. No references are counted here: the caller
+    knows which rows really end up pointing at a file, and counts those
+    with update_references() when it writes them.
+    """
+    report  = IngestReport()
+    by_path = {}
+    for key, (path, name) in items.items():
+        by_path.setdefault(path, (name, []))[1].append(key)
+
+    bar    = tqdm(total=len(by_path), unit='img', desc='Images', disable=not progress)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {}
+        queue   = iter(by_path.items())
+
+        def fill():
+            for path, (name, keys) in queue:
+                pending[pool.submit(_ingest, storage, path, name)] = (path, keys)
+                if len(pending) >= 2 * max(1, workers):
+                    break
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, keys = pending.pop(future)
+                bar.update(1)
+                try:
+                    name, sha256, size, outcome = future.result()
+                except (OSError, ValueError, Image.DecompressionBombError) as exc:
+                    logger.debug("Could not ingest %s: %s", path, exc)
+                    for key in keys:
+                        report.errors[key] = f"{os.path.basename(path)}: {exc}"
+                    continue
+                setattr(report, outcome, getattr(report, outcome) + 1)
+                if sha256 is not None:
+                    report.blobs[name] = (sha256, size)
+                for key in keys:
+                    report.names[key] = name
+            fill()
+    bar.close()
+    return report
+
+
+def update_references(storage, report, changes):
+    """
+    Count the blob references of rows being written with images from
+    `report`. `changes` is [(old name, new name)] for the rows actually
+    created or updated. Call it inside the transaction that writes them,
+    so a rollback takes the counts with it.
+
+    A row that keeps its image counts nothing. A row that moves to a new
+    image gains a reference to the new blob and releases the old one.
+    The release happens after commit, because it can delete the file.
+    Legacy (non-blob) names are never deleted, as before.
+    """
+    if not isinstance(storage, ContentAddressedStorage):
+        return
+    added = Counter(new for old, new in changes if new and new != old and new in report.blobs)
+    for name, count in added.items():
+        sha256, size = report.blobs[name]
+        storage.add_reference(name, sha256, size, count=count)
+    released = [old for old, new in changes if old and old != new and is_blob_name(old)]
+    if released:
+        transaction.on_commit(lambda: [storage.delete(name) for name in released])
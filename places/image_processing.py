@@ -0,0 +1,237 @@
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+POOL_WORKERS   = min(4, os.cpu_count() or 1)
+MAX_PENDING    = 32         # queued + running jobs; beyond this work runs in the caller
+AVATAR_SIZE    = 400
+AVATAR_QUALITY = 85
+
+# EXIF orientations whose stored pixels are rotated 90° from how they display
+_TRANSPOSED = {5, 6, 7, 8}
+
+
+# ─────────────────────────────────────────────────────────
+# Decoding
+# ─────────────────────────────────────────────────────────
+
+def open_image(fp, min_width=None, min_height=None):
+    """
+    Decode an image, upright (EXIF orientation applied), at no less than
+    min_width × min_height as displayed.
+
+    JPEGs are decoded through Pillow's draft mode: the decoder scales by
+    1/2, 1/4 or 1/8 in the DCT itself, so a 12-megapixel phone photo
+    headed for a 400px avatar never materialises at full size.
+    """
+    img = Image.open(fp)
+    if img.format == 'JPEG' and (min_width or min_height):
+        width, height = img.size
+        if img.getexif().get(0x0112) in _TRANSPOSED:
+            width, height = height, width
+        scale = max((min_width or 0) / width, (min_height or 0) / height)
+        if scale < 1:
+            target = (math.ceil(img.width * scale), math.ceil(img.height * scale))
+            img.draft(img.mode, target)
+    img.load()
+    return ImageOps.exif_transpose(img)
+
+
+def avatar_jpeg(fp, size=AVATAR_SIZE, quality=AVATAR_QUALITY):
+    """Centre-cropped square JPEG bytes, at most size × size."""
+    img = open_image(fp, min_width=size, min_height=size)
+    if img.mode in ('RGBA', 'P', 'LA'):
+        img        = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        img        = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    w, h = img.size
+    side = min(w, h)
+    left = (w - side) // 2
+    top  = (h - side) // 2
+    img  = img.crop((left, top, left + side, top + side))
+    img.thumbnail((size, size), Image.LANCZOS)
+
+    buf = BytesIO()
+    img.save(buf, format='JPEG', quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+# ─────────────────────────────────────────────────────────
+# Worker pool
+# ─────────────────────────────────────────────────────────
+#
+# Jobs receive storage names, never file objects: workers open the file
+# from storage themselves, so nothing large is pickled across processes.
+# Workers are spawned rather than forked — forking a threaded web server
+# process can copy held locks — and set Django up once each.
+
+_pool      = None
+_pool_lock = threading.Lock()
+_slots     = threading.BoundedSemaphore(MAX_PENDING)
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def process_pool(max_workers):
+    """A spawned, Django-ready pool — also used by the batch management commands."""
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_worker,
+    )
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = process_pool(POOL_WORKERS)
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def _run_inline(fn, args):
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+def submit(fn, *args, on_done=None):
+    """
+    Run fn(*args) in the image pool; on_done(future) is called in this
+    process once it finishes. When MAX_PENDING jobs are already queued
+    (or the pool has died) the job runs in the calling thread instead,
+    so a burst of uploads degrades to the old synchronous behaviour
+    rather than growing an unbounded queue.
+    """
+    future = None
+    caller = threading.get_ident()
+    if _slots.acquire(blocking=False):
+        try:
+            future = _get_pool().submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as exc:
+            logger.warning("Image pool unavailable, processing inline: %s", exc)
+            _reset_pool()
+            _slots.release()
+        else:
+            future.add_done_callback(lambda _: _slots.release())
+    if future is None:
+        future = _run_inline(fn, args)
+    if on_done:
+        future.add_done_callback(lambda f: _callback(on_done, f, caller))
+    return future
+
+
+def _callback(on_done, future, caller):
+    try:
+        on_done(future)
+    except Exception:
+        logger.exception("Image job callback failed")
+    finally:
+        # Callbacks normally run on the pool's manager thread; give back
+        # the DB connection they opened there.
+        if threading.get_ident() != caller:
+            connection.close()
+
+
+# ─────────────────────────────────────────────────────────
+# Jobs (run inside the workers)
+# ─────────────────────────────────────────────────────────
+
+def variants_job(name):
+    from .image_variants import generate_variants
+    return generate_variants(name)
+
+
+def avatar_job(name):
+    """Store the processed avatar; returns its storage name."""
+    with default_storage.open(name, 'rb') as fh:
+        data = avatar_jpeg(fh)
+    # Content-addressed storage keeps only the extension of this name
+    stem, _ = os.path.splitext(os.path.basename(name))
+    return default_storage.save(f"avatars/{stem}_{AVATAR_SIZE}.jpg", ContentFile(data))
+
+
+def exif_job(name):
+    """The stored photo's exif_info dict, or None when it can't be read."""
+    from .upload_inspection import read_exif
+    try:
+        with default_storage.open(name, 'rb') as fh:
+            return read_exif(fh)
+    except OSError:
+        return None
+
+
+def dhash_job(name):
+    from .perceptual_hash import dhash
+    with default_storage.open(name, 'rb') as fh:
+        return dhash(fh)
+
+
+# ─────────────────────────────────────────────────────────
+# Scheduling (called from requests and signals)
+# ─────────────────────────────────────────────────────────
+
+def generate_variants_later(name):
+    """Build responsive variants for `name` once the current transaction commits."""
+    from .image_variants import bump_variant_owners
+
+    def done(future):
+        if future.exception():
+            logger.warning("Variant generation failed for %s: %s", name, future.exception())
+        elif future.result():
+            bump_variant_owners([name])
+
+    transaction.on_commit(lambda: submit(variants_job, name, on_done=done))
+
+
+def process_avatar_later(profile, replaced=''):
+    """
+    Swap `profile.avatar` — saved as uploaded — for the cropped, resized
+    JPEG once a worker has produced it. The raw upload is shown meanwhile.
+    `replaced` is the previous avatar's name, deleted with the upload.
+    """
+    from .models import UserProfile
+
+    upload = profile.avatar.name
+
+    def done(future):
+        if future.exception():
+            logger.warning("Avatar processing failed for %s: %s", upload, future.exception())
+            return
+        processed = future.result()
+        if UserProfile.objects.filter(pk=profile.pk, avatar=upload).update(avatar=processed):
+            for name in (upload, replaced):
+                if name:
+                    default_storage.delete(name)
+        else:
+            default_storage.delete(processed)   # a newer upload already replaced this one
+
+    transaction.on_commit(lambda: submit(avatar_job, upload, on_done=done))
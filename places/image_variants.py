@@ -0,0 +1,235 @@
+import logging
+import os
+import threading
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .image_processing import open_image
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────────────────
+# Presets
+# ─────────────────────────────────────────────────────────
+#
+# Every processed upload gets one file per (width, format), stored next to
+# the original:  places/ella/ella_1a2b3c4d.jpg
+#             →  places/ella/ella_1a2b3c4d__w400.jpg
+#             →  places/ella/ella_1a2b3c4d__w400.webp
+# Names are derived, so serving a variant needs no database lookup.
+# Originals narrower than a preset are re-encoded at their own width
+# (never upscaled), so every preset name always exists once processed.
+
+VARIANT_WIDTHS = (200, 400, 800, 1600)
+VARIANT_FORMATS = {
+    # format: (extension, Pillow save options)
+    'jpeg': ('jpg',  {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('webp', {'format': 'WEBP', 'quality': 78, 'method': 4}),
+}
+DEFAULT_WIDTH = 800          # <img src> fallback for browsers without srcset
+MARKER_WIDTH  = VARIANT_WIDTHS[-1]
+MARKER_FORMAT = 'webp'       # written last — its presence means the set is complete
+
+
+def image_fields():
+    # Imported lazily: worker processes in the backfill pool only need storage.
+    from .models import Badge, CheckIn, Place, PlaceImage, TourPackage, Trail
+    return {
+        Place:       ('image',),
+        PlaceImage:  ('image',),
+        CheckIn:     ('photo_proof',),
+        Trail:       ('cover_image',),
+        TourPackage: ('image',),
+        Badge:       ('image',),
+    }
+
+
+def bump_variant_owners(names):
+    """
+    Bump the cache version of every model holding one of `names`, once
+    their variants are written: image_variants is serialized with the
+    row, but writing files sends no signal, so cached sections and ETags
+    would keep the pre-variant payload. Gallery images render as part of
+    their place, so PlaceImage bumps Place.
+    """
+    from django.db.models import Q
+
+    from .caching import bump_model_version
+    from .models import Place, PlaceImage
+
+    names   = sorted(set(names))
+    pending = dict(image_fields())
+    for start in range(0, len(names), 500):
+        chunk = names[start:start + 500]
+        for model, fields in list(pending.items()):
+            holds = Q()
+            for field in fields:
+                holds |= Q(**{f'{field}__in': chunk})
+            if model.objects.filter(holds).exists():
+                bump_model_version(Place if model is PlaceImage else model)
+                del pending[model]
+
+
+def variant_name(name, width, fmt):
+    stem, _ = os.path.splitext(name)
+    return f"{stem}__w{width}.{VARIANT_FORMATS[fmt][0]}"
+
+
+def is_variant_name(name):
+    stem, _ = os.path.splitext(name)
+    _, sep, width = stem.rpartition('__w')
+    return bool(sep) and width.isdigit()
+
+
+# ─────────────────────────────────────────────────────────
+# Generation
+# ─────────────────────────────────────────────────────────
+
+def _flatten(img):
+    """RGB for JPEG; transparency composited onto white."""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    return img.convert('RGB') if img.mode != 'RGB' else img
+
+
+def render_variants(img):
+    """
+    {(width, fmt): bytes} for every preset of an already-decoded image.
+    Widest first, each step downscaled from the previous one rather than
+    from the full-size original.
+    """
+    img        = ImageOps.exif_transpose(img)
+    keep_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+    base       = img.convert('RGBA') if keep_alpha else _flatten(img)
+
+    out = {}
+    for width in sorted(VARIANT_WIDTHS, reverse=True):
+        if base.width > width:
+            base = base.resize(
+                (width, max(1, round(base.height * width / base.width))), Image.LANCZOS
+            )
+        for fmt, (_, options) in VARIANT_FORMATS.items():
+            frame = _flatten(base) if fmt == 'jpeg' else base
+            buf   = BytesIO()
+            frame.save(buf, **options)
+            out[(width, fmt)] = buf.getvalue()
+    return out
+
+
+def _write(storage, name, data):
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(data))
+
+
+def generate_variants(name, storage=None):
+    """
+    Build every preset for the stored file `name`. Returns the number of
+    files written (0 if the original is missing or isn't an image).
+    """
+    storage = storage or default_storage
+    try:
+        with storage.open(name, 'rb') as fh:
+            img = open_image(fh, min_width=MARKER_WIDTH)    # JPEGs decode pre-shrunk
+    except (FileNotFoundError, OSError, Image.DecompressionBombError) as exc:
+        logger.warning("Skipping variants for %s: %s", name, exc)
+        return 0
+
+    rendered = render_variants(img)
+    marker   = (MARKER_WIDTH, MARKER_FORMAT)
+    for key in sorted(rendered, key=lambda k: k == marker):   # marker last
+        _write(storage, variant_name(name, *key), rendered[key])
+    _known.add(name)
+    return len(rendered)
+
+
+def has_variants(name, storage=None):
+    if name in _known:
+        return True
+    storage = storage or default_storage
+    if storage.exists(variant_name(name, MARKER_WIDTH, MARKER_FORMAT)):
+        _known.add(name)
+        return True
+    return False
+
+
+def delete_variants(name, storage=None):
+    storage = storage or default_storage
+    for width in VARIANT_WIDTHS:
+        for fmt in VARIANT_FORMATS:
+            vname = variant_name(name, width, fmt)
+            if storage.exists(vname):
+                storage.delete(vname)
+    _known.discard(name)
+
+
+class _KnownSet:
+    """Process-local memo of originals whose variants are on disk (positives only)."""
+
+    def __init__(self, limit=50_000):
+        self.limit = limit
+        self.names = set()
+        self.lock  = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def add(self, name):
+        with self.lock:
+            if len(self.names) >= self.limit:
+                self.names.clear()
+            self.names.add(name)
+
+    def discard(self, name):
+        with self.lock:
+            self.names.discard(name)
+
+
+_known = _KnownSet()
+
+
+# ─────────────────────────────────────────────────────────
+# URLs for templates and serializers
+# ─────────────────────────────────────────────────────────
+
+def variant_urls(fieldfile, build_url=None):
+    """
+    srcset-ready URLs for an ImageField value, or None when it has no
+    variants yet (callers fall back to the original).
+
+        {'src': …800w jpeg…, 'srcset': "… 200w, … 400w, …",
+         'webp_srcset': "…", 'thumbnail': …200w jpeg…}
+
+    `build_url` makes them absolute (request.build_absolute_uri).
+    """
+    if not fieldfile or not fieldfile.name or not has_variants(fieldfile.name, fieldfile.storage):
+        return None
+    build_url = build_url or (lambda u: u)
+
+    def url(width, fmt):
+        return build_url(fieldfile.storage.url(variant_name(fieldfile.name, width, fmt)))
+
+    return {
+        'src':         url(DEFAULT_WIDTH, 'jpeg'),
+        'thumbnail':   url(VARIANT_WIDTHS[0], 'jpeg'),
+        'srcset':      ', '.join(f"{url(w, 'jpeg')} {w}w" for w in VARIANT_WIDTHS),
+        'webp_srcset': ', '.join(f"{url(w, 'webp')} {w}w" for w in VARIANT_WIDTHS),
+    }
+
+
+def iter_image_names():
+    """(model label, pk, field, name) for every stored image the pipeline covers."""
+    for model, fields in image_fields().items():
+        for field in fields:
+            rows = (
+                model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                .order_by('pk').values_list('pk', field)
+            )
+            for pk, name in rows.iterator(chunk_size=2000):
+                yield model._meta.label_lower, pk, field, name
@@ -0,0 +1,187 @@
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+from django.utils.text import slugify
+
+VALID_DIFFICULTIES = ('easy', 'moderate', 'challenging')
+VALID_STATUSES     = ('approved', 'pending', 'rejected')
+DEFAULT_SAFETY     = 3
+
+LAT_RANGE = (-90.0, 90.0)
+LNG_RANGE = (-180.0, 180.0)
+
+# Normalised column → what the validated frame's itertuples() exposes
+PLACE_FIELDS = (
+    'row', 'name', 'description', 'legends_stories', 'latitude', 'longitude',
+    'difficulty', 'accessibility_info', 'best_time_to_visit', 'safety_rating',
+    'status', 'categories', 'image_filename',
+)
+
+
+@dataclass(frozen=True)
+class ImportIssue:
+    """
+    One problem found in a sheet. `row` is the spreadsheet row number
+    (the header is row 1). Errors keep the row out of the import;
+    warnings are fixed up (a default applied, a bad slug dropped).
+    """
+    sheet:   str
+    row:     int
+    name:    str
+    column:  str
+    value:   str
+    message: str
+    level:   str = 'error'
+
+
+def issues_frame(issues):
+    """The issues as a DataFrame, e.g. to write out with to_csv()."""
+    columns = list(ImportIssue.__dataclass_fields__)
+    return pd.DataFrame([asdict(issue) for issue in issues], columns=columns)
+
+
+# ─────────────────────────────────────────────────────────
+# Column normalisers (whole Series at a time)
+# ─────────────────────────────────────────────────────────
+
+def clean_text(series):
+    """Stripped strings; blanks, NaN and the literal 'nan' become <NA>."""
+    text = series.astype('string').str.strip()
+    return text.mask(text.isna() | (text == '') | (text.str.lower() == 'nan'))
+
+
+def clean_choice(series, choices, default):
+    """(lower-cased values, mask of values that weren't valid and got `default`)."""
+    text    = clean_text(series).str.lower()
+    invalid = text.notna() & ~text.isin(choices)
+    return text.where(text.isin(choices), default), invalid
+
+
+def parse_slugs(series):
+    """One list of slugified, comma-separated values per row."""
+    parts = clean_text(series).fillna('').str.split(',').explode().str.strip()
+    parts = parts[parts.fillna('') != '']
+    slugs = parts.map({value: slugify(value) for value in parts.unique()})
+    lists = slugs.groupby(level=0).agg(list)
+    return lists.reindex(series.index).apply(lambda v: v if isinstance(v, list) else [])
+
+
+# ─────────────────────────────────────────────────────────
+# Places sheet
+# ─────────────────────────────────────────────────────────
+
+def validate_places(df, columns, sheet='Places', known_categories=None,
+                    default_difficulty='easy'):
+    """
+    Normalise and check a places sheet in one vectorised pass.
+
+    `columns` maps the logical names (COL in the importers) to the
+    sheet's headers. Returns (clean, issues): `clean` has the
+    PLACE_FIELDS columns and only the rows fit to import; `issues` is a
+    list of ImportIssue covering every row, kept or not.
+    """
+    index = df.index
+
+    def column(key):
+        header = columns[key]
+        return df[header] if header in df.columns else pd.Series(pd.NA, index=index, dtype=object)
+
+    out = pd.DataFrame({
+        'row':                index + 2,
+        'name':               clean_text(column('name')),
+        'description':        clean_text(column('description')).fillna(''),
+        'legends_stories':    clean_text(column('legends')).fillna(''),
+        'accessibility_info': clean_text(column('accessibility')).fillna(''),
+        'best_time_to_visit': clean_text(column('best_time')).fillna(''),
+        'image_filename':     clean_text(column('image_filename')).fillna(''),
+    }, index=index)
+
+    issues = []
+
+    def report(mask, key, values, message, level='error'):
+        for row, name, value in zip(out['row'][mask], out['name'][mask], values[mask]):
+            issues.append(ImportIssue(
+                sheet=sheet, row=int(row), name='' if pd.isna(name) else str(name),
+                column=columns.get(key, key), value='' if pd.isna(value) else str(value),
+                message=message, level=level,
+            ))
+
+    rejected = out['name'].isna()
+    report(rejected, 'name', out['name'], 'missing name')
+
+    # ── Coordinates: blank means 0, as before; junk or out of range rejects
+    for key, field, (low, high) in (('latitude', 'latitude', LAT_RANGE),
+                                    ('longitude', 'longitude', LNG_RANGE)):
+        raw     = column(key)
+        number  = pd.to_numeric(raw, errors='coerce')
+        blank   = clean_text(raw).isna()
+        invalid = number.isna() & ~blank
+        outside = number.notna() & ~number.between(low, high)
+        report(invalid, key, raw, f'{field} is not a number')
+        report(outside, key, raw, f'{field} outside {low:g}..{high:g}')
+        rejected |= invalid | outside
+        out[field] = number.fillna(0.0).astype(float)
+
+    # ── Choices: invalid values fall back to a default with a warning
+    out['difficulty'], bad = clean_choice(column('difficulty'), VALID_DIFFICULTIES, default_difficulty)
+    report(bad, 'difficulty', column('difficulty'),
+           f"invalid difficulty — defaulting to '{default_difficulty}'", 'warning')
+
+    out['status'], bad = clean_choice(column('status'), VALID_STATUSES, 'pending')
+    report(bad, 'status', column('status'), "invalid status — defaulting to 'pending'", 'warning')
+
+    safety = pd.to_numeric(column('safety'), errors='coerce')
+    safety = safety.where(safety.isna(), np.floor(safety))
+    bad    = ~safety.between(1, 5) & clean_text(column('safety')).notna()
+    report(bad, 'safety', column('safety'),
+           f'safety rating not 1–5 — defaulting to {DEFAULT_SAFETY}', 'warning')
+    out['safety_rating'] = safety.where(~bad).fillna(DEFAULT_SAFETY).astype(int)
+
+    # ── Categories: unknown slugs are dropped from the row, not fatal
+    out['categories'] = parse_slugs(column('categories'))
+    if known_categories is not None:
+        slugs   = out['categories'].explode().dropna()
+        unknown = slugs[~slugs.isin(known_categories)]
+        if len(unknown):
+            mask   = pd.Series(False, index=index)
+            values = pd.Series('', index=index, dtype=object)
+            for idx, group in unknown.groupby(level=0):
+                mask[idx]   = True
+                values[idx] = ', '.join(group)
+            report(mask, 'categories', values, 'category slug not found — skipped', 'warning')
+            known = set(known_categories)
+            out.loc[mask, 'categories'] = out.loc[mask, 'categories'].apply(
+                lambda v: [slug for slug in v if slug in known]
+            )
+
+    # ── Duplicate names: the last row wins, as a row-by-row import would
+    named     = out['name'].notna() & ~rejected
+    last_row  = out['row'][named].groupby(out['name'][named]).transform('last')
+    duplicate = pd.Series(False, index=index)
+    duplicate[named] = out['row'][named] != last_row
+    report(duplicate, 'name', out['name'],
+           'duplicate name — a later row replaces this one', 'warning')
+    rejected |= duplicate
+
+    clean = out.loc[~rejected, list(PLACE_FIELDS)]
+    return clean, issues
+
+
+def write_issues(command, issues, label, path=None):
+    """
+    Print `issues` through a management command's stderr and, with
+    `path`, save them all as CSV. Returns the number of errors.
+    """
+    errors = 0
+    for issue in issues:
+        errors += issue.level == 'error'
+        text = (
+            f"  [{label}] Row {issue.row} '{issue.name}': {issue.message}"
+            + (f" ({issue.column}={issue.value!r})" if issue.value else '')
+        )
+        command.stderr.write(text, style_func=command.style.WARNING if issue.level == 'warning' else None)
+    if path:
+        issues_frame(issues).to_csv(path, index=False)
+        command.stdout.write(f"  {len(issues)} issue(s) written to {path}")
+    return errors
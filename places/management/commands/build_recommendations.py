@@ -0,0 +1,56 @@
+# Run with:
+#   python manage.py build_recommendations
+# Tighter memory (fewer check-in entries expanded at once):
+#   python manage.py build_recommendations --max-gather 500000
+#
+# Schedule nightly; check-ins between runs only show up after the next build.
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuild "people who visited X also visited" from check-in co-occurrence'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=20,
+            help='Similar places kept per place',
+        )
+        parser.add_argument(
+            '--min-co-visits',
+            type=int,
+            default=2,
+            help='Ignore pairs checked in together by fewer users than this',
+        )
+        parser.add_argument(
+            '--max-gather',
+            type=int,
+            default=4_000_000,
+            help='Upper bound on check-in entries expanded at once (memory budget)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=50_000,
+            help='Check-ins fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        from places.recommendations import build_recommendations
+
+        def progress(done, total):
+            self.stdout.write(f'  {done}/{total} places')
+
+        self.stdout.write('Building co-visit recommendations...')
+        places, rows = build_recommendations(
+            top_k=max(1, options['top_k']),
+            min_co_visits=max(1, options['min_co_visits']),
+            max_gather=max(1, options['max_gather']),
+            chunk_size=max(1, options['chunk_size']),
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {rows} similarity row(s) for {places} place(s).'
+        ))
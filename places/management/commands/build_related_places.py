@@ -0,0 +1,30 @@
+# Run with:
+#   python manage.py build_related_places
+# Or with smaller batches on a memory-tight box:
+#   python manage.py build_related_places --batch-size 64
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed related-places table for every approved place'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=256,
+            help='Places scored per step (memory is batch size x number of places)',
+        )
+
+    def handle(self, *args, **options):
+        from places.related import TOP_K, rebuild_related_places
+
+        def progress(done, total):
+            self.stdout.write(f'  {done}/{total} places scored')
+
+        self.stdout.write(f'Building top-{TOP_K} related places...')
+        written = rebuild_related_places(
+            batch_size=max(1, options['batch_size']), progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Done. {written} neighbour row(s) written.'))
@@ -0,0 +1,140 @@
+# Run with:
+#   python manage.py content_address_media --dry-run
+#   python manage.py content_address_media
+#
+# Moves media stored under the old upload_to paths (places/<slug>/…,
+# checkins/<user>/<place>/…) into the content-addressed store
+# (blobs/ab/cd/<sha256>.<ext>), repoints every file field, and deletes
+# identical copies. Safe to re-run: files are linked into place first and
+# the originals only removed once the database points at the blob.
+
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+def _has_updated_at(model):
+    return any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+
+class Command(BaseCommand):
+    help = 'Move legacy media to content-addressed storage and report space reclaimed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Hash and report without moving files or rewriting paths',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Distinct files adopted (and their rows rewritten) per transaction',
+        )
+
+    def handle(self, *args, **options):
+        from django.core.files.storage import storages
+        from django.core.management.base import CommandError
+        from django.template.defaultfilters import filesizeformat
+
+        from places.storage import BLOB_PREFIX, ContentAddressedStorage, file_fields
+
+        self.storage = storages['default']
+        if not isinstance(self.storage, ContentAddressedStorage):
+            raise CommandError('STORAGES["default"] is not places.storage.ContentAddressedStorage')
+        self.dry_run = options['dry_run']
+        batch_size   = max(1, options['batch_size'])
+
+        # legacy name → [(model, field, pk), …]
+        references = defaultdict(list)
+        for model, field in file_fields():
+            rows = (
+                model.objects.exclude(**{field: ''})
+                .exclude(**{f'{field}__isnull': True})
+                .exclude(**{f'{field}__startswith': f'{BLOB_PREFIX}/'})
+                .values_list('pk', field)
+            )
+            for pk, name in rows.iterator(chunk_size=2000):
+                references[name].append((model, field, pk))
+
+        names = sorted(references)
+        self.stdout.write(f'{len(names)} legacy file(s) referenced by '
+                          f'{sum(map(len, references.values()))} row(s).')
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN — nothing will be moved.'))
+
+        self.adopted = self.duplicates = self.missing = self.reclaimed = 0
+        self.seen    = set()
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            self._migrate({name: references[name] for name in batch})
+            self.stdout.write(f'  {min(start + batch_size, len(names))}/{len(names)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {self.adopted} file(s) adopted, {self.duplicates} duplicate(s), '
+            f'{self.missing} missing; {filesizeformat(self.reclaimed)} reclaimed'
+            + (' (projected)' if self.dry_run else '') + '.'
+        ))
+        if self.adopted and not self.dry_run:
+            # Sheets whose deltas go by created_at don't see the new paths
+            self.stdout.write('Take a full export (export_all_data) before the next delta.')
+
+    # ============================================================
+
+    def _migrate(self, references):
+        import hashlib
+
+        from django.db import transaction
+
+        from places.image_variants import delete_variants
+        from places.storage import blob_extension, blob_name
+
+        moved   = {}                        # legacy name → (blob, sha256, size)
+        updates = defaultdict(list)         # (model, field) → [(pk, blob)]
+        for name, rows in references.items():
+            if not self.storage.exists(name):
+                self.missing += 1
+                self.stderr.write(f'  missing: {name}')
+                continue
+
+            if self.dry_run:
+                sha = hashlib.sha256()
+                with self.storage.open(name, 'rb') as fh:
+                    for chunk in iter(lambda: fh.read(64 * 1024), b''):
+                        sha.update(chunk)
+                target    = blob_name(sha.hexdigest(), blob_extension(name))
+                size      = self.storage.size(name)
+                duplicate = target in self.seen or self.storage.exists(target)
+                self.seen.add(target)
+            else:
+                target, digest, size, duplicate = self.storage.adopt(name)
+                moved[name] = (target, digest, size)
+                for model, field, pk in rows:
+                    updates[(model, field)].append((pk, target))
+
+            self.adopted += 1
+            if duplicate:
+                self.duplicates += 1
+                self.reclaimed  += size
+
+        if self.dry_run or not moved:
+            return
+
+        # bulk_update skips auto_now; delta exports go by updated_at
+        stamp = timezone.now()
+        with transaction.atomic():
+            for (model, field), pairs in updates.items():
+                stamped = {'updated_at': stamp} if _has_updated_at(model) else {}
+                model.objects.bulk_update(
+                    [model(pk=pk, **{field: target}, **stamped) for pk, target in pairs],
+                    [field, *stamped], batch_size=1000,
+                )
+            for name, (target, digest, size) in moved.items():
+                self.storage.add_reference(target, digest, size, count=len(references[name]))
+
+        # Only now that nothing points at them: drop the legacy copies
+        for name in moved:
+            delete_variants(name, self.storage)
+            self.storage.delete(name)
@@ -0,0 +1,261 @@
+# Run with:
+#   python manage.py gc_media --dry-run
+#   python manage.py gc_media
+# Move orphans aside instead of deleting them:
+#   python manage.py gc_media --quarantine /var/lib/ghostpin/orphaned-media
+#
+# Deleting a place, photo, check-in or trail leaves its files behind. This
+# walks MEDIA_ROOT and removes every file no file field references any
+# more (responsive variants go with their original), and corrects the
+# MediaBlob reference counts.
+#
+# Memory stays bounded on millions of files: referenced names are kept as
+# a sorted array of 64-bit hashes, and the tree is checked against it in
+# batches as os.scandir yields entries. A hash collision can only keep an
+# orphan, never delete a referenced file.
+
+import hashlib
+import os
+import shutil
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+VARIANT_KEY = '__w'     # variants are matched on their original's stem
+
+
+def _key(name):
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), 'big')
+
+
+def _keys(names):
+    return np.fromiter((_key(name) for name in names), dtype=np.uint64, count=len(names))
+
+
+def _scan(root, skip):
+    """Every regular file below root (os.DirEntry), depth first, without following links."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path not in skip:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+class Command(BaseCommand):
+    help = 'Delete (or quarantine) media files nothing references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report orphans without touching them',
+        )
+        parser.add_argument(
+            '--quarantine',
+            metavar='DIR',
+            help='Move orphans into DIR (keeping their relative paths) instead of deleting them',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=24,
+            help='Hours since last modification before an unreferenced file counts as orphaned',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Threads deleting or moving files in parallel',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Files checked (and removed) per batch',
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+        from django.template.defaultfilters import filesizeformat
+
+        from places.image_variants import is_variant_name
+
+        self.dry_run    = options['dry_run']
+        self.quarantine = os.path.abspath(options['quarantine']) if options['quarantine'] else None
+        self.root       = os.path.abspath(settings.MEDIA_ROOT)
+        self.is_variant = is_variant_name
+        cutoff          = time.time() - options['min_age'] * 3600
+        batch_size      = max(1, options['batch_size'])
+
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN — nothing will be removed.'))
+
+        self._recount()
+
+        self.referenced = self._referenced()
+        self.stdout.write(f'{len(self.referenced)} referenced name(s) loaded.')
+
+        self.scanned = self.orphans = self.freed = self.failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            batch = []
+            for entry in _scan(self.root, skip={self.quarantine}):
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    self._collect(batch, cutoff, pool)
+                    batch = []
+            if batch:
+                self._collect(batch, cutoff, pool)
+
+        verb = 'would be removed' if self.dry_run else (
+            'quarantined' if self.quarantine else 'deleted')
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {self.scanned} file(s) scanned, {self.orphans} orphan(s) {verb} '
+            f'({filesizeformat(self.freed)}), {self.failed} failed.'
+        ))
+
+    # ============================================================
+    # Reference set
+    # ============================================================
+
+    def _referenced(self):
+        """Sorted, unique hashes of every referenced name and variant stem."""
+        from places.storage import file_fields
+
+        parts, chunk = [], []
+        for model, field in file_fields():
+            rows = (
+                model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                .values_list(field, flat=True)
+            )
+            for name in rows.iterator(chunk_size=5000):
+                chunk.append(name)
+                chunk.append(os.path.splitext(name)[0] + VARIANT_KEY)
+                if len(chunk) >= 100000:
+                    parts.append(_keys(chunk))
+                    chunk = []
+        parts.append(_keys(chunk))
+        return np.unique(np.concatenate(parts))
+
+    def _lookup_key(self, name):
+        if self.is_variant(name):
+            stem = os.path.splitext(name)[0]
+            return stem[:stem.rindex(VARIANT_KEY)] + VARIANT_KEY
+        return name
+
+    # ============================================================
+    # Sweep
+    # ============================================================
+
+    def _collect(self, entries, cutoff, pool):
+        from places.models import MediaBlob
+        from places.storage import is_blob_name
+
+        self.scanned += len(entries)
+        names = [os.path.relpath(entry.path, self.root).replace(os.sep, '/') for entry in entries]
+        keys  = _keys([self._lookup_key(name) for name in names])
+        index = np.searchsorted(self.referenced, keys).clip(max=max(len(self.referenced) - 1, 0))
+        found = (self.referenced[index] == keys) if len(self.referenced) else np.zeros(len(keys), bool)
+
+        orphans = []
+        for entry, name, referenced in zip(entries, names, found):
+            if referenced:
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            # Recent files may belong to an upload whose row isn't saved yet
+            if stat.st_mtime > cutoff:
+                continue
+            orphans.append((entry.path, name, stat.st_size))
+
+        if not orphans:
+            return
+        self.orphans += len(orphans)
+        if self.dry_run:
+            self.freed += sum(size for _, _, size in orphans)
+            for _, name, _ in orphans[:20]:
+                self.stdout.write(f'  {name}')
+            return
+
+        removed = []
+        for (path, name, size), ok in zip(orphans, pool.map(self._remove, orphans)):
+            if ok:
+                self.freed += size
+                removed.append(name)
+            else:
+                self.failed += 1
+        MediaBlob.objects.filter(name__in=[name for name in removed if is_blob_name(name)]).delete()
+        self.stdout.write(f'  {self.scanned} scanned, {self.orphans} orphan(s)')
+
+    def _remove(self, orphan):
+        path, name, _ = orphan
+        try:
+            if self.quarantine:
+                target = os.path.join(self.quarantine, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as exc:
+            self.stderr.write(f'  {name}: {exc}')
+            return False
+        return True
+
+    # ============================================================
+    # MediaBlob reference counts
+    # ============================================================
+
+    def _recount(self, chunk_size=1000):
+        """Set every MediaBlob's ref_count to the number of fields that point at it."""
+        from places.models import MediaBlob
+        from places.storage import file_fields
+
+        fields = file_fields()
+        blobs  = MediaBlob.objects.order_by('pk').values_list('pk', 'name', 'ref_count')
+        fixed  = 0
+        chunk  = []
+        for row in blobs.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                fixed += self._recount_chunk(chunk, fields)
+                chunk = []
+        if chunk:
+            fixed += self._recount_chunk(chunk, fields)
+
+        verb = 'to correct' if self.dry_run else 'corrected'
+        self.stdout.write(f'{fixed} blob reference count(s) {verb}.')
+
+    def _recount_chunk(self, chunk, fields):
+        from django.db.models import Count
+
+        from places.models import MediaBlob
+
+        names  = [name for _, name, _ in chunk]
+        counts = Counter()
+        for model, field in fields:
+            rows = (
+                model.objects.filter(**{f'{field}__in': names})
+                .order_by().values(field).annotate(n=Count('pk')).values_list(field, 'n')
+            )
+            for name, n in rows:
+                counts[name] += n
+
+        fixed = 0
+        for pk, name, ref_count in chunk:
+            if counts[name] == ref_count:
+                continue
+            fixed += 1
+            if not self.dry_run:
+                # Conditional, so a save that landed meanwhile isn't lost
+                MediaBlob.objects.filter(pk=pk, ref_count=ref_count).update(ref_count=counts[name])
+        return fixed
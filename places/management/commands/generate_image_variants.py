@@ -0,0 +1,66 @@
+# Run with:
+#   python manage.py generate_image_variants
+# Rebuild every variant (after changing the presets):
+#   python manage.py generate_image_variants --force --workers 8
+#
+# New uploads get their variants from the post_save signal; this backfills
+# images stored before that, or whose processing failed.
+
+import os
+
+from django.core.management.base import BaseCommand
+
+
+def _generate(name):
+    from places.image_processing import variants_job
+    return name, variants_job(name)
+
+
+class Command(BaseCommand):
+    help = 'Generate responsive JPEG/WebP variants for every stored image'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes resizing images in parallel',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate images that already have variants',
+        )
+
+    def handle(self, *args, **options):
+        from places.image_processing import process_pool
+        from places.image_variants import bump_variant_owners, has_variants, iter_image_names
+
+        force   = options['force']
+        workers = max(1, options['workers'])
+
+        names   = sorted({name for _, _, _, name in iter_image_names()})
+        pending = [name for name in names if force or not has_variants(name)]
+        self.stdout.write(
+            f'{len(names)} image(s), {len(pending)} to process with {workers} worker(s)...'
+        )
+        if not pending:
+            return
+
+        done = failed = 0
+        written_names = []
+        with process_pool(workers) as pool:
+            for name, written in pool.map(_generate, pending, chunksize=8):
+                if written:
+                    done += 1
+                    written_names.append(name)
+                else:
+                    failed += 1
+                    self.stderr.write(f'  skipped {name}')
+                if (done + failed) % 100 == 0:
+                    self.stdout.write(f'  {done + failed}/{len(pending)}')
+
+        bump_variant_owners(written_names)
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {done} image(s) processed, {failed} skipped.'
+        ))
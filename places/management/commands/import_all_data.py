@@ -9,24 +9,43 @@ Usage:
     python manage.py import_all_data --dry-run
     python manage.py import_all_data --update
     python manage.py import_all_data --user admin
+    python manage.py import_all_data --resume
+
+Each sheet is validated row by row, diffed against what is already in the
+database (looked up once per chunk, by name), and written with
+bulk_create / bulk_update — so re-importing an unchanged workbook writes
+nothing.
+
+Sheets are imported in chunks of --chunk-size rows, each committed in its
+own transaction together with an ImportCheckpoint recording how far the
+sheet got. A chunk that fails to write stops the run there. If a run
+dies or stops, `--resume` with the same workbook skips the chunks that
+were committed; re-running a chunk is safe either way, since rows are
+diffed before they are written. Checkpoints are cleared once a run
+completes.
 """
 
 import os
 import json
+import time
+import hashlib
+from collections import Counter
+
 import pandas as pd
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
 from django.utils.text import slugify
 from django.utils.dateparse import parse_datetime
 from django.utils import timezone
-from django.core.files import File
 from django.contrib.auth.models import User
 
+from places.import_validation import validate_places, write_issues
 from places.models import (
     Place, Category,
     Badge, Challenge,
     Trail, TrailPlace,
-    ExpertArea,
+    ExpertArea, ImportCheckpoint,
 )
 
 # ---------------------------
@@ -57,9 +76,12 @@ SHEET_TRAIL_PLACES = 'Trail_Places'
 SHEET_EXPERT_AREAS = 'Expert_Areas'
 
 VALID_DIFFICULTIES = {'easy', 'moderate', 'challenging'}
-VALID_STATUSES     = {'approved', 'pending', 'rejected'}
 VALID_BADGE_CATS   = {'explorer', 'contributor', 'social', 'special'}
 
+BATCH_SIZE  = 500       # rows per bulk INSERT / UPDATE statement
+LOOKUP_SIZE = 1000      # keys per `__in` lookup of existing rows
+CHUNK_ROWS  = 5000      # sheet rows per committed (and checkpointed) chunk
+
 
 # ============================================================
 class Command(BaseCommand):
@@ -72,6 +94,14 @@ class Command(BaseCommand):
         parser.add_argument('--user',         default=None)
         parser.add_argument('--dry-run',      action='store_true')
         parser.add_argument('--update',       action='store_true')
+        parser.add_argument('--image-workers', type=int, default=8,
+                            help='Threads copying images into storage')
+        parser.add_argument('--issues-csv',   default=None,
+                            help='Also write every validation issue to this CSV file')
+        parser.add_argument('--chunk-size',   type=int, default=CHUNK_ROWS,
+                            help='Sheet rows committed per transaction')
+        parser.add_argument('--resume',       action='store_true',
+                            help='Skip the chunks an interrupted run of this workbook committed')
 
     # ============================================================
     def handle(self, *args, **options):
@@ -81,6 +111,13 @@ class Command(BaseCommand):
         dry_run      = options['dry_run']
         update       = options['update']
 
+        self.image_workers    = options['image_workers']
+        self.verbosity        = options['verbosity']
+        self.issues_csv       = options['issues_csv']
+        self.chunk_rows       = max(1, options['chunk_size'])
+        self.sheet_categories = set()
+        self.failed           = False
+
         if not os.path.exists(file_path):
             raise CommandError(f"File not found: {file_path}")
 
@@ -90,16 +127,52 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write(self.style.WARNING("DRY RUN — no changes will be saved.\n"))
 
-        # ORDER MATTERS: categories before places, trails before trail_places
-        self.import_categories(xls, dry_run)
-        self.import_expert_areas(xls, dry_run)
-        self.import_places(xls, user, images_dir, update, dry_run)
-        self.import_badges(xls, badge_images, dry_run)
-        self.import_challenges(xls, dry_run)
-        self.import_trails(xls, dry_run)
-        self.import_trail_places(xls, dry_run)
-
-        self.stdout.write(self.style.SUCCESS("\n✅ ALL DATA IMPORTED"))
+        # ── Checkpoints: one row per sheet of this exact workbook ────────
+        self.workbook    = self._fingerprint(file_path)
+        self.checkpoints = {}
+        checkpoints      = ImportCheckpoint.objects.filter(workbook=self.workbook)
+        if options['resume']:
+            self.checkpoints = dict(checkpoints.values_list('sheet', 'rows_done'))
+            if not self.checkpoints:
+                self.stdout.write(self.style.WARNING(
+                    "Nothing to resume for this workbook — importing from the start."
+                ))
+        elif not dry_run:
+            checkpoints.delete()
+
+        started = time.perf_counter()
+        self.total_rows = 0
+
+        # ORDER MATTERS: categories before places, trails before trail_places.
+        # A rolled-back chunk stops the run: later sheets may refer to its
+        # rows, and would skip and checkpoint them as done.
+        steps = [
+            lambda: self.import_categories(xls, dry_run),
+            lambda: self.import_expert_areas(xls, dry_run),
+            lambda: self.import_places(xls, user, images_dir, update, dry_run),
+            lambda: self.import_badges(xls, badge_images, dry_run),
+            lambda: self.import_challenges(xls, dry_run),
+            lambda: self.import_trails(xls, dry_run),
+            lambda: self.import_trail_places(xls, dry_run),
+        ]
+        for step in steps:
+            step()
+            if self.failed:
+                break
+
+        elapsed = time.perf_counter() - started
+        if self.failed:
+            self.stdout.write(self.style.ERROR(
+                f"\n⚠ IMPORT INCOMPLETE — {self.total_rows:,} rows in {elapsed:.2f}s. "
+                f"Fix the errors above and rerun with --resume to continue."
+            ))
+            return
+        if not dry_run:
+            checkpoints.delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ ALL DATA IMPORTED — {self.total_rows:,} rows in {elapsed:.2f}s "
+            f"({self.total_rows / elapsed if elapsed else 0:,.0f} rows/s)"
+        ))
 
     # ============================================================
     # USER
@@ -123,258 +196,320 @@ class Command(BaseCommand):
     # ============================================================
 
     def import_categories(self, xls, dry_run):
-        if SHEET_CATEGORIES not in xls.sheet_names:
-            self.stdout.write(self.style.WARNING(
-                f"Sheet '{SHEET_CATEGORIES}' not found — skipping categories."
-            ))
+        started = time.perf_counter()
+        df      = self._read_sheet(xls, SHEET_CATEGORIES, 'categories')
+        if df is None:
             return
+        counts  = Counter()
+
+        for start, stop in self._chunks(SHEET_CATEGORIES, df, counts):
+            rows = {}
+            for i, row in df.iloc[start:stop].iterrows():
+                slug = self.clean(row.iloc[0])
+                name = self.clean(row.iloc[1])
+                if not slug or not name:
+                    continue
 
-        df = pd.read_excel(xls, SHEET_CATEGORIES)
-        created_count = 0
-
-        for i, row in df.iterrows():
-            slug = self.clean(row.iloc[0])
-            name = self.clean(row.iloc[1])
-            if not slug or not name:
-                continue
-
-            slug = slugify(slug)
-            if dry_run:
-                self.stdout.write(f"  [CAT] {slug} → {name}")
-                continue
-
-            try:
-                _, created = Category.objects.get_or_create(
-                    slug=slug, defaults={'name': name}
-                )
-                if created:
-                    created_count += 1
-            except Exception as e:
-                self.stderr.write(f"  [CAT] Row {i} error: {e}")
-
-        if not dry_run:
-            self.stdout.write(f"  Categories: {created_count} created.")
+                slug = slugify(slug)
+                if dry_run:
+                    self.stdout.write(f"  [CAT] {slug} → {name}")
+                rows.setdefault(slug, {'name': name})
+            self.sheet_categories |= set(rows)
+
+            # get_or_create semantics: existing categories keep their name
+            existing  = self._existing(Category, 'slug', rows)
+            to_create = [Category(slug=slug, **values) for slug, values in rows.items()
+                         if slug not in existing]
+
+            if not dry_run and not self._write(
+                'CAT', [(Category, to_create, [], [])], (SHEET_CATEGORIES, stop, len(df))
+            ):
+                break
+            counts.update(created=len(to_create), unchanged=len(rows) - len(to_create))
+        self._report('Categories', counts, started, dry_run)
 
     # ============================================================
     # EXPERT AREAS
     # ============================================================
 
     def import_expert_areas(self, xls, dry_run):
-        if SHEET_EXPERT_AREAS not in xls.sheet_names:
-            self.stdout.write(self.style.WARNING(
-                f"Sheet '{SHEET_EXPERT_AREAS}' not found — skipping expert areas."
-            ))
+        started = time.perf_counter()
+        df      = self._read_sheet(xls, SHEET_EXPERT_AREAS, 'expert areas')
+        if df is None:
             return
+        counts  = Counter()
+        fields  = ['description']
+
+        for start, stop in self._chunks(SHEET_EXPERT_AREAS, df, counts):
+            rows    = {}
+            skipped = 0
+            for i, row in df.iloc[start:stop].iterrows():
+                name = self.clean(row.get('name'))
+                if not name:
+                    self.stderr.write(f"  [EXPERT_AREA] Row {i}: missing name — skipped.")
+                    skipped += 1
+                    continue
 
-        df = pd.read_excel(xls, SHEET_EXPERT_AREAS)
-        upserted_count = 0
-
-        for i, row in df.iterrows():
-            name = self.clean(row.get('name'))
-            if not name:
-                self.stderr.write(f"  [EXPERT_AREA] Row {i}: missing name — skipped.")
-                continue
-
-            if dry_run:
-                self.stdout.write(f"  [EXPERT_AREA] {name}")
-                continue
-
-            try:
-                ExpertArea.objects.update_or_create(
-                    name=name,
-                    defaults={
-                        'description': self.clean(row.get('description'), ''),
-                    }
-                )
-                upserted_count += 1
-            except Exception as e:
-                self.stderr.write(f"  [EXPERT_AREA] Row {i} '{name}': error — {e}")
+                if dry_run:
+                    self.stdout.write(f"  [EXPERT_AREA] {name}")
+                rows[name] = {'description': self.clean(row.get('description'), '')}
 
-        if not dry_run:
-            self.stdout.write(f"  Expert Areas: {upserted_count} upserted.")
+            to_create, to_update, unchanged = self._diff(
+                ExpertArea, 'name', rows, self._existing(ExpertArea, 'name', rows)
+            )
+            if not dry_run and not self._write(
+                'EXPERT_AREA', [(ExpertArea, to_create, to_update, fields)],
+                (SHEET_EXPERT_AREAS, stop, len(df)),
+            ):
+                break
+            counts.update(created=len(to_create), updated=len(to_update),
+                          unchanged=unchanged, skipped=skipped)
+        self._report('Expert Areas', counts, started, dry_run)
 
     # ============================================================
     # PLACES
     # ============================================================
 
     def import_places(self, xls, user, images_dir, update, dry_run):
-        if SHEET_PLACES not in xls.sheet_names:
-            self.stdout.write(self.style.WARNING(
-                f"Sheet '{SHEET_PLACES}' not found — skipping places."
-            ))
+        started = time.perf_counter()
+        df      = self._read_sheet(xls, SHEET_PLACES, 'places')
+        if df is None:
             return
+        counts  = Counter()
+
+        # ── Validate the whole sheet at once; only clean rows go on ──────
+        known = set(Category.objects.values_list('slug', flat=True)) | self.sheet_categories
+        clean, issues = validate_places(
+            df, COL, sheet=SHEET_PLACES, known_categories=known, default_difficulty='easy',
+        )
+        done   = self.checkpoints.get(SHEET_PLACES, 0)
+        issues = [issue for issue in issues if issue.row - 2 >= done]
+        write_issues(self, issues, 'PLACE', self.issues_csv)
+
+        for start, stop in self._chunks(SHEET_PLACES, df, counts):
+            part   = clean[(clean.index >= start) & (clean.index < stop)]
+            result = self._import_place_chunk(
+                part, user, images_dir, update, dry_run, (SHEET_PLACES, stop, len(df)),
+            )
+            if result is None:
+                break
+            counts.update(result, skipped=(stop - start) - len(part))
+        self._report('Places', counts, started, dry_run)
+
+    def _import_place_chunk(self, clean, user, images_dir, update, dry_run, checkpoint):
+        """Import validated place rows; returns the counts, or None if rolled back."""
+        from places.caching import bump_model_version
+        from places.districts import nearest_district
+        from places.image_ingest import update_references
+        from places.image_processing import generate_variants_later
+        from places.related import refresh_related_places_on_commit
+        from places.search import update_search_documents
 
-        df = pd.read_excel(xls, SHEET_PLACES)
-        created_count = 0
-        updated_count = 0
         skipped_count = 0
-
-        for i, row in df.iterrows():
-            name = self.clean(row.get(COL['name']))
-            if not name:
-                self.stderr.write(f"  [PLACE] Row {i}: missing name — skipped.")
-                skipped_count += 1
-                continue
-
-            try:
-                # ── Validate difficulty ──────────────────────────────────
-                difficulty = self.clean(row.get(COL['difficulty']), 'easy').lower()
-                if difficulty not in VALID_DIFFICULTIES:
-                    self.stderr.write(
-                        f"  [PLACE] Row {i} '{name}': invalid difficulty "
-                        f"'{difficulty}' — defaulting to 'easy'."
-                    )
-                    difficulty = 'easy'
-
-                # ── Validate status ──────────────────────────────────────
-                status = self.clean(row.get(COL['status']), 'pending').lower()
-                if status not in VALID_STATUSES:
-                    self.stderr.write(
-                        f"  [PLACE] Row {i} '{name}': invalid status "
-                        f"'{status}' — defaulting to 'pending'."
-                    )
-                    status = 'pending'
-
-                # ── Validate safety rating ───────────────────────────────
-                safety_rating = 3
-                safety_raw = row.get(COL['safety'])
-                if not pd.isna(safety_raw):
-                    try:
-                        safety_val = int(float(safety_raw))
-                        if 1 <= safety_val <= 5:
-                            safety_rating = safety_val
-                        else:
-                            self.stderr.write(
-                                f"  [PLACE] Row {i} '{name}': safety rating "
-                                f"{safety_val} out of range — defaulting to 3."
-                            )
-                    except (ValueError, TypeError):
-                        pass
-
-                if dry_run:
-                    self.stdout.write(
-                        f"  [PLACE] {name} | {status} | {difficulty} | "
-                        f"safety={safety_rating}"
-                    )
-                    continue
-
-                place, created = Place.objects.get_or_create(
-                    name=name,
-                    defaults={'created_by': user}
+        rows          = {}      # name → field values
+        categories    = {}      # name → [category slug]
+        images        = {}      # name → image filename
+        for place in clean.itertuples(index=False):
+            if dry_run:
+                self.stdout.write(
+                    f"  [PLACE] {place.name} | {place.status} | {place.difficulty} | "
+                    f"safety={place.safety_rating}"
                 )
+            rows[place.name] = {
+                'description':        place.description,
+                'legends_stories':    place.legends_stories,
+                'latitude':           place.latitude,
+                'longitude':          place.longitude,
+                'difficulty':         place.difficulty,
+                'accessibility_info': place.accessibility_info,
+                'best_time_to_visit': place.best_time_to_visit,
+                'safety_rating':      place.safety_rating,
+                'status':             place.status,
+                'created_by_id':      user.pk,
+            }
+            categories[place.name] = place.categories
+            if place.image_filename:
+                images[place.name] = place.image_filename
+
+        existing = self._existing(Place, 'name', rows)
+        if not update:
+            skipped_count += sum(1 for name in rows if name in existing)
+            rows = {name: values for name, values in rows.items() if name not in existing}
+
+        # ── Images (stored before the rows that point at them) ───────────
+        report = self._store_images(
+            'PLACE', Place, {name: img for name, img in images.items() if name in rows},
+            images_dir, dry_run,
+        )
+        previous = {name: existing[name].image.name for name in report.names if name in existing}
+        for name, image in report.names.items():
+            rows[name]['image'] = image
+
+        fields = sorted({field for values in rows.values() for field in values})
+        to_create, to_update, unchanged = self._diff(Place, 'name', rows, existing)
+
+        # ── What Place.save() would have filled in ───────────────────────
+        now   = timezone.now()
+        slugs = self._unique_slugs([place.name for place in to_create])
+        for place in to_create:
+            place.slug     = slugs[place.name]
+            place.district = nearest_district(place.latitude, place.longitude)
+        for place in to_update:
+            place.updated_at = now
+            if not place.district:
+                place.district = nearest_district(place.latitude, place.longitude)
+
+        result = Counter(created=len(to_create), updated=len(to_update),
+                         unchanged=unchanged, skipped=skipped_count)
+        if dry_run:
+            return result
 
-                if not created and not update:
-                    skipped_count += 1
-                    continue
-
-                # ── Core fields ──────────────────────────────────────────
-                place.description        = self.clean(row.get(COL['description']), '')
-                place.legends_stories    = self.clean(row.get(COL['legends']), '')
-                place.latitude           = float(row.get(COL['latitude'], 0) or 0)
-                place.longitude          = float(row.get(COL['longitude'], 0) or 0)
-                place.difficulty         = difficulty
-                place.accessibility_info = self.clean(row.get(COL['accessibility']), '')
-                place.best_time_to_visit = self.clean(row.get(COL['best_time']), '')
-                place.safety_rating      = safety_rating
-                place.status             = status
-                place.created_by         = user
-                place.save()
-
-                # ── Categories ───────────────────────────────────────────
-                place.category.clear()
-                for slug in self.parse_slugs(row.get(COL['categories'])):
-                    try:
-                        place.category.add(Category.objects.get(slug=slug))
-                    except Category.DoesNotExist:
-                        self.stderr.write(
-                            f"  [PLACE] '{name}': category slug '{slug}' "
-                            f"not found — skipped."
-                        )
-
-                # ── Image ────────────────────────────────────────────────
-                img = self.clean(row.get(COL['image_filename']))
-                if img:
-                    path = os.path.join(images_dir, img)
-                    if os.path.exists(path):
-                        with open(path, 'rb') as f:
-                            place.image.save(img, File(f), save=True)
-                    else:
-                        self.stderr.write(
-                            f"  [PLACE] '{name}': image file '{path}' "
-                            f"not found — skipped."
-                        )
-
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
-
-            except Exception as e:
-                self.stderr.write(f"  [PLACE] Row {i} '{name}': unexpected error — {e}")
-                skipped_count += 1
-                continue
+        try:
+            with transaction.atomic():
+                self._bulk(Place, to_create, to_update, fields + ['district', 'updated_at'])
+                update_references(Place.image.field.storage, report, [
+                    (previous.get(place.name, ''), place.image.name) for place in to_create + to_update
+                ])
+                place_ids = self._existing(Place, 'name', rows, values='pk')
+                changed   = self._sync_categories(place_ids, categories)
+                self._checkpoint(*checkpoint)
+        except DatabaseError as e:
+            self.stderr.write(f"  [PLACE] chunk rolled back: {e}")
+            self.failed = True
+            return None
 
-        if not dry_run:
-            self.stdout.write(
-                f"  Places: {created_count} created, "
-                f"{updated_count} updated, {skipped_count} skipped."
+        # ── Signal side effects, once for the whole chunk ────────────────
+        written = {place_ids[place.name] for place in to_create + to_update}
+        if changed:
+            bump_model_version(Place)
+            bump_model_version(Category)
+        update_search_documents(Place, written)
+        # A brand-new pending place can't appear in anyone's list yet
+        refresh_related_places_on_commit(
+            {place_ids[place.name] for place in to_update}
+            | {place_ids[place.name] for place in to_create if place.status == 'approved'}
+            | changed
+        )
+        for place in to_create + to_update:
+            if place.image:
+                generate_variants_later(place.image.name)
+        return result
+
+    def _unique_slugs(self, names):
+        """name → slug, unique against the table and each other (as Place.save() would)."""
+        import uuid
+
+        bases = {name: slugify(name) for name in names}
+        taken = set()
+        values = list(set(bases.values()))
+        for start in range(0, len(values), LOOKUP_SIZE):
+            taken.update(Place.objects.filter(
+                slug__in=values[start:start + LOOKUP_SIZE]
+            ).values_list('slug', flat=True))
+
+        slugs = {}
+        for name, base in bases.items():
+            slug = base
+            while slug in taken:
+                slug = f"{base}-{uuid.uuid4().hex[:6]}"
+            taken.add(slug)
+            slugs[name] = slug
+        return slugs
+
+    def _sync_categories(self, place_ids, categories):
+        """
+        Make each place's categories exactly the sheet's, with one bulk
+        DELETE and INSERT on the through table. Returns the place ids
+        whose categories changed.
+        """
+        through     = Place.category.through
+        category_id = dict(Category.objects.values_list('slug', 'pk'))
+
+        wanted = {
+            (place_id, category_id[slug])
+            for name, place_id in place_ids.items()
+            for slug in categories.get(name, [])
+            if slug in category_id      # unknown slugs were reported by validation
+        }
+
+        current = {}
+        ids     = list(place_ids.values())
+        for start in range(0, len(ids), LOOKUP_SIZE):
+            current.update(
+                ((place_id, cat_id), pk)
+                for pk, place_id, cat_id in through.objects.filter(
+                    place_id__in=ids[start:start + LOOKUP_SIZE]
+                ).values_list('pk', 'place_id', 'category_id')
             )
 
+        removed = {pair: pk for pair, pk in current.items() if pair not in wanted}
+        added   = [pair for pair in wanted if pair not in current]
+        pks     = list(removed.values())
+        for start in range(0, len(pks), LOOKUP_SIZE):
+            through.objects.filter(pk__in=pks[start:start + LOOKUP_SIZE]).delete()
+        through.objects.bulk_create(
+            [through(place_id=place_id, category_id=cat_id) for place_id, cat_id in added],
+            batch_size=BATCH_SIZE,
+        )
+        return {place_id for place_id, _ in removed} | {place_id for place_id, _ in added}
+
     # ============================================================
     # BADGES
     # ============================================================
 
     def import_badges(self, xls, images_dir, dry_run):
-        if SHEET_BADGES not in xls.sheet_names:
-            self.stdout.write(self.style.WARNING(
-                f"Sheet '{SHEET_BADGES}' not found — skipping badges."
-            ))
-            return
-
-        df = pd.read_excel(xls, SHEET_BADGES)
-        upserted_count = 0
-
-        for i, row in df.iterrows():
-            name = self.clean(row.get('name'))
-            if not name:
-                self.stderr.write(f"  [BADGE] Row {i}: missing name — skipped.")
-                continue
+        from places.image_processing import generate_variants_later
 
-            try:
-                criteria = self.parse_json(
-                    row.get('criteria'), field='criteria', row=i, label=name
-                )
-                if criteria is None:
+        started = time.perf_counter()
+        df      = self._read_sheet(xls, SHEET_BADGES, 'badges')
+        if df is None:
+            return
+        counts  = Counter()
+
+        for start, stop in self._chunks(SHEET_BADGES, df, counts):
+            rows    = {}
+            images  = {}
+            skipped = 0
+            for i, row in df.iloc[start:stop].iterrows():
+                name = self.clean(row.get('name'))
+                if not name:
+                    self.stderr.write(f"  [BADGE] Row {i}: missing name — skipped.")
+                    skipped += 1
                     continue
 
-                category = self.clean(row.get('category'), 'explorer').lower()
-                if category not in VALID_BADGE_CATS:
-                    self.stderr.write(
-                        f"  [BADGE] '{name}': invalid category '{category}' "
-                        f"— defaulting to 'explorer'."
+                try:
+                    criteria = self.parse_json(
+                        row.get('criteria'), field='criteria', row=i, label=name
                     )
-                    category = 'explorer'
-
-                points_required = 0
-                pts_raw = row.get('points_required')
-                if not pd.isna(pts_raw):
-                    try:
-                        points_required = int(float(pts_raw))
-                    except (ValueError, TypeError):
-                        pass
-
-                is_active = bool(row.get('is_active', True))
+                    if criteria is None:
+                        skipped += 1
+                        continue
 
-                if dry_run:
-                    self.stdout.write(
-                        f"  [BADGE] {name} | cat={category} | "
-                        f"pts={points_required} | active={is_active}"
-                    )
-                    continue
+                    category = self.clean(row.get('category'), 'explorer').lower()
+                    if category not in VALID_BADGE_CATS:
+                        self.stderr.write(
+                            f"  [BADGE] '{name}': invalid category '{category}' "
+                            f"— defaulting to 'explorer'."
+                        )
+                        category = 'explorer'
+
+                    points_required = 0
+                    pts_raw = row.get('points_required')
+                    if not pd.isna(pts_raw):
+                        try:
+                            points_required = int(float(pts_raw))
+                        except (ValueError, TypeError):
+                            pass
+
+                    is_active = bool(row.get('is_active', True))
+
+                    if dry_run:
+                        self.stdout.write(
+                            f"  [BADGE] {name} | cat={category} | "
+                            f"pts={points_required} | active={is_active}"
+                        )
 
-                badge, _ = Badge.objects.update_or_create(
-                    name=name,
-                    defaults={
+                    rows[name] = {
                         'description':     self.clean(row.get('description'), ''),
                         'icon':            self.clean(row.get('icon'), ''),
                         'criteria':        criteria,
@@ -382,92 +517,108 @@ class Command(BaseCommand):
                         'points_required': points_required,
                         'is_active':       is_active,
                     }
-                )
+                    img_raw = self.clean(row.get('image'))
+                    if img_raw:
+                        images[name] = img_raw if '.' in img_raw else f"{img_raw}.jpg"
 
-                # ── Badge image ──────────────────────────────────────────
-                img_raw = self.clean(row.get('image'))
-                if img_raw and not badge.image:
-                    img_filename = img_raw if '.' in img_raw else f"{img_raw}.jpg"
-                    path = os.path.join(images_dir, img_filename)
-                    if os.path.exists(path):
-                        with open(path, 'rb') as f:
-                            badge.image.save(img_filename, File(f), save=True)
-                    else:
-                        self.stderr.write(
-                            f"  [BADGE] '{name}': image file '{path}' "
-                            f"not found — skipped."
-                        )
-
-                upserted_count += 1
+                except Exception as e:
+                    self.stderr.write(f"  [BADGE] Row {i} '{name}': unexpected error — {e}")
+                    skipped += 1
+                    continue
 
-            except Exception as e:
-                self.stderr.write(f"  [BADGE] Row {i} '{name}': unexpected error — {e}")
-                continue
+            existing = self._existing(Badge, 'name', rows)
 
-        if not dry_run:
-            self.stdout.write(f"  Badges: {upserted_count} upserted.")
+            # ── Badge image (only for badges that have none yet) ─────────
+            report = self._store_images(
+                'BADGE', Badge,
+                {name: img for name, img in images.items()
+                 if not (name in existing and existing[name].image)},
+                images_dir, dry_run,
+            )
+            for name, image in report.names.items():
+                rows[name]['image'] = image
+
+            fields = sorted({field for values in rows.values() for field in values})
+            to_create, to_update, unchanged = self._diff(Badge, 'name', rows, existing)
+            if not dry_run:
+                # Only badges without an image get one, so nothing is released
+                if not self._write(
+                    'BADGE', [(Badge, to_create, to_update, fields)],
+                    (SHEET_BADGES, stop, len(df)),
+                    references=(Badge.image.field.storage, report,
+                                [('', badge.image.name) for badge in to_create + to_update]),
+                ):
+                    break
+                for badge in to_create + to_update:
+                    if badge.image:
+                        generate_variants_later(badge.image.name)
+            counts.update(created=len(to_create), updated=len(to_update),
+                          unchanged=unchanged, skipped=skipped)
+        self._report('Badges', counts, started, dry_run)
 
     # ============================================================
     # CHALLENGES
     # ============================================================
 
     def import_challenges(self, xls, dry_run):
-        if SHEET_CHALLENGES not in xls.sheet_names:
-            self.stdout.write(self.style.WARNING(
-                f"Sheet '{SHEET_CHALLENGES}' not found — skipping challenges."
-            ))
+        started = time.perf_counter()
+        df      = self._read_sheet(xls, SHEET_CHALLENGES, 'challenges')
+        if df is None:
             return
-
-        df = pd.read_excel(xls, SHEET_CHALLENGES)
-        upserted_count = 0
-
-        for i, row in df.iterrows():
-            title = self.clean(row.get('title'))
-            if not title:
-                self.stderr.write(f"  [CHALLENGE] Row {i}: missing title — skipped.")
-                continue
-
-            try:
-                criteria = self.parse_json(
-                    row.get('criteria'), field='criteria', row=i, label=title
-                )
-                if criteria is None:
+        counts  = Counter()
+        fields  = ['description', 'challenge_type', 'criteria', 'reward_points',
+                   'start_date', 'end_date', 'is_active']
+
+        for start, stop in self._chunks(SHEET_CHALLENGES, df, counts):
+            rows    = {}
+            skipped = 0
+            for i, row in df.iloc[start:stop].iterrows():
+                title = self.clean(row.get('title'))
+                if not title:
+                    self.stderr.write(f"  [CHALLENGE] Row {i}: missing title — skipped.")
+                    skipped += 1
                     continue
 
-                start_date = parse_datetime(str(row.get('start_date', '')))
-                end_date   = parse_datetime(str(row.get('end_date', '')))
-
-                if not start_date or not end_date:
-                    self.stderr.write(
-                        f"  [CHALLENGE] '{title}': invalid start/end date — skipped."
+                try:
+                    criteria = self.parse_json(
+                        row.get('criteria'), field='criteria', row=i, label=title
                     )
-                    continue
+                    if criteria is None:
+                        skipped += 1
+                        continue
 
-                if timezone.is_naive(start_date):
-                    start_date = timezone.make_aware(start_date)
-                if timezone.is_naive(end_date):
-                    end_date = timezone.make_aware(end_date)
+                    start_date = parse_datetime(str(row.get('start_date', '')))
+                    end_date   = parse_datetime(str(row.get('end_date', '')))
 
-                reward_points = 50
-                rp_raw = row.get('reward_points')
-                if not pd.isna(rp_raw):
-                    try:
-                        reward_points = int(float(rp_raw))
-                    except (ValueError, TypeError):
-                        pass
-
-                is_active = bool(row.get('is_active', True))
-
-                if dry_run:
-                    self.stdout.write(
-                        f"  [CHALLENGE] {title} | type={row.get('challenge_type')} | "
-                        f"pts={reward_points} | active={is_active}"
-                    )
-                    continue
+                    if not start_date or not end_date:
+                        self.stderr.write(
+                            f"  [CHALLENGE] '{title}': invalid start/end date — skipped."
+                        )
+                        skipped += 1
+                        continue
+
+                    if timezone.is_naive(start_date):
+                        start_date = timezone.make_aware(start_date)
+                    if timezone.is_naive(end_date):
+                        end_date = timezone.make_aware(end_date)
+
+                    reward_points = 50
+                    rp_raw = row.get('reward_points')
+                    if not pd.isna(rp_raw):
+                        try:
+                            reward_points = int(float(rp_raw))
+                        except (ValueError, TypeError):
+                            pass
+
+                    is_active = bool(row.get('is_active', True))
+
+                    if dry_run:
+                        self.stdout.write(
+                            f"  [CHALLENGE] {title} | type={row.get('challenge_type')} | "
+                            f"pts={reward_points} | active={is_active}"
+                        )
 
-                Challenge.objects.update_or_create(
-                    title=title,
-                    defaults={
+                    rows[title] = {
                         'description':    self.clean(row.get('description'), ''),
                         'challenge_type': self.clean(row.get('challenge_type'), ''),
                         'criteria':       criteria,
@@ -476,181 +627,410 @@ class Command(BaseCommand):
                         'end_date':       end_date,
                         'is_active':      is_active,
                     }
-                )
-                upserted_count += 1
 
-            except Exception as e:
-                self.stderr.write(
-                    f"  [CHALLENGE] Row {i} '{title}': unexpected error — {e}"
-                )
-                continue
+                except Exception as e:
+                    self.stderr.write(
+                        f"  [CHALLENGE] Row {i} '{title}': unexpected error — {e}"
+                    )
+                    skipped += 1
+                    continue
 
-        if not dry_run:
-            self.stdout.write(f"  Challenges: {upserted_count} upserted.")
+            to_create, to_update, unchanged = self._diff(
+                Challenge, 'title', rows, self._existing(Challenge, 'title', rows)
+            )
+            if not dry_run and not self._write(
+                'CHALLENGE', [(Challenge, to_create, to_update, fields)],
+                (SHEET_CHALLENGES, stop, len(df)),
+            ):
+                break
+            counts.update(created=len(to_create), updated=len(to_update),
+                          unchanged=unchanged, skipped=skipped)
+        self._report('Challenges', counts, started, dry_run)
 
     # ============================================================
     # TRAILS
     # ============================================================
 
     def import_trails(self, xls, dry_run):
-        if SHEET_TRAILS not in xls.sheet_names:
-            self.stdout.write(self.style.WARNING(
-                f"Sheet '{SHEET_TRAILS}' not found — skipping trails."
-            ))
-            return
-
-        df = pd.read_excel(xls, SHEET_TRAILS)
-        upserted_count = 0
+        from places.search import update_search_documents
 
-        for i, row in df.iterrows():
-            name = self.clean(row.get('name'))
-            if not name:
-                continue
-
-            try:
-                created_by_username = self.clean(row.get('created_by'))
-                try:
-                    trail_user = User.objects.get(username=created_by_username)
-                except User.DoesNotExist:
-                    self.stderr.write(
-                        f"  [TRAIL] '{name}': user '{created_by_username}' "
-                        f"not found — skipped."
-                    )
+        started = time.perf_counter()
+        df      = self._read_sheet(xls, SHEET_TRAILS, 'trails')
+        if df is None:
+            return
+        counts  = Counter()
+        fields  = ['description', 'created_by_id', 'difficulty', 'is_public', 'required_points']
+
+        users = User.objects.filter(
+            username__in=self.column_values(df, 'created_by')
+        ).in_bulk(field_name='username')
+
+        for start, stop in self._chunks(SHEET_TRAILS, df, counts):
+            rows    = {}
+            skipped = 0
+            for i, row in df.iloc[start:stop].iterrows():
+                name = self.clean(row.get('name'))
+                if not name:
                     continue
 
-                difficulty = self.clean(row.get('difficulty'), 'easy').lower()
-                if difficulty not in VALID_DIFFICULTIES:
-                    self.stderr.write(
-                        f"  [TRAIL] '{name}': invalid difficulty '{difficulty}' "
-                        f"— defaulting to 'easy'."
-                    )
-                    difficulty = 'easy'
-
-                is_public = True
-                ip_raw = row.get('is_public')
-                if not pd.isna(ip_raw):
-                    try:
-                        is_public = bool(float(ip_raw))
-                    except (ValueError, TypeError):
-                        pass
-
-                required_points = 0
-                rp_raw = row.get('required_points')
-                if not pd.isna(rp_raw):
-                    try:
-                        required_points = int(float(rp_raw))
-                    except (ValueError, TypeError):
-                        pass
+                try:
+                    created_by_username = self.clean(row.get('created_by'))
+                    trail_user          = users.get(created_by_username)
+                    if trail_user is None:
+                        self.stderr.write(
+                            f"  [TRAIL] '{name}': user '{created_by_username}' "
+                            f"not found — skipped."
+                        )
+                        skipped += 1
+                        continue
 
-                if dry_run:
-                    self.stdout.write(
-                        f"  [TRAIL] {name} | by={created_by_username} | "
-                        f"{difficulty} | public={is_public} | "
-                        f"required_pts={required_points}"
-                    )
-                    continue
+                    difficulty = self.clean(row.get('difficulty'), 'easy').lower()
+                    if difficulty not in VALID_DIFFICULTIES:
+                        self.stderr.write(
+                            f"  [TRAIL] '{name}': invalid difficulty '{difficulty}' "
+                            f"— defaulting to 'easy'."
+                        )
+                        difficulty = 'easy'
+
+                    is_public = True
+                    ip_raw = row.get('is_public')
+                    if not pd.isna(ip_raw):
+                        try:
+                            is_public = bool(float(ip_raw))
+                        except (ValueError, TypeError):
+                            pass
+
+                    required_points = 0
+                    rp_raw = row.get('required_points')
+                    if not pd.isna(rp_raw):
+                        try:
+                            required_points = int(float(rp_raw))
+                        except (ValueError, TypeError):
+                            pass
+
+                    if dry_run:
+                        self.stdout.write(
+                            f"  [TRAIL] {name} | by={created_by_username} | "
+                            f"{difficulty} | public={is_public} | "
+                            f"required_pts={required_points}"
+                        )
 
-                Trail.objects.update_or_create(
-                    name=name,
-                    defaults={
+                    rows[name] = {
                         'description':     self.clean(row.get('description'), ''),
-                        'created_by':      trail_user,
+                        'created_by_id':   trail_user.pk,
                         'difficulty':      difficulty,
                         'is_public':       is_public,
                         'required_points': required_points,
                     }
-                )
-                upserted_count += 1
 
-            except Exception as e:
-                self.stderr.write(
-                    f"  [TRAIL] Row {i} '{name}': unexpected error — {e}"
-                )
-                continue
+                except Exception as e:
+                    self.stderr.write(
+                        f"  [TRAIL] Row {i} '{name}': unexpected error — {e}"
+                    )
+                    skipped += 1
+                    continue
 
-        if not dry_run:
-            self.stdout.write(f"  Trails: {upserted_count} upserted.")
+            to_create, to_update, unchanged = self._diff(
+                Trail, 'name', rows, self._existing(Trail, 'name', rows)
+            )
+            if not dry_run:
+                if not self._write(
+                    'TRAIL', [(Trail, to_create, to_update, fields)],
+                    (SHEET_TRAILS, stop, len(df)),
+                ):
+                    break
+                update_search_documents(Trail, self._existing(
+                    Trail, 'name', [trail.name for trail in to_create + to_update], values='pk'
+                ).values())
+            counts.update(created=len(to_create), updated=len(to_update),
+                          unchanged=unchanged, skipped=skipped)
+        self._report('Trails', counts, started, dry_run)
 
     # ============================================================
     # TRAIL PLACES
     # ============================================================
 
     def import_trail_places(self, xls, dry_run):
-        if SHEET_TRAIL_PLACES not in xls.sheet_names:
-            self.stdout.write(self.style.WARNING(
-                f"Sheet '{SHEET_TRAIL_PLACES}' not found — skipping trail places."
-            ))
+        started = time.perf_counter()
+        df      = self._read_sheet(xls, SHEET_TRAIL_PLACES, 'trail places')
+        if df is None:
             return
+        counts  = Counter()
 
-        df = pd.read_excel(xls, SHEET_TRAIL_PLACES)
-        upserted_count = 0
+        fields  = ['order', 'notes', 'distance_from_previous']
 
-        for i, row in df.iterrows():
-            trail_name = self.clean(row.get('trail'))
-            place_name = self.clean(row.get('place'))
-            if not trail_name or not place_name:
-                self.stderr.write(
-                    f"  [TRAIL_PLACE] Row {i}: missing trail or place name — skipped."
-                )
-                continue
+        trail_ids = self._existing(Trail, 'name', self.column_values(df, 'trail'), values='pk')
+        place_ids = self._existing(Place, 'name', self.column_values(df, 'place'), values='pk')
 
-            try:
-                try:
-                    trail = Trail.objects.get(name=trail_name)
-                except Trail.DoesNotExist:
+        for start, stop in self._chunks(SHEET_TRAIL_PLACES, df, counts):
+            rows    = {}
+            skipped = 0
+            for i, row in df.iloc[start:stop].iterrows():
+                trail_name = self.clean(row.get('trail'))
+                place_name = self.clean(row.get('place'))
+                if not trail_name or not place_name:
                     self.stderr.write(
-                        f"  [TRAIL_PLACE] Row {i}: trail '{trail_name}' "
-                        f"not found — skipped."
+                        f"  [TRAIL_PLACE] Row {i}: missing trail or place name — skipped."
                     )
+                    skipped += 1
                     continue
 
                 try:
-                    place = Place.objects.get(name=place_name)
-                except Place.DoesNotExist:
-                    self.stderr.write(
-                        f"  [TRAIL_PLACE] Row {i}: place '{place_name}' not found "
-                        f"— skipped. (Hint: name must match Places sheet exactly.)"
-                    )
-                    continue
+                    if trail_name not in trail_ids:
+                        self.stderr.write(
+                            f"  [TRAIL_PLACE] Row {i}: trail '{trail_name}' "
+                            f"not found — skipped."
+                        )
+                        skipped += 1
+                        continue
 
-                notes = self.clean(row.get('notes'), '')
+                    if place_name not in place_ids:
+                        self.stderr.write(
+                            f"  [TRAIL_PLACE] Row {i}: place '{place_name}' not found "
+                            f"— skipped. (Hint: name must match Places sheet exactly.)"
+                        )
+                        skipped += 1
+                        continue
 
-                distance_from_previous = None
-                dfp_raw = row.get('distance_from_previous')
-                if not pd.isna(dfp_raw):
-                    try:
-                        distance_from_previous = float(dfp_raw)
-                    except (ValueError, TypeError):
-                        pass
+                    notes = self.clean(row.get('notes'), '')
 
-                order = int(row.get('order', 0))
+                    distance_from_previous = None
+                    dfp_raw = row.get('distance_from_previous')
+                    if not pd.isna(dfp_raw):
+                        try:
+                            distance_from_previous = float(dfp_raw)
+                        except (ValueError, TypeError):
+                            pass
 
-                if dry_run:
-                    self.stdout.write(
-                        f"  [TRAIL_PLACE] {trail_name} → #{order} {place_name}"
-                    )
-                    continue
+                    order = int(row.get('order', 0))
+
+                    if dry_run:
+                        self.stdout.write(
+                            f"  [TRAIL_PLACE] {trail_name} → #{order} {place_name}"
+                        )
 
-                TrailPlace.objects.update_or_create(
-                    trail=trail,
-                    place=place,
-                    defaults={
+                    rows[(trail_ids[trail_name], place_ids[place_name])] = {
                         'order':                  order,
                         'notes':                  notes,
                         'distance_from_previous': distance_from_previous,
                     }
+
+                except Exception as e:
+                    self.stderr.write(
+                        f"  [TRAIL_PLACE] Row {i} '{trail_name}→{place_name}': "
+                        f"unexpected error — {e}"
+                    )
+                    skipped += 1
+                    continue
+
+            existing = {}
+            ids      = list({trail_id for trail_id, _ in rows})
+            for first in range(0, len(ids), LOOKUP_SIZE):
+                existing.update(
+                    ((tp.trail_id, tp.place_id), tp)
+                    for tp in TrailPlace.objects.filter(trail_id__in=ids[first:first + LOOKUP_SIZE])
                 )
-                upserted_count += 1
 
-            except Exception as e:
+            to_create = []
+            to_update = []
+            unchanged = 0
+            for (trail_id, place_id), values in rows.items():
+                tp = existing.get((trail_id, place_id))
+                if tp is None:
+                    to_create.append(TrailPlace(trail_id=trail_id, place_id=place_id, **values))
+                elif self._apply(tp, values):
+                    to_update.append(tp)
+                else:
+                    unchanged += 1
+
+            if not dry_run and not self._write(
+                'TRAIL_PLACE', [(TrailPlace, to_create, to_update, fields)],
+                (SHEET_TRAIL_PLACES, stop, len(df)),
+            ):
+                break
+            counts.update(created=len(to_create), updated=len(to_update),
+                          unchanged=unchanged, skipped=skipped)
+        self._report('Trail places', counts, started, dry_run)
+
+    # ============================================================
+    # IMAGES
+    # ============================================================
+
+    def _store_images(self, label, model, images, images_dir, dry_run):
+        """
+        Find each sheet filename (name → filename) in images_dir and copy
+        the files into storage in parallel. Returns the IngestReport
+        (`names`: name → stored name); references are counted when the
+        rows are written.
+        """
+        from places.image_ingest import ImageDirectory, IngestReport, ingest_images
+
+        if not images:
+            return IngestReport()
+        directory = ImageDirectory(images_dir)
+        field     = model._meta.get_field('image')
+        items     = {}
+        for name, filename in images.items():
+            path = directory.find(filename)
+            if path is None:
                 self.stderr.write(
-                    f"  [TRAIL_PLACE] Row {i} '{trail_name}→{place_name}': "
-                    f"unexpected error — {e}"
+                    f"  [{label}] '{name}': image file "
+                    f"'{os.path.join(images_dir, filename)}' not found — skipped."
                 )
                 continue
+            items[name] = (path, field.generate_filename(model(name=name), os.path.basename(path)))
+
+        if dry_run or not items:
+            return IngestReport()
+        report = ingest_images(
+            items, field.storage, workers=self.image_workers, progress=self.verbosity > 0,
+        )
+        for name, reason in report.errors.items():
+            self.stderr.write(f"  [{label}] '{name}': unreadable image {reason} — skipped.")
+        self.stdout.write(
+            f"  Images: {report.copied} copied, {report.transcoded} transcoded, "
+            f"{report.reused} already stored, {len(report.errors)} failed."
+        )
+        return report
 
-        if not dry_run:
-            self.stdout.write(f"  Trail places: {upserted_count} upserted.")
+    # ============================================================
+    # BULK WRITES
+    # ============================================================
+
+    def _existing(self, model, key, keys, values=None):
+        """
+        key → instance (or → `values` column) for the rows already stored,
+        looked up in LOOKUP_SIZE batches. Where a key is duplicated in the
+        table, the oldest row wins.
+        """
+        keys  = list(keys)
+        found = {}
+        for start in range(0, len(keys), LOOKUP_SIZE):
+            qs = model.objects.filter(**{f'{key}__in': keys[start:start + LOOKUP_SIZE]})
+            qs = qs.order_by('-pk')
+            if values:
+                found.update(qs.values_list(key, values))
+            else:
+                found.update((getattr(obj, key), obj) for obj in qs)
+        return found
+
+    def _apply(self, obj, values):
+        """Set `values` on obj; True if anything actually changed."""
+        changed = False
+        for field, value in values.items():
+            current = getattr(obj, field)
+            if hasattr(current, 'name') and not isinstance(current, str):
+                current = current.name          # FieldFile
+            if current != value:
+                setattr(obj, field, value)
+                changed = True
+        return changed
+
+    def _diff(self, model, key, rows, existing):
+        """Split sheet rows into (new instances, changed instances, unchanged count)."""
+        to_create = []
+        to_update = []
+        unchanged = 0
+        for value, values in rows.items():
+            obj = existing.get(value)
+            if obj is None:
+                to_create.append(model(**{key: value}, **values))
+            elif self._apply(obj, values):
+                to_update.append(obj)
+            else:
+                unchanged += 1
+        return to_create, to_update, unchanged
+
+    def _bulk(self, model, to_create, to_update, fields):
+        from places.caching import bump_model_version
+
+        model.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        if to_update and fields:
+            model.objects.bulk_update(to_update, fields, batch_size=BATCH_SIZE)
+        if to_create or to_update:
+            # bulk writes send no post_save, so invalidate caches here
+            transaction.on_commit(lambda: bump_model_version(model))
+
+    def _write(self, label, writes, checkpoint, references=None):
+        """
+        Apply [(model, to_create, to_update, fields)] and record the
+        checkpoint (sheet, rows done, total rows) in one transaction,
+        together with the image references (storage, report, changes)
+        the rows take (see update_references); False if rolled back.
+        """
+        from places.image_ingest import update_references
+
+        try:
+            with transaction.atomic():
+                for model, to_create, to_update, fields in writes:
+                    self._bulk(model, to_create, to_update, fields)
+                if references:
+                    update_references(*references)
+                self._checkpoint(*checkpoint)
+        except DatabaseError as e:
+            self.stderr.write(f"  [{label}] chunk rolled back: {e}")
+            self.failed = True
+            return False
+        return True
+
+    def _report(self, label, counts, started, dry_run):
+        elapsed = time.perf_counter() - started
+        rows    = counts['rows']
+        self.total_rows += rows
+        prefix  = 'would be ' if dry_run else ''
+        self.stdout.write(
+            f"  {label}: {counts['created']} {prefix}created, {counts['updated']} {prefix}updated, "
+            f"{counts['unchanged']} unchanged, {counts['skipped']} skipped — "
+            f"{rows:,} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)"
+        )
+
+    # ============================================================
+    # CHUNKS & CHECKPOINTS
+    # ============================================================
+
+    def _fingerprint(self, path):
+        """SHA-256 of the workbook — checkpoints only apply to the same file."""
+        sha = hashlib.sha256()
+        with open(path, 'rb') as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def _read_sheet(self, xls, sheet, what):
+        """The sheet as a DataFrame, or None if it's missing or a resumed run already finished it."""
+        if sheet not in xls.sheet_names:
+            self.stdout.write(self.style.WARNING(
+                f"Sheet '{sheet}' not found — skipping {what}."
+            ))
+            return None
+        df = pd.read_excel(xls, sheet)
+        if sheet in self.checkpoints and self.checkpoints[sheet] >= len(df):
+            self.stdout.write(f"Sheet '{sheet}' already imported — skipping {what}.")
+            return None
+        return df
+
+    def _chunks(self, sheet, df, counts):
+        """
+        (start, stop) row positions still to import, chunk_rows at a
+        time, starting after the last chunk a resumed run committed.
+        Adds the rows handed out to counts['rows'].
+        """
+        done = self.checkpoints.get(sheet, 0)
+        if done:
+            self.stdout.write(
+                f"  Resuming '{sheet}' at row {done + 2:,} — {done:,} row(s) already imported."
+            )
+        for start in range(done, len(df), self.chunk_rows):
+            stop = min(start + self.chunk_rows, len(df))
+            counts['rows'] += stop - start
+            yield start, stop
+
+    def _checkpoint(self, sheet, rows_done, total_rows):
+        """Record progress; called inside the transaction that wrote the chunk."""
+        ImportCheckpoint.objects.update_or_create(
+            workbook=self.workbook, sheet=sheet,
+            defaults={'rows_done': rows_done, 'total_rows': total_rows},
+        )
 
     # ============================================================
     # HELPERS
@@ -663,11 +1043,11 @@ class Command(BaseCommand):
         s = str(val).strip()
         return s if s else default
 
-    def parse_slugs(self, val):
-        """Parse a comma-separated slug string into a list of slugified values."""
-        if val is None or (isinstance(val, float) and pd.isna(val)):
-            return []
-        return [slugify(s.strip()) for s in str(val).split(',') if s.strip()]
+    def column_values(self, df, column):
+        """Distinct cleaned, non-empty values of a sheet column."""
+        if column not in df.columns:
+            return set()
+        return {self.clean(v) for v in df[column]} - {None}
 
     def parse_json(self, val, field='field', row=None, label=''):
         """
@@ -684,4 +1064,4 @@ class Command(BaseCommand):
             self.stderr.write(
                 f"  [{label}] {loc}: invalid JSON in '{field}': {e} — skipped."
             )
-            return None
\ No newline at end of file
+            return None
@@ -18,10 +18,12 @@ Usage:
 import os
 import pandas as pd
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
 from django.utils.text import slugify
-from django.core.files import File
 from django.contrib.auth.models import User
 
+from places.import_validation import validate_places, write_issues
 from places.models import Place, Category
 
 
@@ -41,9 +43,6 @@ COL = {
     'image_filename': 'Image Filename\n(save as)',
 }
 
-VALID_DIFFICULTIES = {'easy', 'moderate', 'challenging'}
-VALID_STATUSES     = {'approved', 'pending', 'rejected'}
-
 
 class Command(BaseCommand):
     help = 'Import places and categories from Expearls Excel file'
@@ -79,6 +78,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip category import (if already imported)',
         )
+        parser.add_argument(
+            '--issues-csv',
+            default=None,
+            help='Also write every validation issue to this CSV file',
+        )
+        parser.add_argument(
+            '--image-workers',
+            type=int,
+            default=8,
+            help='Threads copying images into storage (default: 8)',
+        )
 
     # ─────────────────────────────────────────────────────────────────────────
     def handle(self, *args, **options):
@@ -88,6 +98,10 @@ class Command(BaseCommand):
         dry_run    = options['dry_run']
         skip_cats  = options['skip_categories']
 
+        self.verbosity        = options['verbosity']
+        self.issues_csv       = options['issues_csv']
+        self.sheet_categories = set()
+
         if not os.path.exists(file_path):
             raise CommandError(f"File not found: {file_path}")
 
@@ -114,7 +128,9 @@ class Command(BaseCommand):
         # Import places
         if 'Places (Import Ready)' in xls.sheet_names:
             places_df = pd.read_excel(xls, sheet_name='Places (Import Ready)', header=0)
-            self._import_places(places_df, admin_user, images_dir, update, dry_run)
+            self._import_places(
+                places_df, admin_user, images_dir, update, dry_run, options['image_workers']
+            )
         else:
             raise CommandError("No 'Places (Import Ready)' sheet found in the Excel file.")
 
@@ -151,6 +167,7 @@ class Command(BaseCommand):
             if not raw_slug or raw_slug == 'nan' or not name or name == 'nan':
                 continue
             slug = slugify(raw_slug)
+            self.sheet_categories.add(slug)
 
             if dry_run:
                 exists = Category.objects.filter(slug=slug).exists()
@@ -174,61 +191,34 @@ class Command(BaseCommand):
         ))
 
     # ─────────────────────────────────────────────────────────────────────────
-    def _import_places(self, df, admin_user, images_dir, update, dry_run):
+    def _import_places(self, df, admin_user, images_dir, update, dry_run, image_workers):
         self.stdout.write(self.style.HTTP_INFO('── Importing Places ──'))
 
         created_count = updated_count = skipped_count = error_count = 0
+        pending_images = []
+
+        # ── Validate the whole sheet at once; only clean rows go on ──────────
+        categories = Category.objects.in_bulk(field_name='slug')
+        clean, issues = validate_places(
+            df, COL, sheet='Places (Import Ready)',
+            known_categories=set(categories) | self.sheet_categories,
+            default_difficulty='moderate',
+        )
+        error_count = write_issues(self, issues, 'PLACE', self.issues_csv)
+        existing    = set(
+            Place.objects.filter(name__in=list(clean['name'])).values_list('name', flat=True)
+        )
 
-        for idx, row in df.iterrows():
-            row_num = idx + 2
-
-            # ── Required fields ───────────────────────────────────────────────
-            name = self._clean_str(row.get(COL['name']))
-            if not name:
-                self.stdout.write(self.style.ERROR(
-                    f"  Row {row_num}: Skipping — empty Name."
-                ))
-                error_count += 1
-                continue
-
-            description   = self._clean_str(row.get(COL['description']),   default='')
-            legends       = self._clean_str(row.get(COL['legends']),        default='')
-            accessibility = self._clean_str(row.get(COL['accessibility']),  default='')
-            best_time     = self._clean_str(row.get(COL['best_time']),      default='')
-
-            try:
-                latitude  = float(row.get(COL['latitude'],  0) or 0)
-                longitude = float(row.get(COL['longitude'], 0) or 0)
-            except (ValueError, TypeError):
-                self.stdout.write(self.style.WARNING(
-                    f"  Row {row_num} ({name}): Bad coordinates — using 0,0."
-                ))
-                latitude = longitude = 0.0
-
-            difficulty = self._clean_str(
-                row.get(COL['difficulty']), default='moderate'
-            ).lower()
-            if difficulty not in VALID_DIFFICULTIES:
-                difficulty = 'moderate'
-
-            try:
-                safety_rating = int(float(row.get(COL['safety'], 3) or 3))
-                safety_rating = max(1, min(5, safety_rating))
-            except (ValueError, TypeError):
-                safety_rating = 3
-
-            status = self._clean_str(
-                row.get(COL['status']), default='pending'
-            ).lower()
-            if status not in VALID_STATUSES:
-                status = 'pending'
-
-            cat_slugs      = self._parse_category_slugs(row.get(COL['categories']))
-            image_filename = self._clean_str(row.get(COL['image_filename']), default='')
+        for row in clean.itertuples(index=False):
+            name           = row.name
+            difficulty     = row.difficulty
+            safety_rating  = row.safety_rating
+            cat_slugs      = row.categories
+            image_filename = row.image_filename
 
             # ── Dry run ───────────────────────────────────────────────────────
             if dry_run:
-                exists = Place.objects.filter(name=name).exists()
+                exists = name in existing
                 label  = 'UPDATE' if (exists and update) else ('SKIP' if exists else 'CREATE')
                 self.stdout.write(
                     f"  [{label}] {name} | {difficulty} | "
@@ -242,30 +232,30 @@ class Command(BaseCommand):
             place, created = Place.objects.get_or_create(
                 name=name,
                 defaults={
-                    'description':        description,
-                    'legends_stories':    legends,
-                    'latitude':           latitude,
-                    'longitude':          longitude,
+                    'description':        row.description,
+                    'legends_stories':    row.legends_stories,
+                    'latitude':           row.latitude,
+                    'longitude':          row.longitude,
                     'difficulty':         difficulty,
-                    'accessibility_info': accessibility,
-                    'best_time_to_visit': best_time,
+                    'accessibility_info': row.accessibility_info,
+                    'best_time_to_visit': row.best_time_to_visit,
                     'safety_rating':      safety_rating,
-                    'status':             status,
+                    'status':             row.status,
                     'created_by':         admin_user,
                 }
             )
 
             if not created:
                 if update:
-                    place.description        = description
-                    place.legends_stories    = legends
-                    place.latitude           = latitude
-                    place.longitude          = longitude
+                    place.description        = row.description
+                    place.legends_stories    = row.legends_stories
+                    place.latitude           = row.latitude
+                    place.longitude          = row.longitude
                     place.difficulty         = difficulty
-                    place.accessibility_info = accessibility
-                    place.best_time_to_visit = best_time
+                    place.accessibility_info = row.accessibility_info
+                    place.best_time_to_visit = row.best_time_to_visit
                     place.safety_rating      = safety_rating
-                    place.status             = status
+                    place.status             = row.status
                     place.save()
                     updated_count += 1
                     self.stdout.write(f"  [UPDATED] {name}")
@@ -276,40 +266,14 @@ class Command(BaseCommand):
                 created_count += 1
                 self.stdout.write(f"  [CREATED] {name}")
 
-            # ── Categories ────────────────────────────────────────────────────
-            for slug in cat_slugs:
-                try:
-                    place.category.add(Category.objects.get(slug=slug))
-                except Category.DoesNotExist:
-                    self.stdout.write(self.style.WARNING(
-                        f"    Category '{slug}' not found — skipped for '{name}'"
-                    ))
+            # ── Categories (unknown slugs were dropped by validation) ─────────
+            place.category.add(*[categories[slug] for slug in cat_slugs if slug in categories])
 
-            # ── Image ─────────────────────────────────────────────────────────
+            # ── Image (copied in parallel once every row is in) ───────────────
             if image_filename and not place.image:
-                # List of extensions to try if file doesn't exist
-                possible_extensions = ['', '.jpg', '.jpeg', '.png', '.webp', '.gif']
-                found_image = False
-
-                for ext in possible_extensions:
-                    # Add extension if not already present
-                    if not image_filename.lower().endswith(ext):
-                        trial_filename = image_filename + ext
-                    else:
-                        trial_filename = image_filename
-
-                    image_path = os.path.join(images_dir, trial_filename)
-                    if os.path.isfile(image_path):
-                        with open(image_path, 'rb') as f:
-                            place.image.save(trial_filename, File(f), save=True)
-                        self.stdout.write(f"    Image: {trial_filename}")
-                        found_image = True
-                        break  # stop after first valid file
-
-                if not found_image:
-                    self.stdout.write(self.style.WARNING(
-                        f"    Image not found for '{name}': {image_filename}"
-                    ))
+                pending_images.append((place, image_filename))
+
+        self._attach_images(pending_images, images_dir, image_workers)
 
         # ── Summary ───────────────────────────────────────────────────────────
         self.stdout.write('')
@@ -327,15 +291,59 @@ class Command(BaseCommand):
             ))
 
     # ─────────────────────────────────────────────────────────────────────────
-    @staticmethod
-    def _clean_str(value, default=None):
-        if value is None or (isinstance(value, float) and pd.isna(value)):
-            return default
-        s = str(value).strip()
-        return s if s and s.lower() != 'nan' else default
-
-    @staticmethod
-    def _parse_category_slugs(value):
-        if not value or (isinstance(value, float) and pd.isna(value)):
-            return []
-        return [slugify(s.strip()) for s in str(value).split(',') if s.strip()]
\ No newline at end of file
+    def _attach_images(self, pending, images_dir, workers):
+        """
+        Resolve every (place, filename) against one index of images_dir,
+        copy the files into storage in a thread pool, then point the
+        places at them with a single bulk_update.
+        """
+        from places.caching import bump_model_version
+        from places.image_ingest import ImageDirectory, ingest_images, update_references
+        from places.image_processing import generate_variants_later
+
+        if not pending:
+            return
+
+        directory = ImageDirectory(images_dir)
+        field     = Place._meta.get_field('image')
+        places    = {}
+        items     = {}
+        for place, image_filename in pending:
+            path = directory.find(image_filename)
+            if path is None:
+                self.stdout.write(self.style.WARNING(
+                    f"    Image not found for '{place.name}': {image_filename}"
+                ))
+                continue
+            places[place.pk] = place
+            items[place.pk]  = (path, field.generate_filename(place, os.path.basename(path)))
+
+        report = ingest_images(
+            items, field.storage, workers=workers, progress=self.verbosity > 0,
+        )
+        for pk, reason in report.errors.items():
+            self.stdout.write(self.style.WARNING(
+                f"    Image unreadable for '{places[pk].name}': {reason}"
+            ))
+        previous = {pk: places[pk].image.name for pk in report.names}
+        for pk, name in report.names.items():
+            places[pk].image = name
+
+        updated = [places[pk] for pk in report.names if previous[pk] != places[pk].image.name]
+        now     = timezone.now()
+        for place in updated:
+            place.updated_at = now          # bulk_update skips auto_now
+        with transaction.atomic():
+            Place.objects.bulk_update(updated, ['image', 'updated_at'], batch_size=500)
+            update_references(field.storage, report, [
+                (previous[place.pk], place.image.name) for place in updated
+            ])
+        if updated:
+            bump_model_version(Place)
+        for place in updated:
+            generate_variants_later(place.image.name)
+
+        self.stdout.write(
+            f"  Images: {report.copied} copied, {report.transcoded} transcoded, "
+            f"{report.reused} already stored, {len(report.errors)} failed."
+        )
@@ -0,0 +1,33 @@
+# Run with:
+#   python manage.py rebuild_search_index
+# Or for one model:
+#   python manage.py rebuild_search_index --model place
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Recompute full-text search vectors for places, trails and tours'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            type=str,
+            choices=['place', 'trail', 'tourpackage'],
+            help='Only rebuild this model',
+        )
+
+    def handle(self, *args, **options):
+        from places.search import SEARCH_FIELDS, rebuild_search_index
+
+        models = [
+            m for m in SEARCH_FIELDS
+            if not options.get('model') or m._meta.model_name == options['model']
+        ]
+        if not models:
+            raise CommandError('Nothing to rebuild.')
+
+        for model in models:
+            written = rebuild_search_index(model)
+            self.stdout.write(f'  {model._meta.verbose_name_plural}: {written}')
+        self.stdout.write(self.style.SUCCESS('Done.'))
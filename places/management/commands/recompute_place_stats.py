@@ -0,0 +1,53 @@
+# Run with:
+#   python manage.py recompute_place_stats
+# Or for a single place:
+#   python manage.py recompute_place_stats --slug sigiriya-rock
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalised rating / check-in / vote / comment counters on Place'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--slug',
+            type=str,
+            help='Only recompute this place',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Places per UPDATE (keeps row locks short on big tables)',
+        )
+
+    def handle(self, *args, **options):
+        from places.caching import bump_model_version
+        from places.models import Place
+        from places.place_stats import recompute_place_stats
+
+        slug = options.get('slug')
+        if slug:
+            places = Place.objects.filter(slug=slug)
+            if not places.exists():
+                self.stderr.write(f'Place "{slug}" not found.')
+                return
+            recompute_place_stats(places)
+            bump_model_version(Place)  # update() skips post_save
+            self.stdout.write(self.style.SUCCESS(f'Recomputed stats for "{slug}".'))
+            return
+
+        batch_size = max(1, options['batch_size'])
+        ids        = list(Place.objects.order_by('pk').values_list('pk', flat=True))
+        updated    = 0
+
+        self.stdout.write(f'Recomputing stats for {len(ids)} place(s)...')
+        for start in range(0, len(ids), batch_size):
+            chunk    = ids[start:start + batch_size]
+            updated += recompute_place_stats(
+                Place.objects.filter(pk__gte=chunk[0], pk__lte=chunk[-1])
+            )
+
+        bump_model_version(Place)  # update() skips post_save
+        self.stdout.write(self.style.SUCCESS(f'Done. {updated} place(s) updated.'))
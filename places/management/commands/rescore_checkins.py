@@ -0,0 +1,196 @@
+# Run with:
+#   python manage.py rescore_checkins --dry-run
+#   python manage.py rescore_checkins
+# Also correct points_awarded and the owners' profile points:
+#   python manage.py rescore_checkins --adjust-points
+#
+# Re-applies places/checkin_trust.py to every check-in, e.g. after tuning
+# MAX_GPS_DISTANCE_KM or the tier thresholds.
+
+import os
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+
+
+def _read_exif(name):
+    from places.image_processing import exif_job
+    return exif_job(name)
+
+
+class Command(BaseCommand):
+    help = 'Recompute trust scores (and optionally points) for existing check-ins'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report tier changes without writing anything',
+        )
+        parser.add_argument(
+            '--adjust-points',
+            action='store_true',
+            help="Also rewrite points_awarded and apply the difference to users' points",
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes reading photo EXIF in parallel',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Check-ins scored and written per batch',
+        )
+
+    def handle(self, *args, **options):
+        from places.image_processing import process_pool
+        from places.models import CheckIn
+
+        self.dry_run       = options['dry_run']
+        self.adjust_points = options['adjust_points']
+        chunk_size         = max(1, options['chunk_size'])
+
+        rows = (
+            CheckIn.objects.order_by('pk')
+            .values_list(
+                'pk', 'user_id', 'photo_proof', 'location_verified', 'created_at',
+                'place__latitude', 'place__longitude', 'trust_score', 'points_awarded',
+            )
+            .iterator(chunk_size=chunk_size)
+        )
+
+        self.transitions = Counter()
+        self.deltas      = defaultdict(int)
+        self.seen        = self.changed = 0
+
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN — no changes will be saved.'))
+
+        with process_pool(max(1, options['workers'])) as pool:
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    self._rescore(chunk, pool)
+                    chunk = []
+            if chunk:
+                self._rescore(chunk, pool)
+
+        if self.adjust_points and not self.dry_run:
+            self._recalculate_levels(list(self.deltas))
+        self._report()
+
+    # ============================================================
+
+    def _rescore(self, chunk, pool):
+        import numpy as np
+        from django.db import transaction
+        from django.utils import timezone
+
+        from places.caching import bump_model_version
+        from places.checkin_trust import compute_trust_scores, trust_tier
+        from places.models import CheckIn, UserProfile
+
+        photos = [name for _, _, name, *_ in chunk if name]
+        exif   = dict(zip(photos, pool.map(_read_exif, photos, chunksize=32)))
+
+        n         = len(chunk)
+        has_photo = np.zeros(n, dtype=bool)
+        verified  = np.zeros(n, dtype=bool)
+        exif_lat, exif_lng, taken_at, place_lat, place_lng, submitted_at = (
+            np.full(n, np.nan) for _ in range(6)
+        )
+        for i, (_, _, name, location_verified, created_at, lat, lng, _, _) in enumerate(chunk):
+            has_photo[i]    = bool(name)
+            verified[i]     = location_verified
+            submitted_at[i] = created_at.timestamp()
+            place_lat[i]    = lat if lat is not None else np.nan
+            place_lng[i]    = lng if lng is not None else np.nan
+            info = exif.get(name) if name else None
+            if info:
+                if info['gps_lat'] is not None and info['gps_lng'] is not None:
+                    exif_lat[i], exif_lng[i] = info['gps_lat'], info['gps_lng']
+                if info['timestamp'] is not None:
+                    taken = info['timestamp']
+                    taken_at[i] = (
+                        timezone.make_aware(taken) if timezone.is_naive(taken) else taken
+                    ).timestamp()
+
+        scores, tiers, points = compute_trust_scores(
+            has_photo, exif_lat, exif_lng, taken_at,
+            place_lat, place_lng, submitted_at, verified,
+        )
+
+        updates = []
+        fields  = ['trust_score', 'points_awarded'] if self.adjust_points else ['trust_score']
+        fields += ['updated_at']            # bulk_update skips auto_now; delta exports need it
+        stamp   = timezone.now()
+        deltas  = defaultdict(int)
+        for i, (pk, user_id, _, _, _, _, _, old_score, old_points) in enumerate(chunk):
+            new_score  = int(scores[i])
+            new_points = int(points[i]) if self.adjust_points else old_points
+            if new_score == old_score and new_points == old_points:
+                continue
+            self.transitions[(trust_tier(old_score), str(tiers[i]))] += 1
+            if new_points != old_points:
+                deltas[user_id] += new_points - old_points
+            updates.append(CheckIn(pk=pk, trust_score=new_score, points_awarded=new_points,
+                                   updated_at=stamp))
+
+        self.seen    += n
+        self.changed += len(updates)
+        for user_id, delta in deltas.items():
+            self.deltas[user_id] += delta
+
+        if updates and not self.dry_run:
+            with transaction.atomic():
+                CheckIn.objects.bulk_update(updates, fields, batch_size=500)
+                self._apply_point_deltas(deltas)
+                bump_model_version(CheckIn)  # bulk_update skips post_save
+                if deltas:
+                    bump_model_version(UserProfile)
+        self.stdout.write(f'  {self.seen} scored, {self.changed} changed')
+
+    def _apply_point_deltas(self, deltas):
+        """One UPDATE per 500 users: points = points + CASE user_id WHEN … END."""
+        from django.db.models import Case, F, IntegerField, Value, When
+
+        from places.models import UserProfile
+
+        items = [(u, d) for u, d in deltas.items() if d]
+        for start in range(0, len(items), 500):
+            batch = items[start:start + 500]
+            UserProfile.objects.filter(user_id__in=[u for u, _ in batch]).update(
+                points=F('points') + Case(
+                    *[When(user_id=u, then=Value(d)) for u, d in batch],
+                    default=Value(0), output_field=IntegerField(),
+                )
+            )
+
+    def _recalculate_levels(self, user_ids):
+        from django.db.models import Case, Value, When
+
+        from places.models import UserProfile
+        from places.views import LEVEL_THRESHOLDS
+
+        level = Case(
+            *[When(points__gte=threshold, then=Value(lvl)) for threshold, lvl in LEVEL_THRESHOLDS],
+            default=Value(1),
+        )
+        for start in range(0, len(user_ids), 500):
+            UserProfile.objects.filter(user_id__in=user_ids[start:start + 500]).update(level=level)
+
+    def _report(self):
+        self.stdout.write(f'\n{self.changed} of {self.seen} check-in(s) changed.')
+        for (old, new), count in sorted(self.transitions.items(), key=lambda t: -t[1]):
+            label = f'{old} → {new}' if old != new else f'{old} (same tier)'
+            self.stdout.write(f'  {label:<30} {count}')
+        if self.adjust_points:
+            total = sum(self.deltas.values())
+            users = sum(1 for d in self.deltas.values() if d)
+            self.stdout.write(f'  points {total:+d} across {users} user(s)')
+        if not self.dry_run:
+            self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,259 @@
+"""
+places/management/commands/restore_export.py
+
+Usage:
+    python manage.py restore_export db_backup_2026-10-01.xlsx
+    python manage.py restore_export db_backup_2026-10-01.xlsx db_delta_2026-10-02_0300.xlsx
+    python manage.py restore_export backup/ delta/ --dry-run
+
+Replays a full export (manage.py export_all_data) and then each delta
+after it, in the order given, in one transaction. Rows are upserted by
+primary key with their exported timestamps kept; a sheet exported in
+full also removes the rows it no longer has, and a delta's tombstones
+remove the rows deleted since the export before it.
+
+Place counters are recomputed from the restored rows: replaying a
+deletion runs the counter receivers against a place that may already
+hold its exported, post-deletion counts. Search documents and
+recommendations are left for their rebuild commands (printed at the end).
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from places.caching import bump_model_version
+from places.export import ExportReader, export_models, from_export
+from places.models import Place, Tombstone
+from places.place_stats import recompute_place_stats
+from places.watermarks import DELTA_OVERLAP, TOMBSTONE_SHEET
+
+BATCH_SIZE = 1000
+
+
+@contextmanager
+def _keep_timestamps(models):
+    """Turn auto_now / auto_now_add off so exported timestamps are written as they are."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = "Restore a full export and the delta exports after it"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="+",
+            help="The full export (xlsx file or csv/parquet directory), then its deltas in order",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Restore and roll back, reporting what would change",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Rows read and upserted per statement",
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = max(1, options["batch_size"])
+        self.by_sheet   = dict(export_models()[0])
+        readers         = []
+        try:
+            for path in options["paths"]:
+                try:
+                    readers.append(ExportReader(path))
+                except (OSError, KeyError, ValueError) as exc:
+                    raise CommandError(f"Cannot read export '{path}': {exc}")
+            self._check_chain(options["paths"], readers)
+
+            models  = {self._model(entry) for reader in readers for entry in reader.manifest
+                       if entry["sheet"] != TOMBSTONE_SHEET}
+            models.discard(None)
+            clock   = time.perf_counter()
+
+            with transaction.atomic(), _keep_timestamps(models):
+                # By id, not time: on Postgres the tombstones are stamped
+                # by the database clock
+                last = Tombstone.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+                for path, reader in zip(options["paths"], readers):
+                    self.stdout.write(f"\nRestoring {path}")
+                    self._restore(reader)
+
+                # The deletions above were recorded like any other; they
+                # are part of the restored history, not new ones
+                Tombstone.objects.filter(pk__gt=last).delete()
+                if Place in models:
+                    recompute_place_stats()
+                self._reset_sequences(models)
+                if options["dry_run"]:
+                    transaction.set_rollback(True)
+        finally:
+            for reader in readers:
+                reader.close()
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("\nDry run — rolled back."))
+            return
+        for model in models:
+            bump_model_version(model)
+        self.stdout.write(self.style.SUCCESS(
+            f"\nRestored {len(readers)} export(s) in {time.perf_counter() - clock:.1f}s."
+        ))
+        self.stdout.write(
+            "Now run: rebuild_search_index, build_related_places, build_recommendations"
+        )
+
+    # ─────────────────────────────────────────────────────────
+    # Checks
+    # ─────────────────────────────────────────────────────────
+
+    def _check_chain(self, paths, readers):
+        """The first export must be full, and each delta must follow on from the one before."""
+        previous = None
+        for path, reader in zip(paths, readers):
+            modes = {entry["mode"] for entry in reader.manifest}
+            if previous is None and modes - {"full", ""}:
+                raise CommandError(f"'{path}' is a delta; start from a full export.")
+            # A delta read from DELTA_OVERLAP before the watermark the
+            # export before it left
+            starts = [parse_datetime(e["since"]) + DELTA_OVERLAP for e in reader.manifest if e["since"]]
+            if previous is not None and starts and min(starts) > previous:
+                raise CommandError(
+                    f"'{path}' follows an export that ended at {min(starts):%Y-%m-%d %H:%M:%S}, "
+                    f"not the one before it ({previous:%Y-%m-%d %H:%M:%S}) — a delta is missing."
+                )
+            ends = [parse_datetime(e["until"]) for e in reader.manifest if e["until"]]
+            if previous is not None and not ends:
+                raise CommandError(f"'{path}' has no manifest, so it cannot follow another export.")
+            previous = max(ends) if ends else None
+
+    def _model(self, entry):
+        if entry["model"]:
+            try:
+                return apps.get_model(entry["model"])
+            except (LookupError, ValueError):
+                pass
+        return self.by_sheet.get(entry["sheet"])
+
+    # ─────────────────────────────────────────────────────────
+    # Restore
+    # ─────────────────────────────────────────────────────────
+
+    def _restore(self, reader):
+        tombstones = None
+        for entry in reader.manifest:
+            if entry["sheet"] == TOMBSTONE_SHEET:
+                tombstones = entry
+                continue
+            model = self._model(entry)
+            if model is None:
+                self.stdout.write(self.style.WARNING(f"  ⚠  '{entry['sheet']}' — unknown model, skipped"))
+                continue
+            full = entry["mode"] in ("full", "")
+            if full and model.objects.exists():
+                removed = self._remove_missing(reader, entry["sheet"], model)
+            else:
+                removed = 0
+            rows = self._upsert(reader, entry["sheet"], model)
+            self.stdout.write(
+                f"  {self.style.SUCCESS('✓')}  {entry['sheet']:<28} {rows:>6,} rows"
+                + (f", {removed:,} removed" if removed else "")
+            )
+        if tombstones:
+            self._apply_tombstones(reader, tombstones["sheet"])
+
+    def _columns(self, model, columns):
+        """[(position, field)] for the columns the model still has."""
+        fields = {}
+        for field in model._meta.concrete_fields:
+            fields[field.name] = fields[field.attname] = field
+        return [(i, fields[name]) for i, name in enumerate(columns) if name in fields]
+
+    def _pk_position(self, model, columns):
+        pk = model._meta.pk
+        for i, field in self._columns(model, columns):
+            if field is pk:
+                return i
+        raise CommandError(f"{model._meta.label}: no '{pk.name}' column in the export.")
+
+    def _upsert(self, reader, sheet, model):
+        pk     = model._meta.pk
+        update = [f.name for f in model._meta.concrete_fields if not f.primary_key]
+        count  = 0
+        for columns, rows in reader.chunks(sheet, self.batch_size):
+            self._pk_position(model, columns)   # a sheet without its pk cannot be upserted
+            mapped = self._columns(model, columns)
+            objs   = [
+                model(**{field.attname: from_export(field, row[i]) for i, field in mapped})
+                for row in rows
+            ]
+            model.objects.bulk_create(
+                objs,
+                update_conflicts=bool(update),
+                ignore_conflicts=not update,
+                unique_fields=[pk.name] if update else None,
+                update_fields=update or None,
+            )
+            count += len(objs)
+        return count
+
+    def _remove_missing(self, reader, sheet, model):
+        """Delete the rows a full sheet no longer has, before upserting it."""
+        pk   = model._meta.pk
+        seen = set()
+        for columns, rows in reader.chunks(sheet, self.batch_size):
+            i = self._pk_position(model, columns)
+            seen.update(from_export(pk, row[i]) for row in rows)
+
+        missing = [
+            value for value in model.objects.values_list("pk", flat=True).iterator(chunk_size=self.batch_size)
+            if value not in seen
+        ]
+        for start in range(0, len(missing), self.batch_size):
+            model.objects.filter(pk__in=missing[start:start + self.batch_size]).delete()
+        return len(missing)
+
+    def _apply_tombstones(self, reader, sheet):
+        doomed = defaultdict(list)
+        for columns, rows in reader.chunks(sheet, self.batch_size):
+            index = {name: i for i, name in enumerate(columns)}
+            for row in rows:
+                doomed[row[index["model"]]].append(row[index["object_pk"]])
+
+        for label, pks in doomed.items():
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError):
+                self.stdout.write(self.style.WARNING(f"  ⚠  tombstones for unknown model '{label}' skipped"))
+                continue
+            pks = [model._meta.pk.to_python(value) for value in pks]
+            for start in range(0, len(pks), self.batch_size):
+                model.objects.filter(pk__in=pks[start:start + self.batch_size]).delete()
+            self.stdout.write(f"  {self.style.SUCCESS('✓')}  {'deleted ' + model.__name__:<28} {len(pks):>6,} rows")
+
+    def _reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), list(models))
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,44 @@
+# Run with (e.g. hourly from cron):
+#   python manage.py rollup_stats
+# Rebuild a range:
+#   python manage.py rollup_stats --since 2026-01-01 --until 2026-03-31
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date "{value}" — use YYYY-MM-DD.')
+
+
+class Command(BaseCommand):
+    help = 'Roll up daily analytics (users, places, check-ins, active users, categories) since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='First day to (re)build, YYYY-MM-DD. Default: the last rolled-up day',
+        )
+        parser.add_argument(
+            '--until',
+            type=str,
+            help='Last day to build, YYYY-MM-DD. Default: today',
+        )
+
+    def handle(self, *args, **options):
+        from places.analytics import default_rollup_start, rollup_daily_stats
+        from django.utils import timezone
+
+        start = _parse_date(options['since']) if options.get('since') else default_rollup_start()
+        end   = _parse_date(options['until']) if options.get('until') else timezone.localdate()
+        if start > end:
+            raise CommandError('--since is after --until.')
+
+        self.stdout.write(f'Rolling up {start} .. {end}...')
+        days = rollup_daily_stats(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Done. {days} day(s) written.'))
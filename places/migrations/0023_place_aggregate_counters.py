@@ -0,0 +1,63 @@
+# Generated by Django 6.0.3 on 2026-10-19 10:00
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Place   = apps.get_model('places', 'Place')
+    CheckIn = apps.get_model('places', 'CheckIn')
+    Comment = apps.get_model('places', 'Comment')
+    Vote    = apps.get_model('places', 'Vote')
+
+    def count(model, **filters):
+        sub = (
+            model.objects.filter(place=OuterRef('pk'), **filters)
+            .order_by().values('place').annotate(n=Count('pk')).values('n')
+        )
+        return Coalesce(Subquery(sub, output_field=models.IntegerField()), Value(0))
+
+    rating_avg = (
+        Comment.objects.filter(place=OuterRef('pk'), rating__isnull=False)
+        .order_by().values('place').annotate(a=Avg('rating')).values('a')
+    )
+    Place.objects.update(
+        rating_avg      = Coalesce(Subquery(rating_avg, output_field=models.FloatField()), Value(0.0)),
+        rating_count    = count(Comment, rating__isnull=False),
+        checkin_count   = count(CheckIn),
+        comment_count   = count(Comment),
+        approval_votes  = count(Vote, vote_type='up'),
+        rejection_votes = count(Vote, vote_type='down'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0022_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='rating_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='checkin_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.3 on 2026-10-19 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0023_place_aggregate_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('new_users', models.IntegerField(default=0)),
+                ('new_places', models.IntegerField(default=0)),
+                ('new_checkins', models.IntegerField(default=0)),
+                ('active_users', models.IntegerField(default=0)),
+                ('active_users_7d', models.IntegerField(default=0)),
+                ('active_users_30d', models.IntegerField(default=0)),
+                ('active_users_90d', models.IntegerField(default=0)),
+                ('total_users', models.IntegerField(default=0)),
+                ('total_places', models.IntegerField(default=0)),
+                ('approved_places', models.IntegerField(default=0)),
+                ('pending_places', models.IntegerField(default=0)),
+                ('total_checkins', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily stats',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('new_places', models.IntegerField(default=0)),
+                ('place_count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='places.category')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily category stats',
+                'ordering': ['-date', 'category__name'],
+                'unique_together': {('date', 'category')},
+            },
+        ),
+    ]
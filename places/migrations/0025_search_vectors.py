@@ -0,0 +1,66 @@
+# Generated by Django 6.0.3 on 2026-10-19 12:00
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCHABLE = {
+    # table: weighted columns — mirrors places/search.py SEARCH_FIELDS
+    'places_place': (
+        ('name', 'A'), ('description', 'B'), ('legends_stories', 'C'),
+    ),
+    'places_trail': (       # category names: run `manage.py rebuild_search_index`
+        ('name', 'A'), ('description', 'B'),
+    ),
+    'places_tourpackage': (
+        ('name', 'A'), ('description', 'B'),
+        ('starting_location', 'C'), ('ending_location', 'C'),
+    ),
+}
+
+
+def create_gin_indexes(apps, schema_editor):
+    # GIN is Postgres-only; other backends use the in-memory fallback index.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, columns in SEARCHABLE.items():
+        vector = ' || '.join(
+            f"setweight(to_tsvector('english', coalesce({col}, '')), '{weight}')"
+            for col, weight in columns
+        )
+        schema_editor.execute(f'UPDATE {table} SET search_vector = {vector}')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_search_gin ON {table} USING gin (search_vector)'
+        )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCHABLE:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0024_dailystats_dailycategorystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='trail',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tourpackage',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_gin_indexes, drop_gin_indexes),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.3 on 2026-10-19 13:00
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+import places.districts
+
+
+def backfill_districts(apps, schema_editor):
+    Place = apps.get_model('places', 'Place')
+    by_district = defaultdict(list)
+    for pk, lat, lng in Place.objects.values_list('pk', 'latitude', 'longitude').iterator():
+        district = places.districts.nearest_district(lat, lng)
+        if district:
+            by_district[district].append(pk)
+    for district, pks in by_district.items():
+        Place.objects.filter(pk__in=pks).update(district=district)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0025_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='district',
+            field=models.CharField(blank=True, choices=places.districts.DISTRICT_CHOICES, db_index=True, max_length=30),
+        ),
+        migrations.RunPython(backfill_districts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.3 on 2026-10-19 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0026_place_district'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPlace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='places.place')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='places.place')),
+            ],
+            options={
+                'ordering': ['place', 'rank'],
+                'indexes': [models.Index(fields=['place', 'rank'], name='relatedplace_place_rank_idx')],
+                'unique_together': {('place', 'related')},
+            },
+        ),
+    ]
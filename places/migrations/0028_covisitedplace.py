@@ -0,0 +1,30 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0027_relatedplace'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoVisitedPlace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('co_visits', models.IntegerField()),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='covisits', to='places.place')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='covisit_of', to='places.place')),
+            ],
+            options={
+                'ordering': ['place', 'rank'],
+                'indexes': [models.Index(fields=['place', 'rank'], name='covisit_place_rank_idx')],
+                'unique_together': {('place', 'similar')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.3 on 2026-10-19 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0030_mediablob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('workbook', models.CharField(max_length=64)),
+                ('sheet', models.CharField(max_length=100)),
+                ('rows_done', models.PositiveIntegerField(default=0)),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('workbook', 'sheet')},
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 6.0.3 on 2026-10-19 21:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+TRACKED = (
+    # label_lower → table — mirrors places/watermarks.py DELTA_FIELDS
+    ('places.placeimage',              'places_placeimage'),
+    ('places.placevideo',              'places_placevideo'),
+    ('places.checkin',                 'places_checkin'),
+    ('places.trailcompletion',         'places_trailcompletion'),
+    ('places.comment',                 'places_comment'),
+    ('places.favorite',                'places_favorite'),
+    ('places.trailfavorite',           'places_trailfavorite'),
+    ('places.userbadge',               'places_userbadge'),
+    ('places.userchallengecompletion', 'places_userchallengecompletion'),
+    ('places.notification',            'places_notification'),
+    ('places.place',                   'places_place'),
+    ('places.tourpackage',             'places_tourpackage'),
+)
+
+
+def create_tombstone_triggers(apps, schema_editor):
+    # One INSERT … SELECT per DELETE statement, from its transition table.
+    # Other backends record tombstones with a post_delete receiver instead
+    # (places/signals.py).
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for label, table in TRACKED:
+        schema_editor.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_tombstone() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO places_tombstone (model, object_pk, deleted_at)
+                SELECT '{label}', gone.id::text, now() FROM gone;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {table}_tombstone
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS gone
+            FOR EACH STATEMENT EXECUTE FUNCTION {table}_tombstone()
+        """)
+
+
+def drop_tombstone_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, table in TRACKED:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_tombstone ON {table}')
+        schema_editor.execute(f'DROP FUNCTION IF EXISTS {table}_tombstone()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0033_modelversion'),
+    ]
+
+    operations = [
+        # Existing rows are stamped now, so the next delta exports them once
+        migrations.AddField(
+            model_name='checkin',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(create_tombstone_triggers, drop_tombstone_triggers),
+    ]
@@ -3,11 +3,16 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.contrib.postgres.search import SearchVectorField
 import json
 import os
 from django.utils.text import slugify
 import uuid
 
+from .checkin_trust import trust_tier
+from .districts import DISTRICT_CHOICES, nearest_district
+from .perceptual_hash import BAND_FIELDS, band_values
+
 
 # ─────────────────────────────────────────────────────────
 # Upload path helpers
@@ -183,6 +188,10 @@ class Place(models.Model):
     accessibility_info = models.TextField(blank=True)
     best_time_to_visit = models.CharField(max_length=200, blank=True)
     safety_rating      = models.IntegerField(choices=SAFETY_CHOICES, default=3)
+    # Pre-filled from the coordinates on save when left blank (see districts.py)
+    district           = models.CharField(
+        max_length=30, choices=DISTRICT_CHOICES, blank=True, db_index=True
+    )
     created_by         = models.ForeignKey(User, on_delete=models.CASCADE)
     updated_by         = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True,
@@ -194,11 +203,31 @@ class Place(models.Model):
     approval_votes     = models.IntegerField(default=0)
     rejection_votes    = models.IntegerField(default=0)
     visit_count        = models.IntegerField(default=0)
+    # Denormalised aggregates — kept current by places/signals.py,
+    # rebuilt from scratch with `manage.py recompute_place_stats`.
+    rating_avg         = models.FloatField(default=0)
+    rating_count       = models.IntegerField(default=0)
+    checkin_count      = models.IntegerField(default=0)
+    comment_count      = models.IntegerField(default=0)
+    # Weighted full-text document, maintained by places/search.py
+    # (GIN index created by migration 0025 on Postgres only)
+    search_vector      = SearchVectorField(null=True, editable=False)
     created_at         = models.DateTimeField(auto_now_add=True)
     updated_at         = models.DateTimeField(auto_now=True)
 
+    # Only ever written with UPDATE … F(); a full save() of a stale instance
+    # must not put back an old value (see save()).
+    COUNTER_FIELDS = (
+        'approval_votes', 'rejection_votes', 'visit_count',
+        'rating_avg', 'rating_count', 'checkin_count', 'comment_count',
+    )
+
     class Meta:
         ordering = ['-created_at']
+        indexes  = [
+            # Keyset pagination on the approved listing
+            models.Index(fields=['status', '-created_at', '-id'], name='place_status_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -210,6 +239,14 @@ class Place(models.Model):
             while Place.objects.filter(slug=slug).exists():
                 slug = f"{base_slug}-{uuid.uuid4().hex[:6]}"
             self.slug = slug
+        if not self.district:
+            self.district = nearest_district(self.latitude, self.longitude)
+        if not self._state.adding and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -221,10 +258,7 @@ class Place(models.Model):
 
     @property
     def average_rating(self):
-        ratings = self.comments.filter(rating__isnull=False)
-        if ratings.exists():
-            return ratings.aggregate(models.Avg('rating'))['rating__avg']
-        return 0
+        return self.rating_avg if self.rating_count else 0
 
 
 # ─────────────────────────────────────────────────────────
@@ -261,6 +295,57 @@ class PlaceVideo(models.Model):
         return f"{self.platform} video for {self.place.name}"
 
 
+# ─────────────────────────────────────────────────────────
+# Related places (filled by places/related.py)
+# ─────────────────────────────────────────────────────────
+
+class RelatedPlace(models.Model):
+    """
+    Precomputed top-K neighbours of a place, best first. Score mixes
+    category Jaccard similarity with geographic proximity.
+    """
+    place   = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='neighbours')
+    related = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='neighbour_of')
+    rank    = models.PositiveSmallIntegerField()
+    score   = models.FloatField()
+
+    class Meta:
+        ordering        = ['place', 'rank']
+        unique_together = ['place', 'related']
+        indexes         = [
+            models.Index(fields=['place', 'rank'], name='relatedplace_place_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.place_id} -> {self.related_id} ({self.score:.3f})"
+
+
+# ─────────────────────────────────────────────────────────
+# Co-visit recommendations (filled by `manage.py build_recommendations`)
+# ─────────────────────────────────────────────────────────
+
+class CoVisitedPlace(models.Model):
+    """
+    "People who checked in at `place` also checked in at `similar`":
+    item-item cosine similarity over check-ins, top-K per place.
+    """
+    place     = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='covisits')
+    similar   = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='covisit_of')
+    rank      = models.PositiveSmallIntegerField()
+    score     = models.FloatField()
+    co_visits = models.IntegerField()
+
+    class Meta:
+        ordering        = ['place', 'rank']
+        unique_together = ['place', 'similar']
+        indexes         = [
+            models.Index(fields=['place', 'rank'], name='covisit_place_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.place_id} -> {self.similar_id} ({self.score:.3f})"
+
+
 # ─────────────────────────────────────────────────────────
 # Check-in
 # ─────────────────────────────────────────────────────────
@@ -271,6 +356,8 @@ class CheckIn(models.Model):
 
     Anti-cheat fields:
       photo_hash  — SHA-256 of the uploaded photo bytes; used to reject reused images.
+      photo_dhash — perceptual (difference) hash; catches re-saved or lightly
+                    cropped copies the SHA-256 misses.
       trust_score — Raw score (0–5+) from checkin_trust.compute_trust_score().
                     0–1 = unverified, 2–3 = likely, 4+ = verified.
     """
@@ -281,14 +368,38 @@ class CheckIn(models.Model):
     )
     location_verified = models.BooleanField(default=False)
     photo_hash        = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    photo_dhash       = models.BigIntegerField(null=True, blank=True)
+    # 16-bit slices of photo_dhash, one index each (see places/perceptual_hash.py)
+    dhash_band_0      = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    dhash_band_1      = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    dhash_band_2      = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    dhash_band_3      = models.PositiveIntegerField(null=True, blank=True, db_index=True)
     trust_score       = models.PositiveSmallIntegerField(default=0)
     points_awarded    = models.IntegerField(default=10)
     notes             = models.TextField(blank=True)
     created_at        = models.DateTimeField(auto_now_add=True)
+    updated_at        = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['user', 'place']
         ordering        = ['-created_at']
+        indexes         = [
+            # Keyset pagination — "my check-ins" and per-place history
+            models.Index(fields=['user', '-created_at', '-id'],  name='checkin_user_created_idx'),
+            models.Index(fields=['place', '-created_at', '-id'], name='checkin_place_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.photo_dhash is None:
+            bands = dict.fromkeys(BAND_FIELDS)
+        else:
+            bands = band_values(self.photo_dhash)
+        for field, value in bands.items():
+            setattr(self, field, value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'photo_dhash' in update_fields:
+            kwargs['update_fields'] = {*update_fields, *BAND_FIELDS}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} checked in at {self.place.name}"
@@ -296,11 +407,7 @@ class CheckIn(models.Model):
     @property
     def trust_tier(self):
         """Human-readable tier derived from trust_score."""
-        if self.trust_score >= 4:
-            return 'verified'
-        if self.trust_score >= 2:
-            return 'likely'
-        return 'unverified'
+        return trust_tier(self.trust_score)
 
 
 # ─────────────────────────────────────────────────────────
@@ -336,6 +443,7 @@ class Trail(models.Model):
         'Badge', on_delete=models.SET_NULL, null=True, blank=True,
         related_name='trail_reward'
     )
+    search_vector      = SearchVectorField(null=True, editable=False)
     created_at         = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -601,9 +709,13 @@ class Notification(models.Model):
         Trail, on_delete=models.SET_NULL, null=True, blank=True
     )
     created_at        = models.DateTimeField(auto_now_add=True)
+    updated_at        = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes  = [
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_idx'),
+        ]
 
     def get_icon(self):
         icons = {
@@ -720,8 +832,9 @@ class TourPackage(models.Model):
     created_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, related_name='tour_packages'
     )
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    created_at    = models.DateTimeField(auto_now_add=True)
+    updated_at    = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
@@ -793,6 +906,154 @@ class TourItineraryDay(models.Model):
     def highlights_list(self):
         return [h.strip() for h in self.highlights.split(',') if h.strip()]
 
+# ─────────────────────────────────────────────────────────
+# Analytics rollups (filled by `manage.py rollup_stats`)
+# ─────────────────────────────────────────────────────────
+
+class DailyStats(models.Model):
+    """
+    One row per day. new_* count rows created that day; total_* are
+    running totals at the end of the day; active_users_Nd is distinct
+    check-in users over the N days ending that day (not summable, so
+    stored per window).
+    """
+    date             = models.DateField(unique=True)
+    new_users        = models.IntegerField(default=0)
+    new_places       = models.IntegerField(default=0)
+    new_checkins     = models.IntegerField(default=0)
+    active_users     = models.IntegerField(default=0)
+    active_users_7d  = models.IntegerField(default=0)
+    active_users_30d = models.IntegerField(default=0)
+    active_users_90d = models.IntegerField(default=0)
+    total_users      = models.IntegerField(default=0)
+    total_places     = models.IntegerField(default=0)
+    approved_places  = models.IntegerField(default=0)
+    pending_places   = models.IntegerField(default=0)
+    total_checkins   = models.IntegerField(default=0)
+    updated_at       = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering            = ['-date']
+        verbose_name_plural = 'Daily stats'
+
+    def __str__(self):
+        return f"Stats for {self.date}"
+
+
+class DailyCategoryStats(models.Model):
+    """Places per category at the end of each day."""
+    date        = models.DateField()
+    category    = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_stats')
+    new_places  = models.IntegerField(default=0)
+    place_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering            = ['-date', 'category__name']
+        unique_together     = ['date', 'category']
+        verbose_name_plural = 'Daily category stats'
+
+    def __str__(self):
+        return f"{self.category.name} on {self.date}"
+
+
+# ─────────────────────────────────────────────────────────
+# Cache versions (see places/caching.py)
+# ─────────────────────────────────────────────────────────
+
+class ModelVersion(models.Model):
+    """
+    Write counter and last-change time of one model, shared by every
+    worker and management command. Cached sections are keyed on it and
+    ETag / Last-Modified are built from it.
+    """
+    label      = models.CharField(max_length=100, unique=True)      # label_lower, e.g. 'places.place'
+    version    = models.BigIntegerField()
+    changed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
+
+
+# ─────────────────────────────────────────────────────────
+# Media (see places/storage.py)
+# ─────────────────────────────────────────────────────────
+
+class MediaBlob(models.Model):
+    """
+    One stored file in the content-addressed media store. ref_count is
+    the number of saves that resolved to this blob, less the deletes;
+    the file is removed when it reaches zero.
+    """
+    name       = models.CharField(max_length=300, unique=True)
+    sha256     = models.CharField(max_length=64, db_index=True)
+    size       = models.BigIntegerField()
+    ref_count  = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ×{self.ref_count}"
+
+
+# ─────────────────────────────────────────────────────────
+# Imports (see `manage.py import_all_data --resume`)
+# ─────────────────────────────────────────────────────────
+
+class ImportCheckpoint(models.Model):
+    """
+    How far import_all_data got through one sheet of a workbook, which
+    is identified by the SHA-256 of the file. Saved in the transaction
+    that commits each chunk, so rows_done never runs ahead of the data.
+    """
+    workbook   = models.CharField(max_length=64)
+    sheet      = models.CharField(max_length=100)
+    rows_done  = models.PositiveIntegerField(default=0)
+    total_rows = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['workbook', 'sheet']
+
+    def __str__(self):
+        return f"{self.sheet}: {self.rows_done}/{self.total_rows}"
+
+
+# ─────────────────────────────────────────────────────────
+# Exports (see places/watermarks.py)
+# ─────────────────────────────────────────────────────────
+
+class ExportWatermark(models.Model):
+    """
+    Where the last export of one sheet stopped: the time it read rows
+    (and tombstones) up to. `export_all_data --delta` starts from here.
+    """
+    sheet          = models.CharField(max_length=100, unique=True)
+    exported_until = models.DateTimeField()
+    updated_at     = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['sheet']
+
+    def __str__(self):
+        return f"{self.sheet} until {self.exported_until:%Y-%m-%d %H:%M}"
+
+
+class Tombstone(models.Model):
+    """A deleted row of a model delta exports track, kept until every watermark has passed it."""
+    model      = models.CharField(max_length=100)      # label_lower, e.g. 'places.checkin'
+    object_pk  = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'deleted_at'], name='tombstone_model_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_pk}"
+
 # class AudioGuide(models.Model):
 #     place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name='audio_guides')
 #     title = models.CharField(max_length=200)
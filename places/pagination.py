@@ -0,0 +1,89 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+# ─────────────────────────────────────────────────────────
+# Keyset (cursor) pagination on (created_at, id)
+# ─────────────────────────────────────────────────────────
+
+def encode_cursor(created_at, pk):
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Return (created_at, pk) or None for a missing / malformed cursor."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        ts, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(ts), int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+class KeysetPage:
+    """
+    Page-like wrapper so templates can keep using has_next / iteration.
+    There is no page number or total — that is the point.
+    """
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return False
+
+    def has_other_pages(self):
+        return self.has_next()
+
+
+def keyset_page(queryset, cursor, per_page):
+    """
+    Fetch one page of `queryset` newest-first, seeking past `cursor`.
+
+    Uses WHERE (created_at, id) < (ts, pk) instead of OFFSET, so deep pages
+    cost the same as the first one. Needs a composite index on
+    (…, created_at, id) to stay an index range scan.
+    """
+    qs  = queryset.order_by("-created_at", "-id")
+    pos = decode_cursor(cursor)
+    if pos:
+        ts, pk = pos
+        qs = qs.filter(Q(created_at__lt=ts) | Q(created_at=ts, id__lt=pk))
+
+    rows = list(qs[:per_page + 1])
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.pk)
+    return KeysetPage(rows, next_cursor)
+
+
+def paginate(request, queryset, per_page):
+    """
+    Keyset pagination by default (?cursor=); ?page=N keeps the old
+    Paginator behaviour for existing links and clients.
+    """
+    if "page" in request.GET:
+        return Paginator(queryset, per_page).get_page(request.GET.get("page"))
+    return keyset_page(queryset, request.GET.get("cursor"), per_page)
@@ -0,0 +1,141 @@
+import logging
+from itertools import combinations
+
+import numpy as np
+from django.db.models import Q
+from PIL import Image
+
+from .image_processing import open_image
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE    = 8          # dHash grid: 8 × 8 gradient bits = 64-bit hash
+BANDS        = 4          # multi-index hashing: 4 slices of 16 bits
+BAND_BITS    = 64 // BANDS
+BAND_MASK    = (1 << BAND_BITS) - 1
+
+# Hamming distance still treated as "the same photo". Tighter against
+# other users' check-ins: their shot of the same landmark from the same
+# spot is close, but only a copy of it is that close.
+MAX_DISTANCE        = 10
+OTHER_USER_DISTANCE = 4
+
+# Flat images (night shots, sky, blur) hash to nearly all-0 or all-1 bits
+# and would all "match" each other; they are not hashed or compared.
+MIN_CONTRAST  = 4.0       # std-dev of the 9 × 8 grey grid, 0–255 scale
+MIN_HASH_BITS = 8         # a hash needs at least this many 1s and 0s
+
+BAND_FIELDS  = tuple(f'dhash_band_{i}' for i in range(BANDS))
+
+
+# ─────────────────────────────────────────────────────────
+# Hashing
+# ─────────────────────────────────────────────────────────
+
+def dhash(fp):
+    """
+    64-bit difference hash of an image, or None if it can't be decoded or
+    is too flat to tell apart from other flat images (MIN_CONTRAST).
+    Returned signed (two's complement) so it fits a BigIntegerField.
+
+    The image is shrunk to 9 × 8 greys and each bit records whether a
+    pixel is brighter than its left neighbour — stable across re-encoding,
+    resizing and small crops or colour tweaks. JPEGs decode at 1/8 scale
+    (draft mode), which is all an 8 × 8 grid needs.
+    """
+    try:
+        img = open_image(fp, min_width=HASH_SIZE * 8, min_height=HASH_SIZE * 8)
+        grey = img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.debug("dHash failed: %s", exc)
+        return None
+    finally:
+        if hasattr(fp, 'seek'):
+            fp.seek(0)
+    px   = np.asarray(grey, dtype=np.int16)
+    if px.std() < MIN_CONTRAST:
+        return None
+    bits = np.packbits(px[:, 1:] > px[:, :-1])
+    return int.from_bytes(bits.tobytes(), 'big', signed=True)
+
+
+_MASK_64 = (1 << 64) - 1
+
+
+def hamming(a, b):
+    return ((a ^ b) & _MASK_64).bit_count()
+
+
+def is_distinctive(value):
+    """False for near-degenerate hashes (almost all bits equal), which match too much."""
+    ones = (value & _MASK_64).bit_count()
+    return MIN_HASH_BITS <= ones <= 64 - MIN_HASH_BITS
+
+
+def bands(value):
+    """The hash as BANDS 16-bit slices, most significant first."""
+    value &= _MASK_64
+    return [(value >> (BAND_BITS * (BANDS - 1 - i))) & BAND_MASK for i in range(BANDS)]
+
+
+def band_values(value):
+    """{dhash_band_i: slice} for storing a hash on a CheckIn."""
+    return dict(zip(BAND_FIELDS, bands(value)))
+
+
+# ─────────────────────────────────────────────────────────
+# Near-duplicate lookup (multi-index hashing)
+# ─────────────────────────────────────────────────────────
+#
+# Two hashes within distance d differ in at most d bits, spread over 4
+# slices — so at least one slice differs in no more than d // 4 bits
+# (pigeonhole). Searching each indexed slice column for the query's
+# slice and its neighbours within d // 4 bits therefore finds every
+# match; the candidates are then checked on the full 64 bits. Each probe
+# is an index lookup that returns ~N / 65536 rows, so a lookup stays
+# cheap with millions of photos on file, and the index is the database's
+# own — shared by every worker and persisted with the check-in.
+
+def _neighbours(value, radius):
+    """Every BAND_BITS-bit value within `radius` bit flips of value."""
+    out = [value]
+    for r in range(1, radius + 1):
+        for positions in combinations(range(BAND_BITS), r):
+            flipped = value
+            for p in positions:
+                flipped ^= 1 << p
+            out.append(flipped)
+    return out
+
+
+def find_near_duplicates(value, user=None, max_distance=MAX_DISTANCE,
+                         other_user_distance=OTHER_USER_DISTANCE, queryset=None):
+    """
+    [(checkin_id, distance)] for stored photos close to `value`, closest
+    first: within `max_distance` for `user`'s own check-ins (a re-used
+    photo), within `other_user_distance` for everyone else's (a copied
+    one). Without `user`, every check-in counts as someone else's.
+    Near-degenerate hashes never match.
+    """
+    from .models import CheckIn
+
+    if not is_distinctive(value):
+        return []
+    widest = max(max_distance, other_user_distance)
+    radius = widest // BANDS
+    query  = Q()
+    for field, band in zip(BAND_FIELDS, bands(value)):
+        query |= Q(**{f'{field}__in': _neighbours(band, radius)})
+
+    queryset   = CheckIn.objects.all() if queryset is None else queryset
+    candidates = queryset.filter(query).values_list('pk', 'photo_dhash', 'user_id')
+    own        = user.pk if user is not None else None
+    matches    = []
+    for pk, stored, user_id in candidates:
+        if not is_distinctive(stored):
+            continue
+        limit    = max_distance if user_id == own else other_user_distance
+        distance = hamming(value, stored)
+        if distance <= limit:
+            matches.append((pk, distance))
+    return sorted(matches, key=lambda m: (m[1], m[0]))
@@ -0,0 +1,86 @@
+from django.db.models import (
+    Avg, Count, F, FloatField, IntegerField, OuterRef, Subquery, Value,
+)
+from django.db.models.functions import Coalesce
+
+from .models import CheckIn, Comment, Place, Vote
+
+VOTE_FIELDS = {
+    'up':   'approval_votes',
+    'down': 'rejection_votes',
+}
+
+
+# ─────────────────────────────────────────────────────────
+# Incremental updates (called from signals)
+# ─────────────────────────────────────────────────────────
+
+def adjust_counts(place_id, **deltas):
+    """Apply `field=+n/-n` to one place in a single UPDATE … SET f = f + n."""
+    deltas = {field: n for field, n in deltas.items() if n}
+    if place_id is None or not deltas:
+        return
+    Place.objects.filter(pk=place_id).update(
+        **{field: F(field) + n for field, n in deltas.items()}
+    )
+
+
+def adjust_vote(place_id, vote_type, delta):
+    field = VOTE_FIELDS.get(vote_type)
+    if field:
+        adjust_counts(place_id, **{field: delta})
+
+
+def refresh_rating(place_id):
+    """
+    Recompute rating_avg / rating_count for one place.
+
+    An average can't be maintained by delta alone once a rating is edited
+    or removed, so this is one UPDATE with correlated subqueries — cheap,
+    indexed on comment.place_id, and never read back into Python.
+    """
+    if place_id is None:
+        return
+    Place.objects.filter(pk=place_id).update(
+        rating_avg   = _rating_avg(),
+        rating_count = _count(Comment, rating__isnull=False),
+    )
+
+
+# ─────────────────────────────────────────────────────────
+# Bulk recompute
+# ─────────────────────────────────────────────────────────
+
+def _count(model, **filters):
+    sub = (
+        model.objects.filter(place=OuterRef('pk'), **filters)
+        .order_by().values('place').annotate(n=Count('pk')).values('n')
+    )
+    return Coalesce(Subquery(sub, output_field=IntegerField()), Value(0))
+
+
+def _rating_avg():
+    sub = (
+        Comment.objects.filter(place=OuterRef('pk'), rating__isnull=False)
+        .order_by().values('place').annotate(a=Avg('rating')).values('a')
+    )
+    return Coalesce(Subquery(sub, output_field=FloatField()), Value(0.0))
+
+
+def stats_expressions():
+    """Field → expression that recomputes it from the source tables."""
+    return {
+        'rating_avg':      _rating_avg(),
+        'rating_count':    _count(Comment, rating__isnull=False),
+        'checkin_count':   _count(CheckIn),
+        'comment_count':   _count(Comment),
+        'approval_votes':  _count(Vote, vote_type='up'),
+        'rejection_votes': _count(Vote, vote_type='down'),
+    }
+
+
+def recompute_place_stats(queryset=None):
+    """Rebuild every aggregate column for `queryset` (default: all places). Returns rows updated."""
+    if queryset is None:
+        queryset = Place.objects.all()
+    return queryset.order_by().update(**stats_expressions())
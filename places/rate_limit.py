@@ -0,0 +1,79 @@
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# ── Notification buckets ──────────────────────────────────
+NOTIFICATION_BUCKET_CAPACITY = 5      # tokens per user / type / period
+NOTIFICATION_BUCKET_PERIOD   = 3600   # seconds for an empty bucket to refill completely
+
+KEY_PREFIX = "ratelimit"
+
+# A bucket is read, refilled and written back under a short lock so two
+# requests can't spend the same token. The lock is a cache.add(), which
+# is atomic on Redis, Memcached and locmem.
+LOCK_TIMEOUT  = 2       # seconds — frees the lock if its holder died
+LOCK_ATTEMPTS = 20
+LOCK_WAIT     = 0.005   # seconds between attempts
+
+
+def _bucket_key(scope, user_id, bucket):
+    return f"{KEY_PREFIX}:{scope}:{user_id}:{bucket}"
+
+
+def _refill(state, capacity, period, now):
+    """Tokens in a bucket last seen as `state` (tokens, timestamp), as of `now`."""
+    if state is None:
+        return float(capacity)
+    tokens, stamp = state
+    elapsed       = max(0.0, now - stamp)
+    return min(float(capacity), tokens + elapsed * capacity / period)
+
+
+def take_token(scope, user_id, bucket, capacity, period):
+    """
+    Consume one token from a cache-backed token bucket.
+
+    The bucket holds up to `capacity` tokens and refills continuously at
+    capacity / period tokens per second, so a burst is never more than
+    `capacity` and an emptied bucket recovers gradually. It is stored as
+    (tokens, last refill time); an entry that expires was full anyway.
+
+    Returns True when a token was available. If the bucket stays locked
+    by concurrent callers, the call is refused rather than risk
+    spending a token twice.
+    """
+    key  = _bucket_key(scope, user_id, bucket)
+    lock = f"{key}:lock"
+    for _ in range(LOCK_ATTEMPTS):
+        if cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+            break
+        time.sleep(LOCK_WAIT)
+    else:
+        logger.debug("Rate-limit bucket %s is busy; refusing", key)
+        return False
+
+    try:
+        now     = time.time()
+        tokens  = _refill(cache.get(key), capacity, period, now)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        cache.set(key, (tokens, now), timeout=period)
+        return allowed
+    finally:
+        cache.delete(lock)
+
+
+def can_notify(user, notification_type, capacity=NOTIFICATION_BUCKET_CAPACITY,
+               period=NOTIFICATION_BUCKET_PERIOD):
+    """
+    Per-user, per-notification-type token bucket.
+
+    Replaces the hourly COUNT over Notification — the decision is made
+    entirely in the cache. A True result spends a token, so only call this
+    right before creating the notification.
+    """
+    return take_token("notify", user.pk, notification_type or "any", capacity, period)
@@ -0,0 +1,212 @@
+import math
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from geopy.distance import geodesic
+
+from .models import CheckIn, CoVisitedPlace, Place
+
+TOP_K          = 20          # neighbours stored per place
+MIN_CO_VISITS  = 2           # pairs seen together fewer times are noise
+MAX_GATHER     = 4_000_000   # (user, place) entries expanded at once per place — the memory bound
+CHUNK_SIZE     = 50_000      # check-ins fetched per database round trip
+WRITE_BATCH    = 2_000
+
+CF_WEIGHT        = 0.7       # blend for personal recommendations
+NEARBY_WEIGHT    = 0.3
+NEARBY_RADIUS_KM = 30.0
+NEARBY_SCALE_KM  = 10.0      # proximity is exp(-distance / scale)
+CANDIDATES       = 100       # co-visit candidates considered before blending
+
+PAIR_DTYPE = np.dtype([('user', np.int64), ('place', np.int64)])
+
+
+# ─────────────────────────────────────────────────────────
+# Offline build (manage.py build_recommendations)
+# ─────────────────────────────────────────────────────────
+
+class CheckInMatrix:
+    """
+    The binary user × place check-in matrix in compressed form, kept twice
+    — grouped by user and grouped by place — as flat int32 arrays plus
+    offset pointers (CSR/CSC without SciPy). About 16 bytes per check-in.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        rows  = (
+            CheckIn.objects.filter(place__status='approved').order_by()
+            .values_list('user_id', 'place_id').iterator(chunk_size=chunk_size)
+        )
+        pairs = np.fromiter(rows, dtype=PAIR_DTYPE)    # streamed, never a list of tuples
+
+        self.place_ids, places = np.unique(pairs['place'], return_inverse=True)
+        _,              users  = np.unique(pairs['user'],  return_inverse=True)
+        del pairs
+        places = places.astype(np.int32)
+        users  = users.astype(np.int32)
+        self.n_places = len(self.place_ids)
+        n_users       = int(users.max()) + 1 if len(users) else 0
+
+        by_user          = np.argsort(users, kind='stable')
+        self.user_places = places[by_user]
+        self.user_ptr    = np.zeros(n_users + 1, dtype=np.int64)
+        np.cumsum(np.bincount(users, minlength=n_users), out=self.user_ptr[1:])
+
+        by_place         = np.argsort(places, kind='stable')
+        self.place_users = users[by_place]
+        self.place_ptr   = np.zeros(self.n_places + 1, dtype=np.int64)
+        np.cumsum(np.bincount(places, minlength=self.n_places), out=self.place_ptr[1:])
+
+        self.visitors   = np.diff(self.place_ptr)
+        self.n_checkins = len(places)
+
+    def co_visits(self, i, max_gather=MAX_GATHER):
+        """
+        Row i of XᵀX: for every place, how many of place i's visitors also
+        checked in there. Visitors are expanded in slices of at most
+        `max_gather` entries, so one very popular place can't blow memory.
+        """
+        users  = self.place_users[self.place_ptr[i]:self.place_ptr[i + 1]]
+        starts = self.user_ptr[users]
+        lens   = self.user_ptr[users + 1] - starts
+        counts = np.zeros(self.n_places, dtype=np.int64)
+
+        lo = 0
+        while lo < len(users):
+            cum = np.cumsum(lens[lo:])
+            hi  = lo + max(1, int(np.searchsorted(cum, max_gather, side='right')))
+            s, n = starts[lo:hi], lens[lo:hi]
+            offsets = np.repeat(s - (np.cumsum(n) - n), n) + np.arange(n.sum())
+            counts += np.bincount(self.user_places[offsets], minlength=self.n_places)
+            lo = hi
+        counts[i] = 0
+        return counts
+
+    def top_k(self, i, k=TOP_K, min_co_visits=MIN_CO_VISITS, max_gather=MAX_GATHER):
+        """[(place_id, cosine, co_visits)] for place index i, best first."""
+        counts     = self.co_visits(i, max_gather)
+        candidates = np.flatnonzero(counts >= min_co_visits)
+        if not len(candidates):
+            return []
+        cosine = counts[candidates] / np.sqrt(self.visitors[i] * self.visitors[candidates])
+        if len(candidates) > k:
+            keep       = np.argpartition(-cosine, k - 1)[:k]
+            candidates = candidates[keep]
+            cosine     = cosine[keep]
+        order = np.lexsort((self.place_ids[candidates], -cosine))
+        return [
+            (int(self.place_ids[candidates[j]]), float(cosine[j]), int(counts[candidates[j]]))
+            for j in order
+        ]
+
+
+def build_recommendations(top_k=TOP_K, min_co_visits=MIN_CO_VISITS,
+                          max_gather=MAX_GATHER, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Recompute CoVisitedPlace from scratch: item-item cosine similarity
+    over check-ins, pruned to the top `top_k` per place. The new table
+    replaces the old one in a single transaction, written WRITE_BATCH
+    rows at a time so the pending rows stay bounded. Returns (places, rows).
+    """
+    matrix  = CheckInMatrix(chunk_size=chunk_size)
+    rows    = []
+    written = 0
+    with transaction.atomic():
+        CoVisitedPlace.objects.all().delete()
+        for i in range(matrix.n_places):
+            place_id = int(matrix.place_ids[i])
+            for rank, (similar_id, score, co) in enumerate(
+                matrix.top_k(i, top_k, min_co_visits, max_gather)
+            ):
+                rows.append(CoVisitedPlace(
+                    place_id=place_id, similar_id=similar_id,
+                    rank=rank, score=score, co_visits=co,
+                ))
+            if len(rows) >= WRITE_BATCH:
+                CoVisitedPlace.objects.bulk_create(rows)
+                written += len(rows)
+                rows     = []
+            if progress and (i + 1) % 500 == 0:
+                progress(i + 1, matrix.n_places)
+        CoVisitedPlace.objects.bulk_create(rows)
+        written += len(rows)
+    return matrix.n_places, written
+
+
+# ─────────────────────────────────────────────────────────
+# Reading
+# ─────────────────────────────────────────────────────────
+
+def also_visited(place, limit=6):
+    """Places most often checked in at by this place's visitors — one indexed lookup."""
+    return (
+        Place.objects.filter(covisit_of__place=place, status='approved')
+        .order_by('covisit_of__rank')
+        .prefetch_related('category')[:limit]
+    )
+
+
+def recommend_for_user(user, lat=None, lng=None, limit=10, radius_km=NEARBY_RADIUS_KM):
+    """
+    Places `user` hasn't checked in at, best first. Each is annotated with
+    `recommendation_score`, `recommendation_reason` ('also_visited',
+    'nearby' or 'popular') and, when a position is given, `distance_km`.
+
+    Co-visit scores are summed over every place the user has been to and
+    blended with proximity to (lat, lng). With no check-in history and no
+    position this falls back to the most checked-in places.
+    """
+    visited = CheckIn.objects.filter(user=user).values('place_id')
+
+    co = dict(
+        CoVisitedPlace.objects.filter(place_id__in=visited, similar__status='approved')
+        .exclude(similar_id__in=visited)
+        .values('similar_id').annotate(total=Sum('score'))
+        .order_by('-total').values_list('similar_id', 'total')[:CANDIDATES]
+    )
+    top      = max(co.values(), default=0) or 1.0
+    scores   = {pk: CF_WEIGHT * total / top for pk, total in co.items()}
+    reasons  = {pk: 'also_visited' for pk in co}
+    distance = {}
+
+    if lat is not None and lng is not None:
+        lat_range = radius_km / 111
+        lng_range = radius_km / (111 * max(math.cos(math.radians(lat)), 0.01))
+        nearby = (
+            Place.objects.filter(
+                status='approved',
+                latitude__range=(lat - lat_range,  lat + lat_range),
+                longitude__range=(lng - lng_range, lng + lng_range),
+            )
+            .exclude(pk__in=visited).values_list('pk', 'latitude', 'longitude')
+        )
+        for pk, plat, plng in nearby:
+            km = geodesic((lat, lng), (plat, plng)).km
+            if km > radius_km:
+                continue
+            distance[pk] = km
+            scores[pk]   = scores.get(pk, 0.0) + NEARBY_WEIGHT * math.exp(-km / NEARBY_SCALE_KM)
+            reasons.setdefault(pk, 'nearby')
+
+    if not scores:
+        popular = (
+            Place.objects.filter(status='approved').exclude(pk__in=visited)
+            .order_by('-checkin_count', '-visit_count').values_list('pk', flat=True)[:limit]
+        )
+        scores  = {pk: 0.0 for pk in popular}
+        reasons = {pk: 'popular' for pk in popular}
+
+    best   = sorted(scores, key=lambda pk: (-scores[pk], pk))[:limit]
+    places = Place.objects.filter(pk__in=best).prefetch_related('category').in_bulk()
+    result = []
+    for pk in best:
+        place = places.get(pk)
+        if place is None:
+            continue
+        place.recommendation_score  = round(scores[pk], 4)
+        place.recommendation_reason = reasons[pk]
+        if pk in distance:
+            place.distance_km = round(distance[pk], 2)
+        result.append(place)
+    return result
@@ -0,0 +1,258 @@
+import atexit
+import logging
+import threading
+
+import numpy as np
+from django.db import connection, transaction
+from django.db.models import Count, Min
+
+from .models import Place, RelatedPlace
+
+logger = logging.getLogger(__name__)
+
+TOP_K            = 8        # neighbours stored per place (detail page shows 4)
+CATEGORY_WEIGHT  = 0.6
+PROXIMITY_WEIGHT = 0.4
+PROXIMITY_SCALE  = 25.0     # km — proximity is exp(-distance / scale)
+MAX_DISTANCE_KM  = 150.0    # further than this contributes no proximity at all
+BATCH_SIZE       = 256      # rows scored at once: memory is BATCH_SIZE × places floats
+EARTH_RADIUS_KM  = 6371.0
+
+
+# ─────────────────────────────────────────────────────────
+# Scoring
+# ─────────────────────────────────────────────────────────
+
+class PlaceMatrix:
+    """
+    Every approved place as arrays: ids, coordinates in radians, and a 0/1
+    place × category membership matrix. Two queries, however many places.
+
+    Categories number in the tens, so the membership matrix is stored
+    dense; its product with its own transpose gives the intersection sizes
+    a sparse matrix would, without pulling in SciPy.
+    """
+
+    def __init__(self):
+        rows = list(
+            Place.objects.filter(status='approved').order_by('pk')
+            .values_list('pk', 'latitude', 'longitude')
+        )
+        self.ids   = np.array([r[0] for r in rows], dtype=np.int64)
+        self.index = {pk: i for i, pk in enumerate(self.ids.tolist())}
+
+        lat = np.array([r[1] or 0.0 for r in rows], dtype=np.float64)
+        lng = np.array([r[2] or 0.0 for r in rows], dtype=np.float64)
+        self.located = (lat != 0) | (lng != 0)      # 0, 0 is the "not set" default
+        self.lat     = np.radians(lat)
+        self.lng     = np.radians(lng)
+
+        links = Place.category.through.objects.filter(
+            place__status='approved'
+        ).values_list('place_id', 'category_id')
+        category_index = {}
+        members        = []
+        for place_id, category_id in links:
+            col = category_index.setdefault(category_id, len(category_index))
+            members.append((self.index[place_id], col))
+
+        self.categories = np.zeros((len(self.ids), max(len(category_index), 1)), dtype=np.float32)
+        if members:
+            r, c = np.array(members).T
+            self.categories[r, c] = 1.0
+        self.sizes = self.categories.sum(axis=1)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def scores(self, rows):
+        """len(rows) × len(self) score matrix for the given row indexes; self-pairs are 0."""
+        rows = np.asarray(rows, dtype=np.int64)
+
+        inter   = self.categories[rows] @ self.categories.T
+        union   = self.sizes[rows, None] + self.sizes[None, :] - inter
+        jaccard = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+        # Haversine, broadcast over (rows, all places)
+        dlat = self.lat[None, :] - self.lat[rows, None]
+        dlng = self.lng[None, :] - self.lng[rows, None]
+        a    = (np.sin(dlat / 2) ** 2
+                + np.cos(self.lat[rows, None]) * np.cos(self.lat[None, :]) * np.sin(dlng / 2) ** 2)
+        km   = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+        proximity = np.exp(-km / PROXIMITY_SCALE).astype(np.float32)
+        proximity[(km > MAX_DISTANCE_KM)
+                  | ~self.located[rows, None] | ~self.located[None, :]] = 0.0
+
+        score = CATEGORY_WEIGHT * jaccard + PROXIMITY_WEIGHT * proximity
+        score[np.arange(len(rows)), rows] = 0.0
+        return score
+
+    def top_k(self, rows, k=TOP_K):
+        """[(place_id, [(related_id, score), …]), …] for the given row indexes."""
+        score = self.scores(rows)
+        k     = min(k, max(len(self) - 1, 0))
+        if k == 0:
+            return [(int(self.ids[r]), []) for r in rows]
+        best = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        out  = []
+        for i, r in enumerate(rows):
+            cols = best[i][np.lexsort((self.ids[best[i]], -score[i, best[i]]))]   # ties by id
+            out.append((int(self.ids[r]), [
+                (int(self.ids[c]), float(score[i, c])) for c in cols if score[i, c] > 0
+            ]))
+        return out
+
+
+def _write(results):
+    """Replace the stored neighbours of every place in `results`."""
+    objs = [
+        RelatedPlace(place_id=place_id, related_id=related_id, rank=rank, score=score)
+        for place_id, neighbours in results
+        for rank, (related_id, score) in enumerate(neighbours)
+    ]
+    with transaction.atomic():
+        RelatedPlace.objects.filter(place_id__in=[pid for pid, _ in results]).delete()
+        RelatedPlace.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+# ─────────────────────────────────────────────────────────
+# Full rebuild (manage.py build_related_places)
+# ─────────────────────────────────────────────────────────
+
+def rebuild_related_places(batch_size=BATCH_SIZE, progress=None):
+    """Recompute every approved place's neighbours. Returns rows written."""
+    matrix  = PlaceMatrix()
+    written = 0
+    for start in range(0, len(matrix), batch_size):
+        rows     = range(start, min(start + batch_size, len(matrix)))
+        written += _write(matrix.top_k(rows))
+        if progress:
+            progress(rows.stop, len(matrix))
+    RelatedPlace.objects.exclude(place__status='approved').delete()
+    return written
+
+
+# ─────────────────────────────────────────────────────────
+# Incremental refresh (signals / admin actions)
+# ─────────────────────────────────────────────────────────
+
+def refresh_related_places(place_ids):
+    """
+    Bring the index up to date after `place_ids` were approved, edited,
+    unapproved or deleted.
+
+    Only the lists that can have changed are recomputed: the changed
+    places' own, every list that currently contains one of them (its
+    score moved or it must drop out), and every list whose weakest entry
+    the new scores now beat.
+    """
+    place_ids = set(place_ids)
+    approved  = set(
+        Place.objects.filter(pk__in=place_ids, status='approved').values_list('pk', flat=True)
+    )
+    affected  = set(
+        RelatedPlace.objects.filter(related_id__in=place_ids).values_list('place_id', flat=True)
+    )
+    stale     = place_ids - approved
+    if stale:
+        RelatedPlace.objects.filter(place_id__in=stale).delete()
+    if not approved and not affected:
+        return 0        # e.g. a pending place being edited — nothing can have moved
+
+    matrix = PlaceMatrix()
+    rows   = [matrix.index[pid] for pid in approved if pid in matrix.index]
+    affected.update(approved)
+
+    if rows and len(matrix) > 1:
+        best    = np.zeros(len(matrix), dtype=np.float32)
+        for start in range(0, len(rows), BATCH_SIZE):
+            np.maximum(best, matrix.scores(rows[start:start + BATCH_SIZE]).max(axis=0), out=best)
+        weakest = {
+            r['place_id']: (r['n'], r['low'])
+            for r in RelatedPlace.objects.order_by().values('place_id')
+            .annotate(n=Count('id'), low=Min('score'))
+        }
+        full    = min(TOP_K, len(matrix) - 1)
+        for col in np.flatnonzero(best > 0).tolist():
+            pid    = int(matrix.ids[col])
+            n, low = weakest.get(pid, (0, 0.0))
+            if n < full or best[col] > low:
+                affected.add(pid)
+
+    affected_rows = sorted(matrix.index[pid] for pid in affected if pid in matrix.index)
+    written       = 0
+    for start in range(0, len(affected_rows), BATCH_SIZE):
+        written += _write(matrix.top_k(affected_rows[start:start + BATCH_SIZE]))
+    return written
+
+
+def refresh_related_places_on_commit(place_ids):
+    """Schedule refresh_related_places after the current transaction commits."""
+    place_ids = set(place_ids)
+
+    def run():
+        try:
+            refresh_related_places(place_ids)
+        except Exception:
+            logger.exception("Related places refresh failed for %s", sorted(place_ids))
+
+    transaction.on_commit(run)
+
+
+# ─────────────────────────────────────────────────────────
+# Background refresh (requests never build the matrix)
+# ─────────────────────────────────────────────────────────
+#
+# Saves queue their place ids; one worker thread per process drains the
+# queue, so a burst of edits costs one PlaceMatrix build, not one each.
+
+_lock    = threading.Lock()
+_pending = set()
+_worker  = None
+
+
+def _drain():
+    global _worker
+    try:
+        while True:
+            with _lock:
+                if not _pending:
+                    _worker = None
+                    return
+                batch = set(_pending)
+                _pending.clear()
+            try:
+                refresh_related_places(batch)
+            except Exception:
+                logger.exception("Related places refresh failed for %s", sorted(batch))
+    finally:
+        connection.close()  # the worker thread owns its DB connection
+
+
+def _enqueue(place_ids):
+    global _worker
+    with _lock:
+        _pending.update(place_ids)
+        if _worker is None:
+            _worker = threading.Thread(target=_drain, name='related-places', daemon=True)
+            _worker.start()
+
+
+def refresh_related_places_later(place_ids):
+    """Queue refresh_related_places for a background thread once the current transaction commits."""
+    place_ids = set(place_ids)
+    if place_ids:
+        transaction.on_commit(lambda: _enqueue(place_ids))
+
+
+def _finish_at_exit():
+    # Management commands exit right after their last save; let the
+    # queued refresh finish instead of dying with the daemon thread.
+    worker = _worker
+    if worker is not None:
+        worker.join(timeout=60)
+
+
+atexit.register(_finish_at_exit)
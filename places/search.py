@@ -0,0 +1,345 @@
+import math
+import operator
+import re
+import threading
+from collections import defaultdict
+from functools import reduce
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import Case, F, FloatField, IntegerField, TextField, Value, When
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .caching import get_model_versions
+from .models import Place, TourPackage, Trail
+
+SEARCH_CONFIG = "english"
+
+# Postgres' default ts_rank weights for labels D, C, B, A
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+FALLBACK_MAX_RESULTS = 1000   # keeps the pk__in / CASE lists bounded
+
+
+def _category_names(obj):
+    return " ".join(c.name for c in obj.category.all())
+
+
+# Model → ((attribute or callable, weight), …). Kept to columns plus
+# prefetchable relations so a full rebuild is one query per model.
+SEARCH_FIELDS = {
+    Place: (
+        ("name",            "A"),
+        ("description",     "B"),
+        ("legends_stories", "C"),
+    ),
+    Trail: (
+        ("name",            "A"),
+        ("description",     "B"),
+        (_category_names,   "C"),
+    ),
+    TourPackage: (
+        ("name",              "A"),
+        ("description",       "B"),
+        ("starting_location", "C"),
+        ("ending_location",   "C"),
+    ),
+}
+
+PREFETCH = {
+    Trail: ("category",),
+}
+
+
+def document(obj):
+    """[(text, weight), …] for one instance."""
+    parts = []
+    for source, weight in SEARCH_FIELDS[type(obj)]:
+        text = source(obj) if callable(source) else getattr(obj, source)
+        if text:
+            parts.append((str(text), weight))
+    return parts
+
+
+def _uses_postgres(queryset_or_model):
+    db = getattr(queryset_or_model, "db", None) or "default"
+    return connections[db].vendor == "postgresql"
+
+
+# ─────────────────────────────────────────────────────────
+# Text analysis (fallback index + highlighter)
+# ─────────────────────────────────────────────────────────
+
+_WORD_RE  = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the to with".split()
+)
+
+
+def normalize(word):
+    """Lower-case and fold simple English plurals ("caves" -> "cave")."""
+    word = word.lower()
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def analyze(text):
+    return [normalize(w) for w in _WORD_RE.findall(text or "") if w.lower() not in STOPWORDS]
+
+
+def parse_query(query):
+    """Split a websearch-style query into (required, excluded) terms."""
+    required, excluded = [], []
+    for raw in (query or "").split():
+        target = excluded if raw.startswith("-") and len(raw) > 1 else required
+        target.extend(analyze(raw.lstrip("-")))
+    return required, excluded
+
+
+# ─────────────────────────────────────────────────────────
+# In-memory inverted index (non-Postgres backends)
+# ─────────────────────────────────────────────────────────
+
+class InvertedIndex:
+    """
+    term -> {pk: weighted term frequency}, per model, per process.
+
+    Stamped with the model's cache version (places/caching.py): a write in
+    this process patches the index in place; a write anywhere else moves
+    the version and the next search rebuilds from the database.
+    """
+
+    def __init__(self, model):
+        self.model    = model
+        self.postings = defaultdict(dict)
+        self.terms    = {}
+        self.version  = None
+        self.lock     = threading.Lock()
+
+    def _add(self, pk, parts):
+        self._remove(pk)
+        seen = set()
+        for text, weight in parts:
+            for term in analyze(text):
+                bucket = self.postings[term]
+                bucket[pk] = bucket.get(pk, 0.0) + WEIGHTS[weight]
+                seen.add(term)
+        self.terms[pk] = seen
+
+    def _remove(self, pk):
+        for term in self.terms.pop(pk, ()):
+            bucket = self.postings.get(term)
+            if bucket is not None:
+                bucket.pop(pk, None)
+                if not bucket:
+                    del self.postings[term]
+
+    def _current_version(self):
+        return get_model_versions(self.model)[self.model._meta.label_lower]
+
+    def _ensure_fresh(self):
+        version = self._current_version()
+        if self.version == version:
+            return
+        self.postings.clear()
+        self.terms.clear()
+        qs = self.model.objects.all().prefetch_related(*PREFETCH.get(self.model, ()))
+        for obj in qs:
+            self._add(obj.pk, document(obj))
+        self.version = version
+
+    def update(self, obj):
+        with self.lock:
+            if self.version is None:
+                return                      # not built yet — nothing to patch
+            self._add(obj.pk, document(obj))
+            self.version = self._current_version()
+
+    def delete(self, pk):
+        with self.lock:
+            if self.version is None:
+                return
+            self._remove(pk)
+            self.version = self._current_version()
+
+    def search(self, query):
+        """[(pk, score)] best first. All required terms must match."""
+        required, excluded = parse_query(query)
+        if not required:
+            return []
+        with self.lock:
+            self._ensure_fresh()
+            total   = max(len(self.terms), 1)
+            buckets = [self.postings.get(term, {}) for term in required]
+            if not all(buckets):
+                return []
+            matches = set.intersection(*(set(b) for b in buckets))
+            for term in excluded:
+                matches -= set(self.postings.get(term, ()))
+            scores = {
+                pk: sum(
+                    b[pk] * math.log(1 + total / len(b)) for b in buckets
+                )
+                for pk in matches
+            }
+        return sorted(scores.items(), key=lambda kv: (-kv[1], -kv[0]))
+
+
+_indexes = {model: InvertedIndex(model) for model in SEARCH_FIELDS}
+
+
+# ─────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────
+
+def search(queryset, query):
+    """
+    Filter `queryset` to documents matching `query`, annotated with
+    `search_rank` and ordered best match first.
+
+    Postgres: websearch_to_tsquery against the GIN-indexed search_vector.
+    Anything else: the in-memory inverted index above, same weights.
+    """
+    if _uses_postgres(queryset):
+        q = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            queryset.filter(search_vector=q)
+            .annotate(search_rank=SearchRank(F("search_vector"), q))
+            .order_by("-search_rank", "-pk")
+        )
+
+    ranked = _indexes[queryset.model].search(query)[:FALLBACK_MAX_RESULTS]
+    if not ranked:
+        return queryset.none()
+    return (
+        queryset.filter(pk__in=[pk for pk, _ in ranked])
+        .annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(score)) for pk, score in ranked],
+                output_field=FloatField(),
+            ),
+            search_pos=Case(
+                *[When(pk=pk, then=Value(i)) for i, (pk, _) in enumerate(ranked)],
+                output_field=IntegerField(),
+            ),
+        )
+        .order_by("search_pos")
+    )
+
+
+def highlight(text, query, max_words=30):
+    """
+    HTML-safe snippet of `text` around the first match, matched words in
+    <mark>. Source text is escaped first, so user content can't inject markup.
+    """
+    required, _ = parse_query(query)
+    terms  = set(required)
+    tokens = re.split(r"(\w+)", text or "")
+    words  = list(range(1, len(tokens), 2))     # word tokens sit at odd indexes
+    if not words:
+        return escape(text or "")
+
+    first = next((n for n, i in enumerate(words) if normalize(tokens[i]) in terms), 0)
+    lo    = max(0, first - max_words // 3)
+    hi    = min(len(words), lo + max_words)
+    start = 0 if lo == 0 else words[lo]
+    stop  = len(tokens) if hi == len(words) else words[hi - 1] + 1
+
+    out = []
+    for pos in range(start, stop):
+        piece = escape(tokens[pos])
+        if pos % 2 == 1 and normalize(tokens[pos]) in terms:
+            piece = f"<mark>{piece}</mark>"
+        out.append(piece)
+    snippet = "".join(out)
+    if lo > 0:
+        snippet = "… " + snippet
+    if hi < len(words):
+        snippet += " …"
+    return mark_safe(snippet)
+
+
+def add_headlines(objects, query, field="description", max_words=30):
+    """Set obj.search_headline on each object of an already-sliced page."""
+    for obj in objects:
+        obj.search_headline = highlight(getattr(obj, field), query, max_words)
+    return objects
+
+
+# ─────────────────────────────────────────────────────────
+# Index maintenance (called from signals / rebuild_search_index)
+# ─────────────────────────────────────────────────────────
+
+def _vector(parts):
+    vectors = [
+        SearchVector(Value(text, output_field=TextField()), weight=weight, config=SEARCH_CONFIG)
+        for text, weight in parts
+    ]
+    return reduce(operator.add, vectors) if vectors else Value(None)
+
+
+def update_search_document(obj):
+    """Re-index one instance after it was saved."""
+    model = type(obj)
+    if _uses_postgres(model.objects.all()):
+        model.objects.filter(pk=obj.pk).update(search_vector=_vector(document(obj)))
+    else:
+        _indexes[model].update(obj)
+
+
+def remove_search_document(model, pk):
+    if not _uses_postgres(model.objects.all()):
+        _indexes[model].delete(pk)
+
+
+def rebuild_search_index(model, batch_size=500):
+    """Recompute every search_vector for `model`. Returns rows written."""
+    qs = model.objects.all()
+    if not _uses_postgres(qs):
+        _indexes[model].version = None   # forces a rebuild on next search
+        return qs.count()
+
+    if model not in PREFETCH:
+        # Column-only documents: one set-based UPDATE.
+        return qs.update(search_vector=_column_vector(model))
+
+    written = 0
+    for obj in qs.prefetch_related(*PREFETCH[model]).iterator(chunk_size=batch_size):
+        model.objects.filter(pk=obj.pk).update(search_vector=_vector(document(obj)))
+        written += 1
+    return written
+
+
+def update_search_documents(model, pks, batch_size=500):
+    """
+    Re-index the given instances after a bulk_create / bulk_update, which
+    send no post_save. Returns rows written.
+    """
+    pks = list(pks)
+    if not pks:
+        return 0
+    if not _uses_postgres(model.objects.all()):
+        _indexes[model].version = None   # forces a rebuild on next search
+        return len(pks)
+
+    written = 0
+    for start in range(0, len(pks), batch_size):
+        qs = model.objects.filter(pk__in=pks[start:start + batch_size])
+        if model not in PREFETCH:
+            written += qs.update(search_vector=_column_vector(model))
+            continue
+        for obj in qs.prefetch_related(*PREFETCH[model]):
+            model.objects.filter(pk=obj.pk).update(search_vector=_vector(document(obj)))
+            written += 1
+    return written
+
+
+def _column_vector(model):
+    return reduce(operator.add, [
+        SearchVector(source, weight=weight, config=SEARCH_CONFIG)
+        for source, weight in SEARCH_FIELDS[model]
+    ])
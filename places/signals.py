@@ -1,9 +1,276 @@
+from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in
+from django.db import connection
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Notification
+from .models import (
+    Notification,
+    Category, Place, CheckIn, Comment, Vote,
+    Trail, TrailPlace,
+    Badge, UserBadge, Challenge,
+    UserProfile,
+    TourPackage, TourOffering,
+    Tombstone,
+)
+from .caching import bump_model_version
+from .place_stats import VOTE_FIELDS, adjust_counts, adjust_vote, refresh_rating
+from .search import SEARCH_FIELDS, remove_search_document, update_search_document
+from .related import refresh_related_places_later
+from .image_processing import generate_variants_later
+from .image_variants import has_variants, image_fields
+from .watermarks import tracked_models
 from django.utils.timezone import now
 from datetime import timedelta
 
+# ─────────────────────────────────────────────────────────
+# Denormalised Place aggregates (see places/place_stats.py)
+# Connected before the cache-version receivers so a section rebuilt
+# after the bump already sees the new counts.
+# ─────────────────────────────────────────────────────────
+
+@receiver(post_save, sender=CheckIn)
+def checkin_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_counts(instance.place_id, checkin_count=1)
+
+
+@receiver(post_delete, sender=CheckIn)
+def checkin_deleted(sender, instance, **kwargs):
+    adjust_counts(instance.place_id, checkin_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_counts(instance.place_id, comment_count=1)
+        if instance.rating is None:
+            return
+    refresh_rating(instance.place_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    adjust_counts(instance.place_id, comment_count=-1)
+    if instance.rating is not None:
+        refresh_rating(instance.place_id)
+
+
+@receiver(pre_save, sender=Vote)
+def vote_remember_type(sender, instance, **kwargs):
+    # Only an update can flip up <-> down; inserts skip the lookup.
+    instance._previous_vote_type = None
+    if instance.pk and instance.place_id:
+        instance._previous_vote_type = (
+            Vote.objects.filter(pk=instance.pk)
+            .values_list('vote_type', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Vote)
+def vote_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_vote(instance.place_id, instance.vote_type, 1)
+        return
+    previous = getattr(instance, '_previous_vote_type', None)
+    if previous and previous != instance.vote_type:
+        adjust_counts(instance.place_id, **{
+            VOTE_FIELDS[previous]:           -1,
+            VOTE_FIELDS[instance.vote_type]:  1,
+        })
+
+
+@receiver(post_delete, sender=Vote)
+def vote_deleted(sender, instance, **kwargs):
+    adjust_vote(instance.place_id, instance.vote_type, -1)
+
+
+# Models whose writes invalidate cached sections (see places/caching.py)
+VERSIONED_MODELS = frozenset([
+    Category, Place, CheckIn, Comment, Vote,
+    Trail, TrailPlace,
+    Badge, UserBadge, Challenge,
+    UserProfile, User,
+    TourPackage, TourOffering,
+])
+
+# Plain M2M tables send m2m_changed instead of post_save; a change counts
+# as a write to both ends (e.g. tour.trails.set() -> TourPackage and Trail).
+VERSIONED_M2M = (
+    Place.category.through,
+    Trail.category.through,
+    TourPackage.trails.through,
+    TourPackage.offerings.through,
+)
+
+
+# For these models only writes to the listed fields can change a cached
+# section (home:explorers shows username, avatar and points). Saves that
+# name their fields and miss these are skipped, so a login (last_login)
+# or a level/settings update doesn't invalidate every page.
+RENDERED_FIELDS = {
+    User:        frozenset(['username']),
+    UserProfile: frozenset(['user', 'avatar', 'points']),
+}
+
+
+def bump_cache_version(sender, update_fields=None, **kwargs):
+    rendered = RENDERED_FIELDS.get(sender)
+    if rendered is not None and update_fields and rendered.isdisjoint(update_fields):
+        return
+    bump_model_version(sender)
+
+
+# Connected per model: a sender-less post_delete receiver would count as a
+# listener for every model and disable Django's fast-path cascade deletes.
+for _model in VERSIONED_MODELS:
+    _uid = f"bump_cache_version:{_model._meta.label_lower}"
+    post_save.connect(bump_cache_version,   sender=_model, dispatch_uid=_uid)
+    post_delete.connect(bump_cache_version, sender=_model, dispatch_uid=_uid)
+
+
+def bump_cache_version_m2m(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_model_version(type(instance))
+        bump_model_version(model)
+
+
+for _through in VERSIONED_M2M:
+    m2m_changed.connect(
+        bump_cache_version_m2m, sender=_through,
+        dispatch_uid=f"bump_cache_version:{_through._meta.label_lower}",
+    )
+
+
+
+# ─────────────────────────────────────────────────────────
+# Full-text search documents (see places/search.py)
+# ─────────────────────────────────────────────────────────
+
+def search_document_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_search_document(instance)
+
+
+def search_document_deleted(sender, instance, **kwargs):
+    remove_search_document(sender, instance.pk)
+
+
+for _model in SEARCH_FIELDS:
+    _uid = f"search_document:{_model._meta.label_lower}"
+    post_save.connect(search_document_saved,     sender=_model, dispatch_uid=_uid)
+    post_delete.connect(search_document_deleted, sender=_model, dispatch_uid=_uid)
+
+
+@receiver(m2m_changed, sender=Trail.category.through)
+def trail_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # Category names are part of a trail's search document.
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        update_search_document(instance)
+    elif pk_set:
+        for trail in Trail.objects.filter(pk__in=pk_set).prefetch_related('category'):
+            update_search_document(trail)
+
+
+
+# ─────────────────────────────────────────────────────────
+# Related-places index (see places/related.py)
+# ─────────────────────────────────────────────────────────
+
+# Scores depend on these and the categories (m2m_changed below) only;
+# a description or image edit leaves every list as it was.
+RELATED_FIELDS = ('status', 'latitude', 'longitude')
+
+
+@receiver(pre_save, sender=Place)
+def related_place_remember(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._related_before = None
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not set(RELATED_FIELDS) & set(update_fields):
+        return
+    instance._related_before = (
+        Place.objects.filter(pk=instance.pk).values_list(*RELATED_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Place)
+def related_place_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        # A brand-new pending place can't appear in anyone's list yet.
+        if instance.status == 'approved':
+            refresh_related_places_later([instance.pk])
+        return
+    before = getattr(instance, '_related_before', None)
+    if before is not None and before != tuple(getattr(instance, f) for f in RELATED_FIELDS):
+        refresh_related_places_later([instance.pk])
+
+
+@receiver(m2m_changed, sender=Place.category.through)
+def related_place_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_related_places_later([instance.pk])
+    elif pk_set:
+        refresh_related_places_later(pk_set)
+
+
+@receiver(pre_delete, sender=Place)
+def related_place_deleted(sender, instance, **kwargs):
+    # The cascade drops this place from other lists; top those lists back up.
+    holders = list(instance.neighbour_of.values_list('place_id', flat=True))
+    if holders:
+        refresh_related_places_later(holders)
+
+
+# ─────────────────────────────────────────────────────────
+# Responsive image variants (see places/image_variants.py)
+# ─────────────────────────────────────────────────────────
+
+IMAGE_FIELDS = image_fields()
+
+
+def image_variants_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for field in IMAGE_FIELDS[sender]:
+        fieldfile = getattr(instance, field)
+        if fieldfile and fieldfile.name and not has_variants(fieldfile.name, fieldfile.storage):
+            generate_variants_later(fieldfile.name)
+
+
+for _model in IMAGE_FIELDS:
+    post_save.connect(
+        image_variants_saved, sender=_model,
+        dispatch_uid=f"image_variants:{_model._meta.label_lower}",
+    )
+
+
+# ─────────────────────────────────────────────────────────
+# Tombstones for delta exports (see places/watermarks.py)
+# ─────────────────────────────────────────────────────────
+
+# On Postgres a statement-level trigger writes them, one INSERT per
+# DELETE (migration 0034), so a delete costs no per-row work and the
+# models without receivers of their own keep Django's fast delete.
+# Other backends (development, tests) get a row each here.
+
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(model=sender._meta.label_lower, object_pk=str(instance.pk))
+
+
+if connection.vendor != "postgresql":
+    for _model in tracked_models():
+        post_delete.connect(
+            record_tombstone, sender=_model,
+            dispatch_uid=f"tombstone:{_model._meta.label_lower}",
+        )
+
+
 @receiver(user_logged_in)
 def send_welcome_notification(sender, request, user, **kwargs):
     # Check if welcome notification already sent
@@ -19,4 +286,3 @@ def send_welcome_notification(sender, request, user, **kwargs):
         message="We're glad to see you again. Ready to explore new places?",
         notification_type="welcome_back"
     )
-
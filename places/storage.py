@@ -0,0 +1,200 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = 'blobs'
+CHUNK_SIZE  = 64 * 1024
+
+# blobs/ab/cd/abcd…(64 hex).ext — the name of a content-addressed original
+BLOB_NAME = re.compile(rf'^{BLOB_PREFIX}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/[0-9a-f]{{64}}\.[0-9a-z]+$')
+
+
+def blob_name(sha256, ext):
+    return f"{BLOB_PREFIX}/{sha256[:2]}/{sha256[2:4]}/{sha256}.{ext}"
+
+
+def is_blob_name(name):
+    return bool(BLOB_NAME.match(name or ''))
+
+
+def file_fields():
+    """(model, field name) for every file field in the app — what media is referenced from."""
+    from django.apps import apps
+    from django.db import models
+
+    return [
+        (model, field.name)
+        for model in apps.get_app_config('places').get_models()
+        for field in model._meta.get_fields()
+        if isinstance(field, models.FileField)
+    ]
+
+
+def blob_extension(name):
+    ext = os.path.splitext(name)[1].lower().lstrip('.')
+    return {'jpeg': 'jpg', '': 'bin'}.get(ext, ext)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every upload once, under the SHA-256 of its bytes:
+
+        places/ella/ella_1a2b3c4d.jpg  →  blobs/9f/86/9f86d08…0a08.jpg
+
+    The directory part of the name the upload_to helpers produce is
+    ignored (only its extension is kept); two levels of two-hex-digit
+    shards cap every directory at 256 entries. Saving bytes that are
+    already stored writes nothing and returns the existing name.
+
+    Each blob has a MediaBlob row counting the saves that returned it;
+    delete() decrements and only removes the file (and its responsive
+    variants) when the last reference goes.
+
+    Derived files — responsive variants, written next to their original
+    whether that is a blob or a legacy name — are stored and deleted
+    verbatim, without a MediaBlob row, and so are legacy names.
+    """
+
+    def _verbatim(self, name):
+        from .image_variants import is_variant_name
+        return name.startswith(f'{BLOB_PREFIX}/') or is_variant_name(name)
+
+    def _save(self, name, content):
+        if self._verbatim(name):
+            return super()._save(name, content)
+        target, sha256, size = self.put(name, content)
+        self.add_reference(target, sha256, size)
+        return target
+
+    def put(self, name, content):
+        """
+        Store `content` under its content address without counting a
+        reference. Returns (blob name, sha256, size).
+        """
+        # One pass: hash while spooling to a temp file beside the shards,
+        # then move it into place (or drop it, if the blob already exists).
+        spool_dir = self.path(f'{BLOB_PREFIX}/tmp')
+        os.makedirs(spool_dir, exist_ok=True)
+        sha  = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=spool_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks(CHUNK_SIZE):
+                    sha.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+
+            target = blob_name(sha.hexdigest(), blob_extension(name))
+            if self.claim(target):
+                os.remove(tmp_path)
+            else:
+                path = self.path(target)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return target, sha.hexdigest(), size
+
+    def claim(self, name):
+        """True if blob `name` is already stored; refreshes it for gc_media's --min-age."""
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content, not on what's already there
+        if self._verbatim(name):
+            return super().get_available_name(name, max_length)
+        return name
+
+    def delete(self, name):
+        if not is_blob_name(name):
+            return super().delete(name)
+        if self._drop_reference(name):
+            from .image_variants import delete_variants
+            delete_variants(name, self)
+            super().delete(name)
+
+    # ── Reference counts ─────────────────────────────────────
+
+    def add_reference(self, name, sha256, size, count=1):
+        from .models import MediaBlob
+
+        with transaction.atomic():
+            blob, created = MediaBlob.objects.select_for_update().get_or_create(
+                name=name, defaults={'sha256': sha256, 'size': size, 'ref_count': count},
+            )
+            if not created:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + count)
+
+    def _drop_reference(self, name):
+        """Decrement; True when nothing references the blob any more."""
+        from .models import MediaBlob
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                return True         # never counted (e.g. copied in by hand)
+            if blob.ref_count > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return False
+            blob.delete()
+            return True
+
+    # ── Migration of legacy names (manage.py content_address_media) ──
+
+    def adopt(self, name):
+        """
+        Give the legacy file `name` — and any responsive variants next to
+        it — a content address. The originals stay where they are
+        (hard-linked, so no extra space) until the caller has repointed
+        the database and deletes them.
+
+        Returns (blob name, sha256, size, duplicate): `duplicate` means an
+        identical blob was already stored, so deleting `name` frees space.
+        """
+        from .image_variants import VARIANT_FORMATS, VARIANT_WIDTHS, variant_name
+
+        sha  = hashlib.sha256()
+        size = 0
+        with self.open(name, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+                size += len(chunk)
+
+        target    = blob_name(sha.hexdigest(), blob_extension(name))
+        duplicate = self.exists(target)
+        if not duplicate:
+            self._link(name, target)
+        for width in VARIANT_WIDTHS:
+            for fmt in VARIANT_FORMATS:
+                old, new = variant_name(name, width, fmt), variant_name(target, width, fmt)
+                if self.exists(old) and not self.exists(new):
+                    self._link(old, new)
+        return target, sha.hexdigest(), size, duplicate
+
+    def _link(self, src, dst):
+        src, dst = self.path(src), self.path(dst)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        try:
+            os.link(src, dst)
+        except OSError:             # other filesystem, or links not allowed
+            shutil.copyfile(src, dst)
@@ -0,0 +1,35 @@
+# places/templatetags/image_tags.py
+#
+# {% load image_tags %}
+# {% responsive_image place.image alt=place.name sizes="(max-width: 600px) 100vw, 190px" %}
+#
+# Renders a <picture> with WebP and JPEG srcsets from the variants made by
+# places/image_variants.py; falls back to a plain <img> of the original
+# while an upload hasn't been processed yet.
+
+from django import template
+from django.utils.html import format_html
+
+from places.image_variants import variant_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(fieldfile, alt='', sizes='100vw', css_class='', loading='lazy'):
+    if not fieldfile:
+        return ''
+    urls = variant_urls(fieldfile)
+    if urls is None:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}">',
+            fieldfile.url, alt, css_class, loading,
+        )
+    return format_html(
+        '<picture style="display:contents">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}">'
+        '</picture>',
+        urls['webp_srcset'], sizes,
+        urls['src'], urls['srcset'], sizes, alt, css_class, loading,
+    )
@@ -1,3 +1,1053 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import io
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from . import image_processing, perceptual_hash, rate_limit, recommendations, visit_counter
+from .caching import get_model_versions
+from .facets import facet_counts, filter_bbox, parse_bbox
+from .image_ingest import IngestReport, update_references
+from .image_variants import _known, bump_variant_owners, generate_variants, has_variants, variant_name
+from .management.commands import import_all_data
+from .models import (
+    Badge, Category, CheckIn, Comment, CoVisitedPlace, DailyCategoryStats, DailyStats,
+    ExportWatermark, ImportCheckpoint, MediaBlob, Notification, Place, PlaceImage,
+    Tombstone, TrailPlace, Vote,
+)
+from .pagination import decode_cursor, encode_cursor, keyset_page
+from .place_stats import recompute_place_stats
+from .storage import ContentAddressedStorage, blob_name, is_blob_name
+from .upload_inspection import HEAD_LIMIT, inspect_upload, read_exif
+
+
+# ─────────────────────────────────────────────────────────
+# Rate limiting
+# ─────────────────────────────────────────────────────────
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1_000_000.0
+        patcher  = mock.patch.object(rate_limit.time, "time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def take(self, capacity=3, period=60):
+        return rate_limit.take_token("test", 1, "bucket", capacity, period)
+
+    def test_allows_a_burst_up_to_capacity(self):
+        self.assertEqual([self.take() for _ in range(4)], [True, True, True, False])
+
+    def test_refills_gradually(self):
+        for _ in range(3):
+            self.take()
+        self.now += 19                  # 0.95 of a token
+        self.assertFalse(self.take())
+        self.now += 1                   # a refused call spends nothing
+        self.assertTrue(self.take())
+        self.assertFalse(self.take())
+
+    def test_refill_is_capped_at_capacity(self):
+        self.take()
+        self.now += 3600
+        self.assertEqual([self.take() for _ in range(4)], [True, True, True, False])
+
+    def test_buckets_are_separate(self):
+        for _ in range(3):
+            self.take()
+        self.assertTrue(rate_limit.take_token("test", 2, "bucket", 3, 60))
+        self.assertTrue(rate_limit.take_token("test", 1, "other", 3, 60))
+
+    def test_refuses_while_the_bucket_is_locked(self):
+        cache.add(rate_limit._bucket_key("test", 1, "bucket") + ":lock", 1)
+        with mock.patch.object(rate_limit.time, "sleep"):
+            self.assertFalse(self.take())
+
+    def test_can_notify_limits_per_user_and_type(self):
+        user = User(pk=7)
+        self.assertEqual(
+            [rate_limit.can_notify(user, "badge", capacity=2) for _ in range(3)],
+            [True, True, False],
+        )
+        self.assertTrue(rate_limit.can_notify(user, "comment", capacity=2))
+
+
+# ─────────────────────────────────────────────────────────
+# Keyset pagination
+# ─────────────────────────────────────────────────────────
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("reader")
+        self.base = timezone.now().replace(microsecond=0)
+        # Pairs share a timestamp, so the id breaks the ties
+        for i in range(10):
+            self.notify(self.base - datetime.timedelta(minutes=i // 2))
+
+    def notify(self, created_at):
+        notification = Notification.objects.create(
+            user=self.user, title="t", message="m", notification_type="welcome",
+        )
+        Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+        return notification.pk
+
+    def pages(self, per_page, between=None):
+        seen, cursor = [], None
+        while True:
+            page = keyset_page(Notification.objects.all(), cursor, per_page)
+            seen.extend(n.pk for n in page)
+            if not page.has_next():
+                return seen
+            cursor = page.next_cursor
+            if between:
+                between()
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        expected = list(
+            Notification.objects.order_by("-created_at", "-id").values_list("pk", flat=True)
+        )
+        self.assertEqual(self.pages(3), expected)
+
+    def test_cursor_is_stable_across_inserts(self):
+        before = list(
+            Notification.objects.order_by("-created_at", "-id").values_list("pk", flat=True)
+        )
+        # New rows land ahead of the cursor, old ones keep their place
+        self.assertEqual(self.pages(3, between=lambda: self.notify(timezone.now())), before)
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(self.base, 42)), (self.base, 42))
+
+    def test_malformed_cursor_starts_over(self):
+        self.assertIsNone(decode_cursor("not a cursor"))
+        page = keyset_page(Notification.objects.all(), "not a cursor", 4)
+        self.assertEqual(len(page), 4)
+        self.assertTrue(page.has_next())
+
+
+# ─────────────────────────────────────────────────────────
+# Denormalised place counters
+# ─────────────────────────────────────────────────────────
+
+class PlaceCounterTests(TestCase):
+    def setUp(self):
+        self.user  = User.objects.create_user("visitor")
+        self.other = User.objects.create_user("other")
+        self.place = Place.objects.create(name="Ella Rock", description="d", created_by=self.user)
+
+    def counts(self):
+        return Place.objects.values(
+            "checkin_count", "comment_count", "rating_count", "rating_avg",
+            "approval_votes", "rejection_votes",
+        ).get(pk=self.place.pk)
+
+    def assertMatchesRecompute(self):
+        kept = self.counts()
+        recompute_place_stats(Place.objects.filter(pk=self.place.pk))
+        self.assertEqual(kept, self.counts())
+
+    def test_checkin_create_and_delete(self):
+        first = CheckIn.objects.create(user=self.user, place=self.place)
+        CheckIn.objects.create(user=self.other, place=self.place)
+        self.assertEqual(self.counts()["checkin_count"], 2)
+        first.delete()
+        self.assertEqual(self.counts()["checkin_count"], 1)
+        self.assertMatchesRecompute()
+
+    def test_comment_counts_and_rating(self):
+        Comment.objects.create(user=self.user, place=self.place, text="a", rating=5)
+        rated = Comment.objects.create(user=self.other, place=self.place, text="b", rating=2)
+        Comment.objects.create(user=self.other, place=self.place, text="c")
+        counts = self.counts()
+        self.assertEqual((counts["comment_count"], counts["rating_count"]), (3, 2))
+        self.assertAlmostEqual(counts["rating_avg"], 3.5)
+
+        rated.rating = 4
+        rated.save()
+        self.assertAlmostEqual(self.counts()["rating_avg"], 4.5)
+        rated.delete()
+        counts = self.counts()
+        self.assertEqual((counts["comment_count"], counts["rating_count"]), (2, 1))
+        self.assertAlmostEqual(counts["rating_avg"], 5.0)
+        self.assertMatchesRecompute()
+
+    def test_vote_create_flip_and_delete(self):
+        vote = Vote.objects.create(user=self.user, place=self.place, vote_type="up")
+        Vote.objects.create(user=self.other, place=self.place, vote_type="up")
+        self.assertEqual((self.counts()["approval_votes"], self.counts()["rejection_votes"]), (2, 0))
+
+        vote.vote_type = "down"
+        vote.save()
+        self.assertEqual((self.counts()["approval_votes"], self.counts()["rejection_votes"]), (1, 1))
+        vote.save()                     # saving the same type again changes nothing
+        self.assertEqual((self.counts()["approval_votes"], self.counts()["rejection_votes"]), (1, 1))
+
+        vote.delete()
+        self.assertEqual((self.counts()["approval_votes"], self.counts()["rejection_votes"]), (1, 0))
+        self.assertMatchesRecompute()
+
+
+# ─────────────────────────────────────────────────────────
+# Buffered visit counter
+# ─────────────────────────────────────────────────────────
+
+class VisitCounterTests(TestCase):
+    def setUp(self):
+        user        = User.objects.create_user("owner")
+        self.place  = Place.objects.create(name="Sigiriya", description="d", created_by=user)
+        self.other  = Place.objects.create(name="Knuckles", description="d", created_by=user)
+        visit_counter._pending.clear()
+        patcher     = mock.patch.object(visit_counter, "_arm_timer")   # no timer threads
+        self.timer  = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(visit_counter._pending.clear)
+
+    def visits(self, place):
+        return Place.objects.values_list("visit_count", flat=True).get(pk=place.pk)
+
+    def test_visits_are_buffered_until_flushed(self):
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                visit_counter.record_visit(self.place.pk)
+            visit_counter.record_visit(self.other.pk)
+        self.assertEqual(self.visits(self.place), 0)
+        self.assertEqual(visit_counter.live_visit_count(self.place), 3)
+
+        self.assertEqual(visit_counter.flush_visits(), 2)
+        self.assertEqual((self.visits(self.place), self.visits(self.other)), (3, 1))
+        self.assertEqual(visit_counter.pending_visits(self.place.pk), 0)
+
+    def test_full_buffer_wakes_the_timer_instead_of_flushing(self):
+        with mock.patch.object(visit_counter, "FLUSH_MAX_PENDING", 2):
+            with self.assertNumQueries(0):
+                visit_counter.record_visit(self.place.pk)
+                visit_counter.record_visit(self.place.pk)
+        self.assertEqual(self.timer.call_args_list, [mock.call(visit_counter.FLUSH_INTERVAL), mock.call(0)])
+
+    def test_failed_flush_keeps_the_visits(self):
+        visit_counter.record_visit(self.place.pk)
+        with mock.patch.object(Place.objects, "filter", side_effect=DatabaseError("down")):
+            with self.assertLogs("places.visit_counter", "ERROR"):
+                with self.assertRaises(DatabaseError):
+                    visit_counter.flush_visits()
+        visit_counter.record_visit(self.place.pk)   # counted alongside the re-buffered one
+        self.assertEqual(visit_counter.pending_visits(self.place.pk), 2)
+
+        visit_counter.flush_visits()
+        self.assertEqual(self.visits(self.place), 2)
+
+    def test_flush_leaves_the_place_version_alone(self):
+        before = get_model_versions(Place)
+        visit_counter.record_visit(self.place.pk)
+        visit_counter.flush_visits()
+        self.assertEqual(get_model_versions(Place), before)
+
+    def test_exit_flush_waits_for_a_running_flush(self):
+        exiting = threading.Thread(target=visit_counter._flush_quietly)
+        with mock.patch.object(visit_counter, "_flush", return_value=0) as flush:
+            with visit_counter._flush_lock:      # a timer flush mid-write
+                exiting.start()
+                exiting.join(0.2)
+                self.assertTrue(exiting.is_alive())
+                flush.assert_not_called()
+            exiting.join()
+        flush.assert_called_once_with()
+
+
+# ─────────────────────────────────────────────────────────
+# Daily analytics rollup
+# ─────────────────────────────────────────────────────────
+
+class RollupStatsTests(TestCase):
+    DAY = datetime.date(2026, 3, 10)
+
+    def at(self, offset, hour=12):
+        day = self.DAY + datetime.timedelta(days=offset)
+        return timezone.make_aware(datetime.datetime.combine(day, datetime.time(hour)))
+
+    def setUp(self):
+        users = [User.objects.create_user(f"u{i}", date_joined=self.at(offset))
+                 for i, offset in enumerate((-120, -95, -40, -8, -1, 0))]
+        hikes = Category.objects.create(name="Hikes", slug="hikes")
+        falls = Category.objects.create(name="Waterfalls", slug="falls")
+        self.categories = [hikes, falls]
+
+        places = []
+        for offset, status, categories in (
+            (-100, "approved", [hikes]), (-30, "approved", [hikes, falls]),
+            (-2, "pending", [falls]), (-1, "approved", []), (0, "rejected", [hikes]),
+        ):
+            place = Place.objects.create(name=f"P{offset}", description="d", created_by=users[0], status=status)
+            place.category.set(categories)
+            Place.objects.filter(pk=place.pk).update(created_at=self.at(offset))
+            places.append(place)
+
+        for user, place, offset, hour in (
+            (0, 0, -95, 9), (1, 0, -60, 9), (1, 1, -9, 9), (0, 1, -25, 9), (2, 1, -6, 9),
+            (3, 0, -2, 9), (3, 1, -2, 18), (4, 2, -1, 9), (5, 3, 0, 23),
+        ):
+            checkin = CheckIn.objects.create(user=users[user], place=places[place])
+            CheckIn.objects.filter(pk=checkin.pk).update(created_at=self.at(offset, hour))
+
+    def live(self, day):
+        since = self.at((day - self.DAY).days, hour=0)
+        until = since + datetime.timedelta(days=1)
+
+        def active(days):
+            return (CheckIn.objects.filter(created_at__gte=until - datetime.timedelta(days=days),
+                                           created_at__lt=until)
+                    .values("user").distinct().count())
+
+        places = Place.objects.filter(created_at__lt=until)
+        return {
+            "new_users":        User.objects.filter(date_joined__gte=since, date_joined__lt=until).count(),
+            "new_places":       places.filter(created_at__gte=since).count(),
+            "new_checkins":     CheckIn.objects.filter(created_at__gte=since, created_at__lt=until).count(),
+            "active_users":     active(1),
+            "active_users_7d":  active(7),
+            "active_users_30d": active(30),
+            "active_users_90d": active(90),
+            "total_users":      User.objects.filter(date_joined__lt=until).count(),
+            "total_places":     places.count(),
+            "approved_places":  places.filter(status="approved").count(),
+            "pending_places":   places.filter(status="pending").count(),
+            "total_checkins":   CheckIn.objects.filter(created_at__lt=until).count(),
+        }, {
+            category.pk: (places.filter(category=category, created_at__gte=since).count(),
+                          places.filter(category=category).count())
+            for category in self.categories
+        }
+
+    def rollup(self, since, until):
+        call_command("rollup_stats", since=since.isoformat(), until=until.isoformat(), stdout=io.StringIO())
+
+    def test_rolled_up_days_match_live_counts(self):
+        since = self.DAY - datetime.timedelta(days=7)
+        self.rollup(since, self.DAY)
+        self.rollup(self.DAY - datetime.timedelta(days=2), self.DAY)    # overlapping re-run
+        self.assertEqual(DailyStats.objects.count(), 8)
+
+        for offset in range(8):
+            day = since + datetime.timedelta(days=offset)
+            with self.subTest(day=day):
+                stats, by_category = self.live(day)
+                row = DailyStats.objects.values(*stats).get(date=day)
+                self.assertEqual(row, stats)
+                rows = DailyCategoryStats.objects.filter(date=day).values_list(
+                    "category_id", "new_places", "place_count",
+                )
+                self.assertEqual({pk: (new, count) for pk, new, count in rows}, by_category)
+
+        latest = DailyStats.objects.get(date=self.DAY)
+        self.assertEqual(
+            (latest.active_users, latest.active_users_7d, latest.active_users_30d, latest.active_users_90d),
+            (1, 4, 6, 6),
+        )
+
+
+# ─────────────────────────────────────────────────────────
+# Facets and bbox filtering
+# ─────────────────────────────────────────────────────────
+
+class FacetTests(TestCase):
+    def setUp(self):
+        user       = User.objects.create_user("owner")
+        self.hikes = Category.objects.create(name="Hikes", slug="hikes")
+        self.falls = Category.objects.create(name="Waterfalls", slug="falls")
+
+        def place(name, lat, lng, difficulty, safety, district, *categories):
+            obj = Place.objects.create(
+                name=name, description="d", created_by=user, status="approved",
+                latitude=lat, longitude=lng, difficulty=difficulty,
+                safety_rating=safety, district=district,
+            )
+            obj.category.set(categories)
+            return obj
+
+        self.ella   = place("Ella Rock",   6.86, 81.04, "moderate",    4, "badulla",  self.hikes)
+        self.ravana = place("Ravana Falls", 6.84, 81.05, "easy",       5, "badulla",  self.falls)
+        self.bambar = place("Bambarakanda", 6.77, 80.83, "challenging", 3, "badulla", self.hikes, self.falls)
+        self.galle  = place("Galle Fort",   6.03, 80.22, "easy",       5, "galle")
+        self.approved = Place.objects.filter(status="approved")
+
+    def counts(self, facets, name):
+        return {bucket["value"]: bucket["count"] for bucket in facets[name]}
+
+    def test_counts_every_facet_in_one_aggregate(self):
+        with self.assertNumQueries(2):      # the category list, then the counts
+            facets = facet_counts(self.approved)
+        self.assertEqual(self.counts(facets, "category"), {"falls": 2, "hikes": 2})
+        self.assertEqual(self.counts(facets, "difficulty"), {"easy": 2, "moderate": 1, "challenging": 1})
+        self.assertEqual(self.counts(facets, "safety"), {5: 2, 4: 1, 3: 1})
+        self.assertEqual(self.counts(facets, "district"), {"badulla": 3, "galle": 1})
+        self.assertEqual([b["value"] for b in facets["difficulty"]], ["easy", "moderate", "challenging"])
+
+    def test_each_facet_ignores_its_own_selection(self):
+        facets = facet_counts(self.approved, {"difficulty": "easy", "category": "hikes"})
+        self.assertEqual(self.counts(facets, "difficulty"), {"moderate": 1, "challenging": 1, "easy": 0})
+        self.assertEqual(self.counts(facets, "category"), {"falls": 1, "hikes": 0})
+        self.assertEqual(self.counts(facets, "district"), {})
+        easy = next(b for b in facets["difficulty"] if b["value"] == "easy")
+        self.assertTrue(easy["selected"])   # kept visible at 0
+
+    def test_parse_bbox(self):
+        self.assertEqual(parse_bbox("80.5,6.5,81.5,7"), (80.5, 6.5, 81.5, 7.0))
+        for value in ("", None, "1,2,3", "a,b,c,d", "81,6,80,7", "80,7,81,6"):
+            self.assertIsNone(parse_bbox(value), value)
+
+    def test_bbox_composes_with_facets(self):
+        hill_country = filter_bbox(self.approved, parse_bbox("80.5,6.5,81.5,7"))
+        self.assertEqual(set(hill_country), {self.ella, self.ravana, self.bambar})
+        self.assertEqual(filter_bbox(self.approved, None).count(), 4)
+        facets = facet_counts(hill_country, {"category": "falls"})
+        self.assertEqual(self.counts(facets, "district"), {"badulla": 2})
+        self.assertEqual(self.counts(facets, "category"), {"falls": 2, "hikes": 2})
+
+    def test_api_list_filters_and_counts(self):
+        response = self.client.get(
+            "/api/places/", {"bbox": "80.5,6.5,81.5,7", "difficulty": "easy", "facets": "1"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p["id"] for p in response.data["results"]], [self.ravana.pk])
+        self.assertEqual(self.counts(response.data["facets"], "difficulty"),
+                         {"easy": 1, "moderate": 1, "challenging": 1})
+
+
+# ─────────────────────────────────────────────────────────
+# Upload inspection
+# ─────────────────────────────────────────────────────────
+
+def _image_bytes(fmt, size=(41, 29), mode="RGB", **options):
+    buf = io.BytesIO()
+    Image.new(mode, size, "red").save(buf, fmt, **options)
+    return buf.getvalue()
+
+
+def _gps_exif(orientation=1):
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif.get_ifd(0x8769)[0x9003] = "2024:05:01 10:30:00"
+    gps = exif.get_ifd(0x8825)
+    gps.update({1: "N", 2: (6.0, 52.0, 12.0), 3: "E", 4: (80.0, 30.0, 0.0)})
+    return exif
+
+
+class UploadInspectionTests(SimpleTestCase):
+    def inspect(self, data):
+        upload = io.BytesIO(data)
+        result = inspect_upload(upload)
+        self.assertEqual(upload.tell(), 0)
+        self.assertEqual(result.sha256, hashlib.sha256(data).hexdigest())
+        self.assertEqual(result.size, len(data))
+        return result
+
+    def test_jpeg_exif_gps_and_timestamp(self):
+        result = self.inspect(_image_bytes("JPEG", exif=_gps_exif()))
+        self.assertEqual((result.format, result.width, result.height), ("jpeg", 41, 29))
+        self.assertAlmostEqual(result.gps_lat, 6.87)
+        self.assertAlmostEqual(result.gps_lng, 80.5)
+        self.assertEqual(result.taken_at, datetime.datetime(2024, 5, 1, 10, 30))
+        self.assertTrue(result.is_valid_image)
+
+    def test_jpeg_orientation_swaps_dimensions(self):
+        result = self.inspect(_image_bytes("JPEG", exif=_gps_exif(orientation=6)))
+        self.assertEqual((result.width, result.height), (29, 41))
+
+    def test_southern_and_western_references_are_negative(self):
+        exif = _gps_exif()
+        exif.get_ifd(0x8825).update({1: "S", 3: "W"})
+        result = self.inspect(_image_bytes("JPEG", exif=exif))
+        self.assertAlmostEqual(result.gps_lat, -6.87)
+        self.assertAlmostEqual(result.gps_lng, -80.5)
+
+    def test_jpeg_without_exif(self):
+        result = self.inspect(_image_bytes("JPEG"))
+        self.assertEqual((result.width, result.height), (41, 29))
+        self.assertEqual(result.exif_info, {"gps_lat": None, "gps_lng": None, "timestamp": None})
+
+    def test_png_and_gif_dimensions(self):
+        for fmt in ("PNG", "GIF"):
+            with self.subTest(fmt):
+                result = self.inspect(_image_bytes(fmt))
+                self.assertEqual((result.format, result.width, result.height), (fmt.lower(), 41, 29))
+
+    def test_webp_dimensions(self):
+        cases = {
+            "VP8 ": {},
+            "VP8L": {"lossless": True},
+            "VP8X": {"exif": _gps_exif()},
+        }
+        for chunk, options in cases.items():
+            with self.subTest(chunk):
+                data = _image_bytes("WEBP", **options)
+                self.assertEqual(data[12:16], chunk.encode())
+                result = self.inspect(data)
+                self.assertEqual((result.format, result.width, result.height), ("webp", 41, 29))
+
+    def test_png_and_webp_exif_chunks(self):
+        for fmt in ("PNG", "WEBP"):
+            with self.subTest(fmt):
+                result = self.inspect(_image_bytes(fmt, exif=_gps_exif(orientation=6)))
+                self.assertEqual((result.format, result.width, result.height), (fmt.lower(), 29, 41))
+                self.assertAlmostEqual(result.gps_lat, 6.87)
+                self.assertAlmostEqual(result.gps_lng, 80.5)
+                self.assertEqual(result.taken_at, datetime.datetime(2024, 5, 1, 10, 30))
+
+    def test_exif_chunks_past_the_head_are_found(self):
+        noise = Image.frombytes("RGB", (400, 400), os.urandom(400 * 400 * 3))
+        buf   = io.BytesIO()
+        noise.save(buf, "WEBP", lossless=True, exif=_gps_exif())
+        webp  = buf.getvalue()
+
+        buf   = io.BytesIO()
+        noise.save(buf, "PNG")
+        block = _gps_exif().tobytes()
+        exif  = struct.pack(">I", len(block)) + b"eXIf" + block + struct.pack(">I", zlib.crc32(b"eXIf" + block))
+        png   = buf.getvalue()[:-12] + exif + buf.getvalue()[-12:]    # after IDAT, before IEND
+
+        for data in (webp, png):
+            self.assertGreater(len(data), HEAD_LIMIT)
+            self.assertAlmostEqual(self.inspect(data).gps_lat, 6.87)
+            self.assertAlmostEqual(read_exif(io.BytesIO(data))["gps_lng"], 80.5)
+
+    def test_oversized_dimensions_are_rejected(self):
+        header = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 100_000, 100_000)
+        result = self.inspect(header + b"\x00" * 16)
+        self.assertEqual(result.format, "png")
+        self.assertFalse(result.is_valid_image)
+
+    def test_unknown_and_truncated_data(self):
+        self.assertEqual(self.inspect(b"not an image").format, "")
+        self.assertFalse(self.inspect(b"not an image").is_valid_image)
+        truncated = _image_bytes("JPEG", exif=_gps_exif())[:40]
+        result = self.inspect(truncated)
+        self.assertEqual(result.format, "jpeg")
+        self.assertIsNone(result.width)
+
+    def test_read_exif_of_a_stored_photo(self):
+        info = read_exif(io.BytesIO(_image_bytes("JPEG", exif=_gps_exif())))
+        self.assertAlmostEqual(info["gps_lat"], 6.87)
+        self.assertEqual(info["timestamp"], datetime.datetime(2024, 5, 1, 10, 30))
+
+
+# ─────────────────────────────────────────────────────────
+# Perceptual hashing
+# ─────────────────────────────────────────────────────────
+
+def _signed(value):
+    """A 64-bit hash as stored in a BigIntegerField."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _flip(value, *positions):
+    for p in positions:
+        value ^= 1 << p
+    return _signed(value & ((1 << 64) - 1))
+
+
+class NearDuplicateTests(TestCase):
+    HASH = _signed(0xD6A5_93C1_F00F_5A3C)
+
+    def setUp(self):
+        self.user  = User.objects.create_user("hasher")
+        self.other = User.objects.create_user("copier")
+
+    def store(self, value, user=None):
+        # One check-in per user and place, so every photo gets its own place
+        place = Place.objects.create(name=f"Peak {value}", description="d", created_by=self.user)
+        return CheckIn.objects.create(
+            user=user or self.user, place=place,
+            photo_dhash=value, **perceptual_hash.band_values(value),
+        ).pk
+
+    def test_bands_split_the_unsigned_hash(self):
+        self.assertEqual(perceptual_hash.bands(self.HASH), [0xD6A5, 0x93C1, 0xF00F, 0x5A3C])
+
+    def test_finds_a_match_spread_over_every_band(self):
+        # 3 + 3 + 2 + 2 bits: no band is exact, two are within the probe radius
+        near = _flip(self.HASH, 0, 1, 2, 16, 17, 18, 32, 33, 48, 49)
+        pk   = self.store(near)
+        self.assertEqual(perceptual_hash.find_near_duplicates(self.HASH, user=self.user), [(pk, 10)])
+
+    def test_ignores_matches_past_the_distance(self):
+        self.store(_flip(self.HASH, 0, 1, 2, 16, 17, 18, 32, 33, 34, 48, 49))
+        self.assertEqual(perceptual_hash.find_near_duplicates(self.HASH, user=self.user), [])
+
+    def test_other_users_need_a_closer_match(self):
+        close = self.store(_flip(self.HASH, 0, 16, 32, 48), user=self.other)
+        self.store(_flip(self.HASH, 0, 1, 16, 32, 48), user=self.other)
+        own   = self.store(_flip(self.HASH, 0, 1, 16, 32, 48))
+        self.assertEqual(
+            perceptual_hash.find_near_duplicates(self.HASH, user=self.user),
+            [(close, 4), (own, 5)],
+        )
+
+    def test_degenerate_hashes_never_match(self):
+        self.store(0)
+        self.store(_flip(0, 3))
+        self.assertEqual(perceptual_hash.find_near_duplicates(0, user=self.user), [])
+        self.assertEqual(perceptual_hash.find_near_duplicates(_flip(0, 3), user=self.user), [])
+
+    def test_flat_images_are_not_hashed(self):
+        flat = io.BytesIO(_image_bytes("PNG", size=(200, 150)))
+        self.assertIsNone(perceptual_hash.dhash(flat))
+        self.assertEqual(flat.tell(), 0)
+
+    def test_reencoded_copy_stays_close(self):
+        img = Image.radial_gradient("L").resize((320, 240)).convert("RGB")
+        original, copy = io.BytesIO(), io.BytesIO()
+        img.save(original, "PNG")
+        img.resize((200, 150)).save(copy, "JPEG", quality=60)
+        a, b = perceptual_hash.dhash(original), perceptual_hash.dhash(copy)
+        self.assertTrue(perceptual_hash.is_distinctive(a))
+        self.assertLessEqual(perceptual_hash.hamming(a, b), perceptual_hash.OTHER_USER_DISTANCE)
+
+
+# ─────────────────────────────────────────────────────────
+# Co-visit recommendations
+# ─────────────────────────────────────────────────────────
+
+class BuildRecommendationsTests(TestCase):
+    def setUp(self):
+        owner       = User.objects.create_user("owner")
+        self.places = [
+            Place.objects.create(name=f"P{i}", description="d", created_by=owner, status="approved")
+            for i in range(3)
+        ]
+        for name in ("a", "b"):
+            user = User.objects.create_user(name)
+            for place in self.places:
+                CheckIn.objects.create(user=user, place=place)
+        CoVisitedPlace.objects.create(place=self.places[0], similar=self.places[0],
+                                      rank=0, score=0.0, co_visits=0)   # stale
+
+    def test_rows_are_written_in_batches_and_replace_the_old_table(self):
+        with mock.patch.object(recommendations, "WRITE_BATCH", 2), \
+             mock.patch.object(CoVisitedPlace.objects, "bulk_create",
+                               wraps=CoVisitedPlace.objects.bulk_create) as bulk_create:
+            self.assertEqual(recommendations.build_recommendations(), (3, 6))
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [2, 2, 2, 0])
+        self.assertEqual(
+            sorted(CoVisitedPlace.objects.values_list("place_id", "similar_id", "co_visits")),
+            sorted((p.pk, q.pk, 2) for p in self.places for q in self.places if p != q),
+        )
+
+
+# ─────────────────────────────────────────────────────────
+# Content-addressed media storage
+# ─────────────────────────────────────────────────────────
+
+class MediaStorageMixin:
+    """A ContentAddressedStorage in a throwaway directory, as self.storage."""
+
+    def setUp(self):
+        super().setUp()
+        self.media   = tempfile.mkdtemp()
+        self.storage = ContentAddressedStorage(location=self.media)
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+
+    def refs(self, name):
+        return MediaBlob.objects.filter(name=name).values_list("ref_count", flat=True).first()
+
+
+class ContentAddressedStorageTests(MediaStorageMixin, TestCase):
+    def test_identical_uploads_share_one_blob(self):
+        first  = self.storage.save("places/ella/ella.jpg", ContentFile(b"photo"))
+        second = self.storage.save("places/kandy/other.JPEG", ContentFile(b"photo"))
+        self.assertEqual(first, second)
+        self.assertTrue(is_blob_name(first))
+        self.assertTrue(first.endswith(".jpg"))
+        self.assertEqual(self.refs(first), 2)
+        self.assertEqual(os.listdir(os.path.join(self.media, "blobs", "tmp")), [])
+
+    def test_delete_keeps_the_file_until_the_last_reference(self):
+        name    = self.storage.save("a.jpg", ContentFile(b"photo"))
+        self.storage.save("b.jpg", ContentFile(b"photo"))
+        variant = self.storage.save(variant_name(name, 400, "webp"), ContentFile(b"small"))
+
+        self.storage.delete(name)
+        self.assertEqual(self.refs(name), 1)
+        self.assertTrue(self.storage.exists(name))
+
+        self.storage.delete(name)
+        self.assertIsNone(self.refs(name))
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(self.storage.exists(variant))
+
+    def test_replacing_a_shared_image(self):
+        old = self.storage.save("a.jpg", ContentFile(b"old"))
+        self.storage.save("b.jpg", ContentFile(b"old"))
+        new = self.storage.save("a.jpg", ContentFile(b"new"))
+        self.storage.delete(old)
+        self.assertEqual((self.refs(old), self.refs(new)), (1, 1))
+        self.assertTrue(self.storage.exists(old))
+
+    def test_put_stores_without_a_reference(self):
+        name, sha256, size = self.storage.put("a.png", ContentFile(b"bytes"))
+        self.assertEqual((sha256, size), (hashlib.sha256(b"bytes").hexdigest(), 5))
+        self.assertTrue(self.storage.exists(name))
+        self.assertIsNone(self.refs(name))
+        self.storage.add_reference(name, sha256, size, count=3)
+        self.assertEqual(self.refs(name), 3)
+
+    def test_variants_of_a_legacy_original_are_stored_beside_it(self):
+        name = "places/ella/ella_1.jpg"
+        path = os.path.join(self.media, name)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as fh:
+            fh.write(_image_bytes("JPEG", size=(900, 600)))
+
+        written = generate_variants(name, self.storage)
+        self.assertEqual(written, 8)
+        self.assertTrue(self.storage.exists(variant_name(name, 400, "webp")))
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(os.path.exists(os.path.join(self.media, "blobs")))
+        _known.discard(name)                    # as another process would see it
+        self.assertTrue(has_variants(name, self.storage))
+
+    def test_legacy_names_are_deleted_verbatim(self):
+        with open(os.path.join(self.media, "legacy.jpg"), "wb") as fh:
+            fh.write(b"old upload")
+        self.storage.delete("legacy.jpg")
+        self.assertFalse(self.storage.exists("legacy.jpg"))
+
+
+class VariantVersionTests(TestCase):
+    def setUp(self):
+        self.user  = User.objects.create_user("owner")
+        self.place = Place.objects.create(name="Ella", description="d", created_by=self.user)
+        PlaceImage.objects.create(place=self.place, image="places/ella/extra.jpg", uploaded_by=self.user)
+
+    def versions(self):
+        return get_model_versions(Place, Badge)
+
+    def test_written_variants_bump_the_owning_model(self):
+        before = self.versions()
+        with mock.patch.object(image_processing, "submit",
+                               lambda fn, name, on_done: on_done(_finished(8))):
+            with self.captureOnCommitCallbacks(execute=True):
+                image_processing.generate_variants_later("places/ella/extra.jpg")
+        after = self.versions()
+        self.assertNotEqual(after["places.place"], before["places.place"])
+        self.assertEqual(after["places.badge"], before["places.badge"])
+
+    def test_skipped_or_unknown_images_bump_nothing(self):
+        before = self.versions()
+        with mock.patch.object(image_processing, "submit",
+                               lambda fn, name, on_done: on_done(_finished(0))):
+            with self.captureOnCommitCallbacks(execute=True):
+                image_processing.generate_variants_later("places/ella/extra.jpg")
+        bump_variant_owners(["places/nobody/holds.jpg"])
+        self.assertEqual(self.versions(), before)
+
+
+def _finished(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+class ImportReferenceTests(MediaStorageMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.report = IngestReport()
+        for key, data in (("a", b"first"), ("b", b"second")):
+            name, sha256, size = self.storage.put(f"{key}.jpg", ContentFile(data))
+            self.report.names[key]  = name
+            self.report.blobs[name] = (sha256, size)
+        self.a, self.b = self.report.names["a"], self.report.names["b"]
+
+    def test_counts_only_rows_that_change(self):
+        update_references(self.storage, self.report, [("", self.a), ("", self.a)])
+        self.assertEqual(self.refs(self.a), 2)
+        update_references(self.storage, self.report, [(self.a, self.a)])    # re-import
+        self.assertEqual(self.refs(self.a), 2)
+
+    def test_replacing_releases_the_old_blob_on_commit(self):
+        update_references(self.storage, self.report, [("", self.a)])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            update_references(self.storage, self.report, [(self.a, self.b)])
+            self.assertEqual(self.refs(self.a), 1)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual((self.refs(self.a), self.refs(self.b)), (None, 1))
+        self.assertFalse(self.storage.exists(self.a))
+
+    def test_rolled_back_rows_count_nothing(self):
+        with transaction.atomic():
+            update_references(self.storage, self.report, [("", self.a), ("", self.b)])
+            transaction.set_rollback(True)
+        self.assertEqual((self.refs(self.a), self.refs(self.b)), (None, None))
+
+
+# ─────────────────────────────────────────────────────────
+# gc_media
+# ─────────────────────────────────────────────────────────
+
+class GcMediaTests(MediaStorageMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        user       = User.objects.create_user("curator")
+        self.kept  = blob_name("a" * 64, "jpg")
+        self.gone  = blob_name("b" * 64, "jpg")
+        self.fresh = "places/new/upload.jpg"
+        place      = Place.objects.create(name="Galle Fort", description="d", created_by=user)
+        Place.objects.filter(pk=place.pk).update(image=self.kept)
+        MediaBlob.objects.create(name=self.kept, sha256="a" * 64, size=1, ref_count=3)
+        MediaBlob.objects.create(name=self.gone, sha256="b" * 64, size=1, ref_count=1)
+
+        day_ago = time.time() - 2 * 86400
+        for name in (self.kept, variant_name(self.kept, 400, "webp"), self.gone,
+                     variant_name(self.gone, 400, "webp"), self.fresh):
+            path = os.path.join(self.media, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as fh:
+                fh.write(b"x")
+            if name != self.fresh:
+                os.utime(path, (day_ago, day_ago))
+
+    def gc(self, *args):
+        out = io.StringIO()
+        call_command("gc_media", *args, stdout=out)
+        return out.getvalue()
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.media, name))
+
+    def test_dry_run_changes_nothing(self):
+        output = self.gc("--dry-run")
+        self.assertIn(self.gone, output)
+        self.assertIn("2 orphan(s) would be removed", output)
+        self.assertTrue(self.exists(self.gone))
+        self.assertEqual(self.refs(self.kept), 3)
+        self.assertEqual(self.refs(self.gone), 1)
+
+    def test_removes_orphans_and_corrects_counts(self):
+        self.gc()
+        self.assertFalse(self.exists(self.gone))
+        self.assertFalse(self.exists(variant_name(self.gone, 400, "webp")))
+        self.assertTrue(self.exists(self.kept))
+        self.assertTrue(self.exists(variant_name(self.kept, 400, "webp")))
+        self.assertTrue(self.exists(self.fresh))         # younger than --min-age
+        self.assertEqual(self.refs(self.kept), 1)
+        self.assertIsNone(self.refs(self.gone))
+
+    def test_quarantine_moves_orphans(self):
+        quarantine = os.path.join(self.media, "quarantine")
+        self.gc("--quarantine", quarantine, "--min-age", "0")
+        self.assertFalse(self.exists(self.gone))
+        self.assertTrue(os.path.exists(os.path.join(quarantine, self.gone)))
+        self.assertTrue(os.path.exists(os.path.join(quarantine, self.fresh)))
+
+
+# ─────────────────────────────────────────────────────────
+# import_all_data --resume
+# ─────────────────────────────────────────────────────────
+
+class ImportResumeTests(TestCase):
+    ROWS = 10
+
+    def setUp(self):
+        User.objects.create_superuser("admin", "admin@example.com", "pw")
+        folder        = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        self.images   = os.path.join(folder, "images")
+        self.workbook = os.path.join(folder, "data.xlsx")
+        col    = import_all_data.COL
+        places = pd.DataFrame({
+            col["name"]:        [f"Place {i}" for i in range(self.ROWS)],
+            col["description"]: ["d"] * self.ROWS,
+            col["latitude"]:    [7.0] * self.ROWS,
+            col["longitude"]:   [80.0] * self.ROWS,
+            col["categories"]:  ["hike"] * self.ROWS,
+            col["status"]:      ["approved"] * self.ROWS,
+        })
+        with pd.ExcelWriter(self.workbook) as writer:
+            pd.DataFrame({"slug": ["hike"], "name": ["Hike"]}).to_excel(
+                writer, sheet_name=import_all_data.SHEET_CATEGORIES, index=False)
+            places.to_excel(writer, sheet_name=import_all_data.SHEET_PLACES, index=False)
+            pd.DataFrame({"name": ["Ridge"], "created_by": ["admin"]}).to_excel(
+                writer, sheet_name=import_all_data.SHEET_TRAILS, index=False)
+            # Every other place, so some stops refer to the chunk that fails below
+            pd.DataFrame({
+                "trail": ["Ridge"] * (self.ROWS // 2),
+                "place": [f"Place {i}" for i in range(0, self.ROWS, 2)],
+                "order": list(range(1, self.ROWS // 2 + 1)),
+            }).to_excel(writer, sheet_name=import_all_data.SHEET_TRAIL_PLACES, index=False)
+
+    def run_import(self, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_all_data", "--file", self.workbook, "--images", self.images,
+                     "--chunk-size", "3", *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_resume_after_a_rolled_back_chunk(self):
+        original = import_all_data.Command._sync_categories
+        calls    = []
+
+        def flaky(command, *args):
+            calls.append(1)
+            if len(calls) == 3:
+                raise DatabaseError("connection lost")
+            return original(command, *args)
+
+        with mock.patch.object(import_all_data.Command, "_sync_categories", flaky):
+            out, err = self.run_import()
+        self.assertIn("chunk rolled back", err)
+        self.assertIn("IMPORT INCOMPLETE", out)
+        self.assertEqual(Place.objects.count(), 6)       # the third chunk left nothing behind
+        self.assertEqual(
+            list(ImportCheckpoint.objects.filter(sheet=import_all_data.SHEET_PLACES)
+                 .values_list("rows_done", "total_rows")),
+            [(6, self.ROWS)],
+        )
+        # The run stopped at the failed sheet; nothing after it was checkpointed
+        self.assertFalse(TrailPlace.objects.exists())
+        self.assertFalse(ImportCheckpoint.objects.filter(
+            sheet__in=[import_all_data.SHEET_TRAILS, import_all_data.SHEET_TRAIL_PLACES],
+        ).exists())
+
+        out, _ = self.run_import("--resume")
+        self.assertIn("Resuming", out)
+        self.assertIn("ALL DATA IMPORTED", out)
+        self.assertEqual(Place.objects.count(), self.ROWS)
+        self.assertEqual(Category.objects.get(slug="hike").places.count(), self.ROWS)
+        self.assertEqual(TrailPlace.objects.filter(trail__name="Ridge").count(), self.ROWS // 2)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_rerun_without_resume_writes_nothing_new(self):
+        self.run_import()
+        updated = dict(Place.objects.values_list("name", "updated_at"))
+        self.run_import()
+        self.assertEqual(Place.objects.count(), self.ROWS)
+        self.assertEqual(dict(Place.objects.values_list("name", "updated_at")), updated)
+
+
+# ─────────────────────────────────────────────────────────
+# Delta exports and restore_export
+# ─────────────────────────────────────────────────────────
+
+class DeltaTimestampTests(TestCase):
+    """Bulk edits skip auto_now; the ones delta exports rely on set updated_at."""
+
+    def setUp(self):
+        self.user  = User.objects.create_user("moderator")
+        self.place = Place.objects.create(name="Horton Plains", description="d", created_by=self.user)
+        self.note  = Notification.objects.create(
+            user=self.user, title="t", message="m", notification_type="welcome",
+        )
+        self.past  = timezone.now() - datetime.timedelta(days=1)
+        Place.objects.update(updated_at=self.past)
+        Notification.objects.update(updated_at=self.past)
+
+    def run_action(self, model, action):
+        model_admin = admin.site._registry[model]
+        with mock.patch.object(model_admin, "message_user"):
+            getattr(model_admin, action)(mock.Mock(), model.objects.all())
+        return model.objects.values_list("updated_at", flat=True).get()
+
+    def test_place_moderation(self):
+        for action in ("approve_places", "reject_places"):
+            with self.subTest(action):
+                self.assertGreater(self.run_action(Place, action), self.past)
+                Place.objects.update(updated_at=self.past)
+
+    def test_notification_read_flags(self):
+        for action in ("mark_as_read", "mark_as_unread"):
+            with self.subTest(action):
+                self.assertGreater(self.run_action(Notification, action), self.past)
+                Notification.objects.update(updated_at=self.past)
+
+
+class RestoreExportTests(TransactionTestCase):
+    """Exports read on worker threads, so the rows must be committed."""
+
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        self.folder = folder
+        self.user   = User.objects.create_user("explorer")
+        self.hike   = Category.objects.create(name="Hike", slug="hike")
+        self.places = [
+            Place.objects.create(name=f"Place {i}", description="d", created_by=self.user)
+            for i in range(6)
+        ]
+        self.places[0].category.add(self.hike)
+        for place in self.places[:3]:
+            Comment.objects.create(user=self.user, place=place, text="hi")
+        Notification.objects.create(user=self.user, title="t", message="m", notification_type="welcome")
+
+    def export(self, name, *args):
+        path = os.path.join(self.folder, name)
+        call_command("export_all_data", "-o", path, *args, stdout=io.StringIO())
+        return path
+
+    def restore(self, *paths):
+        call_command("restore_export", *paths, stdout=io.StringIO())
+
+    def snapshot(self):
+        return {
+            model._meta.label: sorted(
+                tuple(str(getattr(row, f.attname)) for f in model._meta.concrete_fields)
+                for row in model.objects.all()
+            )
+            for model in (User, Category, Place, Place.category.through, Comment, Notification)
+        }
+
+    def test_full_export_plus_delta(self):
+        full = self.export("full.xlsx")
+        self.assertTrue(ExportWatermark.objects.filter(sheet="Place").exists())
+
+        self.places[0].description = "edited"
+        self.places[0].save()
+        self.places[1].delete()
+        Comment.objects.filter(place=self.places[2]).delete()
+        self.places[3].category.add(self.hike)
+        Place.objects.create(name="New", description="n", created_by=self.user)
+        Notification.objects.filter(user=self.user).update(is_read=True, updated_at=timezone.now())
+        self.assertTrue(Tombstone.objects.filter(model="places.place").exists())
+        delta = self.export("delta.xlsx", "--delta")
+        expected = self.snapshot()
+
+        call_command("flush", "--noinput", stdout=io.StringIO())
+        self.restore(full, delta)
+        self.assertEqual(self.snapshot(), expected)
+        self.assertFalse(Tombstone.objects.exists())       # the replay's own deletions
+
+    def test_delta_without_its_full_export_is_refused(self):
+        self.export("full.xlsx")
+        delta = self.export("delta.xlsx", "--delta")
+        with self.assertRaisesMessage(CommandError, "start from a full export"):
+            self.restore(delta)
+
+    def test_missing_delta_is_detected(self):
+        full = self.export("full.xlsx")
+        self.export("first.xlsx", "--delta")
+        with mock.patch("django.utils.timezone.now",
+                        return_value=timezone.now() + datetime.timedelta(hours=1)):
+            second = self.export("second.xlsx", "--delta")
+        with self.assertRaisesMessage(CommandError, "a delta is missing"):
+            self.restore(full, second)
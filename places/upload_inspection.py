@@ -0,0 +1,302 @@
+import hashlib
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+
+from PIL import Image
+
+CHUNK_SIZE = 64 * 1024
+HEAD_LIMIT = 256 * 1024     # header bytes kept for parsing; EXIF (APP1) is capped at 64 KB
+EXIF_LIMIT = 64 * 1024      # PNG eXIf / WebP EXIF chunks read past the head are capped alike
+
+ALLOWED_FORMATS = {'jpeg', 'png', 'webp', 'gif'}
+MAX_PIXELS      = Image.MAX_IMAGE_PIXELS     # same decompression-bomb ceiling Pillow applies
+
+# TIFF tags read from the EXIF block
+TAG_ORIENTATION       = 0x0112
+TAG_DATETIME          = 0x0132
+TAG_EXIF_IFD          = 0x8769
+TAG_GPS_IFD           = 0x8825
+TAG_DATETIME_ORIGINAL = 0x9003
+GPS_LAT_REF, GPS_LAT, GPS_LNG_REF, GPS_LNG = 1, 2, 3, 4
+
+# JPEG start-of-frame markers (C4, C8 and CC are DHT, JPG and DAC)
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+@dataclass(frozen=True, slots=True)
+class UploadInspection:
+    """
+    Everything the check-in pipeline needs from an uploaded photo, taken
+    in one read. Width and height are as displayed (EXIF rotation applied).
+    `taken_at` is naive: EXIF stores camera-local time without a zone.
+    """
+    sha256:   str
+    size:     int
+    format:   str
+    width:    int | None = None
+    height:   int | None = None
+    gps_lat:  float | None = None
+    gps_lng:  float | None = None
+    taken_at: datetime | None = None
+
+    @property
+    def exif_info(self):
+        """The dict checkin_trust.extract_exif() returns."""
+        return {'gps_lat': self.gps_lat, 'gps_lng': self.gps_lng, 'timestamp': self.taken_at}
+
+    @property
+    def is_valid_image(self):
+        return (
+            self.format in ALLOWED_FORMATS
+            and bool(self.width) and bool(self.height)
+            and self.width * self.height <= MAX_PIXELS
+        )
+
+
+def inspect_upload(upload):
+    """
+    Stream `upload` once: every chunk feeds SHA-256, and the first
+    HEAD_LIMIT bytes are kept to sniff the format and dimensions and to
+    read the EXIF GPS / DateTime tags. A PNG or WebP EXIF chunk beyond
+    the head is found by seeking over chunk headers. Leaves the file
+    pointer at 0.
+    """
+    upload.seek(0)
+    sha  = hashlib.sha256()
+    head = bytearray()
+    size = 0
+    for chunk in iter(lambda: upload.read(CHUNK_SIZE), b''):
+        sha.update(chunk)
+        size += len(chunk)
+        if len(head) < HEAD_LIMIT:
+            head += chunk[:HEAD_LIMIT - len(head)]
+
+    fmt, fields = _sniff(bytes(head), upload)
+    upload.seek(0)
+    return UploadInspection(sha256=sha.hexdigest(), size=size, format=fmt, **fields)
+
+
+def read_exif(fp):
+    """
+    The `exif_info` dict of an already-stored photo, from its first
+    HEAD_LIMIT bytes (plus a PNG/WebP EXIF chunk stored after them) —
+    what re-scoring needs, without the hash.
+    """
+    _, fields = _sniff(fp.read(HEAD_LIMIT), fp)
+    return {
+        'gps_lat':   fields.get('gps_lat'),
+        'gps_lng':   fields.get('gps_lng'),
+        'timestamp': fields.get('taken_at'),
+    }
+
+
+# ─────────────────────────────────────────────────────────
+# Format sniffing
+# ─────────────────────────────────────────────────────────
+
+def _sniff(buf, fp=None):
+    """
+    (format, fields) from the head bytes `buf`. `fp`, the seekable file
+    they were read from, lets PNG/WebP parsing reach an EXIF chunk that
+    lies past them.
+    """
+    try:
+        if buf[:3] == b'\xff\xd8\xff':
+            return 'jpeg', _jpeg(buf)
+        if buf[:8] == b'\x89PNG\r\n\x1a\n' and buf[12:16] == b'IHDR':
+            return 'png', _png(buf, fp)
+        if buf[:6] in (b'GIF87a', b'GIF89a'):
+            width, height = struct.unpack('<HH', buf[6:10])
+            return 'gif', {'width': width, 'height': height}
+        if buf[:4] == b'RIFF' and buf[8:12] == b'WEBP':
+            return 'webp', _webp(buf, fp)
+    except (struct.error, IndexError, ValueError, OSError):
+        pass
+    return '', {}
+
+
+def _reader(buf, fp):
+    """read(offset, n) from the head buffer, or from `fp` past its end."""
+    def read(offset, n):
+        if offset + n <= len(buf) or fp is None:
+            return buf[offset:offset + n]
+        fp.seek(offset)
+        return fp.read(n)
+    return read
+
+
+def _jpeg(buf):
+    fields = {}
+    exif   = {}
+    pos    = 2
+    while pos + 4 <= len(buf):
+        if buf[pos] != 0xFF:
+            break
+        marker = buf[pos + 1]
+        if marker == 0xFF:                              # fill byte
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:    # no length field
+            pos += 2
+            continue
+        length  = struct.unpack('>H', buf[pos + 2:pos + 4])[0]
+        segment = buf[pos + 4:pos + 2 + length]
+        if marker == 0xE1 and segment[:6] == b'Exif\x00\x00' and not exif:
+            exif = _parse_exif(segment[6:])
+        elif marker in SOF_MARKERS:
+            height, width = struct.unpack('>HH', segment[1:5])
+            if exif.get('orientation') in (5, 6, 7, 8):
+                width, height = height, width
+            fields.update(width=width, height=height)
+            break                                       # EXIF always precedes the frame
+        elif marker == 0xDA:                            # start of scan
+            break
+        pos += 2 + length
+
+    exif.pop('orientation', None)
+    fields.update(exif)
+    return fields
+
+
+def _png(buf, fp=None):
+    # Chunks are length (big-endian), type, data, CRC. eXIf holds a bare
+    # TIFF block and usually precedes IDAT, but may follow it.
+    width, height = struct.unpack('>II', buf[16:24])
+    read = _reader(buf, fp)
+    pos  = 8
+    while True:
+        header = read(pos, 8)
+        if len(header) < 8:
+            return {'width': width, 'height': height}
+        length, kind = struct.unpack('>I4s', header)
+        if kind == b'eXIf':
+            return _with_exif(width, height, read(pos + 8, min(length, EXIF_LIMIT)))
+        if kind == b'IEND':
+            return {'width': width, 'height': height}
+        pos += 12 + length
+
+
+def _webp(buf, fp=None):
+    chunk = buf[12:16]
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', buf[26:30])
+        return {'width': width & 0x3FFF, 'height': height & 0x3FFF}
+    if chunk == b'VP8L':
+        bits = int.from_bytes(buf[21:25], 'little')
+        return {'width': (bits & 0x3FFF) + 1, 'height': ((bits >> 14) & 0x3FFF) + 1}
+    if chunk != b'VP8X':
+        return {}
+
+    # Extended format: canvas size in VP8X; an EXIF chunk (flag 0x08)
+    # follows the image data. Chunks are fourcc, size (little-endian),
+    # data padded to an even length.
+    width  = int.from_bytes(buf[24:27], 'little') + 1
+    height = int.from_bytes(buf[27:30], 'little') + 1
+    if not buf[20] & 0x08:
+        return {'width': width, 'height': height}
+    read = _reader(buf, fp)
+    end  = 8 + int.from_bytes(buf[4:8], 'little')
+    pos  = 12
+    while pos + 8 <= end:
+        header = read(pos, 8)
+        if len(header) < 8:
+            break
+        size = int.from_bytes(header[4:8], 'little')
+        if header[:4] == b'EXIF':
+            return _with_exif(width, height, read(pos + 8, min(size, EXIF_LIMIT)))
+        pos += 8 + size + (size & 1)
+    return {'width': width, 'height': height}
+
+
+def _with_exif(width, height, block):
+    """Dimensions as displayed plus the EXIF fields of a PNG/WebP chunk."""
+    if block[:6] == b'Exif\x00\x00':      # some writers keep the JPEG prefix
+        block = block[6:]
+    exif = _parse_exif(block)
+    if exif.pop('orientation', None) in (5, 6, 7, 8):
+        width, height = height, width
+    return {'width': width, 'height': height, **exif}
+
+
+# ─────────────────────────────────────────────────────────
+# EXIF (TIFF) — only the handful of tags trust scoring uses
+# ─────────────────────────────────────────────────────────
+
+# TIFF type → bytes per value
+_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+
+def _parse_exif(tiff):
+    """{'orientation', 'gps_lat', 'gps_lng', 'taken_at'} — whichever are present."""
+    try:
+        order = {b'II': '<', b'MM': '>'}[tiff[:2]]
+        if struct.unpack(order + 'H', tiff[2:4])[0] != 42:
+            return {}
+        ifd0_offset = struct.unpack(order + 'I', tiff[4:8])[0]
+    except (KeyError, struct.error):
+        return {}
+
+    ifd0 = _read_ifd(tiff, ifd0_offset, order,
+                     {TAG_ORIENTATION, TAG_DATETIME, TAG_EXIF_IFD, TAG_GPS_IFD})
+    sub  = _read_ifd(tiff, ifd0.get(TAG_EXIF_IFD, (None,))[0], order, {TAG_DATETIME_ORIGINAL})
+    gps  = _read_ifd(tiff, ifd0.get(TAG_GPS_IFD, (None,))[0], order,
+                     {GPS_LAT_REF, GPS_LAT, GPS_LNG_REF, GPS_LNG})
+
+    out = {}
+    if TAG_ORIENTATION in ifd0:
+        out['orientation'] = ifd0[TAG_ORIENTATION][0]
+    try:
+        if GPS_LAT in gps and GPS_LNG in gps:
+            out['gps_lat'] = _dms_to_decimal(gps[GPS_LAT], gps.get(GPS_LAT_REF, 'N'))
+            out['gps_lng'] = _dms_to_decimal(gps[GPS_LNG], gps.get(GPS_LNG_REF, 'E'))
+    except TypeError:                   # a tag stored with the wrong TIFF type
+        out.pop('gps_lat', None)
+    stamp = sub.get(TAG_DATETIME_ORIGINAL) or ifd0.get(TAG_DATETIME)
+    if stamp:
+        try:
+            out['taken_at'] = datetime.strptime(stamp, '%Y:%m:%d %H:%M:%S')
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def _read_ifd(tiff, offset, order, wanted):
+    """
+    {tag: value} for the `wanted` tags of the IFD at `offset`. A truncated
+    or corrupt directory yields whatever was read before the damage.
+    """
+    found = {}
+    if not isinstance(offset, int):
+        return found
+    try:
+        count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            tag, typ, n = struct.unpack(order + 'HHI', tiff[entry:entry + 8])
+            if tag not in wanted or typ not in _TYPE_SIZES:
+                continue
+            length = _TYPE_SIZES[typ] * n
+            start  = entry + 8 if length <= 4 else struct.unpack(order + 'I', tiff[entry + 8:entry + 12])[0]
+            raw    = tiff[start:start + length]
+            if len(raw) == length:
+                found[tag] = _decode(raw, typ, n, order)
+    except struct.error:
+        pass
+    return found
+
+
+def _decode(raw, typ, n, order):
+    if typ in (2, 7):
+        return raw.split(b'\x00', 1)[0].decode('ascii', 'replace').strip()
+    if typ in (5, 10):
+        parts = struct.unpack(order + ('I' if typ == 5 else 'i') * (2 * n), raw)
+        return tuple(num / den if den else 0.0 for num, den in zip(parts[::2], parts[1::2]))
+    code = {1: 'B', 3: 'H', 4: 'I', 9: 'i'}[typ]
+    return struct.unpack(order + code * n, raw)
+
+
+def _dms_to_decimal(dms, ref):
+    degrees, minutes, seconds = (tuple(dms) + (0.0, 0.0, 0.0))[:3]
+    decimal = degrees + minutes / 60.0 + seconds / 3600.0
+    return -decimal if ref in ('S', 'W') else decimal
@@ -6,7 +6,8 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.http import HttpResponse, JsonResponse, Http404
 from django.views.decorators.http import require_POST
-from django.db.models import Q, Count, Avg, Sum
+from django.db.models import Q, Count, Avg, Sum, F, OuterRef, Subquery, Value, IntegerField
+from django.db.models.functions import Coalesce
 from django.core.paginator import Paginator
 from django.utils import timezone
 from datetime import timedelta
@@ -22,9 +23,6 @@ from geopy.distance import geodesic
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET
 from django.db import transaction, IntegrityError
-from PIL import Image
-from io import BytesIO
-from django.core.files.base import ContentFile
 
 from .models import (
     TrailFavorite,
@@ -65,7 +63,21 @@ from .forms import (
     TourPackageForm,
 )
 
-from .checkin_trust import compute_photo_hash, compute_trust_score
+from .checkin_trust import compute_trust_score
+from .image_processing import process_avatar_later
+from .perceptual_hash import dhash, find_near_duplicates
+from .rate_limit import can_notify
+from .pagination import paginate
+from .caching import cached_section
+from .conditional import conditional_on
+from .visit_counter import record_visit, live_visit_count
+from .analytics import dashboard_stats
+from .search import search, add_headlines
+from .recommendations import also_visited, recommend_for_user
+from .facets import (
+    FACETS, FACET_TITLES,
+    apply_facet_filters, facet_counts, filter_bbox, parse_bbox, parse_facet_filters,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +94,9 @@ BASE_CHECKIN_POINTS    = 10
 PHOTO_BONUS_POINTS     = 5
 VERIFIED_BONUS_POINTS  = 5
 
+# (minimum points, level), highest first; below the last entry is level 1
+LEVEL_THRESHOLDS = [(1000, 5), (500, 4), (200, 3), (50, 2)]
+
 
 # ─────────────────────────────────────────────────────────
 # Shared helpers
@@ -91,13 +106,9 @@ def is_staff_or_superuser(user):
     return user.is_staff or user.is_superuser
 
 
-def _can_notify(user, max_per_hour=NOTIFICATION_HOURLY_CAP):
-    cutoff = timezone.now() - timedelta(hours=1)
-    recent = Notification.objects.filter(
-        user=user,
-        created_at__gte=cutoff,
-    ).count()
-    return recent < max_per_hour
+def _can_notify(user, notification_type, max_per_hour=NOTIFICATION_HOURLY_CAP):
+    """Token-bucket check in the cache — no query against Notification."""
+    return can_notify(user, notification_type, capacity=max_per_hour)
 
 
 def _recalculate_level(profile):
@@ -106,16 +117,9 @@ def _recalculate_level(profile):
     Only writes to DB when the level actually changes.
     Call after every profile.points mutation.
     """
-    if profile.points >= 1000:
-        new_level = 5
-    elif profile.points >= 500:
-        new_level = 4
-    elif profile.points >= 200:
-        new_level = 3
-    elif profile.points >= 50:
-        new_level = 2
-    else:
-        new_level = 1
+    new_level = next(
+        (level for threshold, level in LEVEL_THRESHOLDS if profile.points >= threshold), 1
+    )
 
     if profile.level != new_level:
         profile.level = new_level
@@ -169,64 +173,105 @@ def get_trail_progress(user, trail):
 # Core views
 # ─────────────────────────────────────────────────────────
 
-def home(request):
-    all_places = Place.objects.filter(status='approved').order_by('-created_at')
+def _home_trending():
+    return list(
+        Place.objects.filter(status='approved').annotate(
+            vote_count    = F('approval_votes') + F('rejection_votes'),
+            check_in_count= F('checkin_count'),
+        ).order_by('-visit_count', '-checkin_count', '-vote_count')[:6]
+    )
 
-    paginator   = Paginator(all_places, 12)
-    page_number = request.GET.get('page')
-    places      = paginator.get_page(page_number)
 
-    trending_places = Place.objects.filter(status='approved').annotate(
-        vote_count    = Count('vote',     distinct=True),
-        check_in_count= Count('checkin',  distinct=True),
-        comment_count = Count('comments', distinct=True),
-    ).order_by('-visit_count', '-check_in_count', '-vote_count')[:6]
+def _home_featured_trails():
+    return list(
+        Trail.objects.filter(
+            is_public=True
+        ).prefetch_related('places').order_by('-created_at')[:3]
+    )
 
-    featured_trails = Trail.objects.filter(
-        is_public=True
-    ).prefetch_related('places').order_by('-created_at')[:3]
 
+def _home_featured_tours():
     try:
-        featured_tours = TourPackage.objects.filter(
-            is_active=True
-        ).prefetch_related('offerings', 'trails').order_by('-created_at')[:3]
+        return list(
+            TourPackage.objects.filter(
+                is_active=True
+            ).prefetch_related('offerings', 'trails').order_by('-created_at')[:3]
+        )
     except Exception:
-        featured_tours = []
+        return []
+
 
-    featured_badges = Badge.objects.filter(is_active=True).order_by('points_required')[:6]
+def _home_featured_badges():
+    return list(Badge.objects.filter(is_active=True).order_by('points_required')[:6])
 
+
+def _home_challenges():
     now_ts = timezone.now()
-    challenges_qs = Challenge.objects.filter(
-        is_active=True,
-        start_date__lte=now_ts,
-        end_date__gte=now_ts,
-    ).order_by('end_date')[:4]
+    return list(
+        Challenge.objects.filter(
+            is_active=True,
+            start_date__lte=now_ts,
+            end_date__gte=now_ts,
+        ).order_by('end_date')[:4]
+    )
 
-    if request.user.is_authenticated:
-        try:
-            from .challenge_engine import get_challenge_progress
-            active_challenges = []
-            for ch in challenges_qs:
-                ch.user_progress = get_challenge_progress(request.user, ch)
-                active_challenges.append(ch)
-        except (ImportError, Exception):
-            active_challenges = list(challenges_qs)
-    else:
-        active_challenges = list(challenges_qs)
 
-    top_profiles  = UserProfile.objects.select_related('user').order_by('-points')[:8]
-    top_explorers = [
+def _home_top_explorers():
+    top_profiles = UserProfile.objects.select_related('user').order_by('-points')[:8]
+    return [
         {'rank': rank, 'username': p.user.username, 'profile': p}
         for rank, p in enumerate(top_profiles, start=1)
     ]
 
-    total_places = Place.objects.filter(status='approved').count()
-    total_trails = Trail.objects.filter(is_public=True).count()
-    total_users  = UserProfile.objects.count()
+
+def _home_totals():
     try:
         total_tours = TourPackage.objects.filter(is_active=True).count()
     except Exception:
         total_tours = 0
+    return {
+        'total_places': Place.objects.filter(status='approved').count(),
+        'total_trails': Trail.objects.filter(is_public=True).count(),
+        'total_users':  UserProfile.objects.count(),
+        'total_tours':  total_tours,
+    }
+
+
+def home(request):
+    all_places = Place.objects.filter(status='approved').order_by('-created_at')
+
+    paginator   = Paginator(all_places, 12)
+    page_number = request.GET.get('page')
+    places      = paginator.get_page(page_number)
+
+    # ── Shared sections (cached, invalidated by model signals) ──
+    trending_places = cached_section(
+        'home:trending', (Place, Vote, CheckIn, Comment), _home_trending
+    )
+    featured_trails = cached_section(
+        'home:trails', (Trail, TrailPlace, Place), _home_featured_trails
+    )
+    featured_tours  = cached_section(
+        'home:tours', (TourPackage, TourOffering, Trail), _home_featured_tours
+    )
+    featured_badges = cached_section('home:badges', (Badge,), _home_featured_badges)
+    challenges      = cached_section(
+        'home:challenges', (Challenge,), _home_challenges, timeout=60
+    )
+    top_explorers   = cached_section(
+        'home:explorers', (UserProfile, User), _home_top_explorers
+    )
+    totals          = cached_section(
+        'home:totals', (Place, Trail, UserProfile, TourPackage), _home_totals
+    )
+
+    # ── Per-user overlay (never cached) ──
+    active_challenges = list(challenges)
+    next_places       = []
+    if request.user.is_authenticated:
+        for ch in active_challenges:
+            ch.user_progress = get_challenge_progress(request.user, ch)
+        next_places = recommend_for_user(request.user, limit=6)
 
     return render(request, 'home.html', {
         'places':            places,
@@ -236,10 +281,8 @@ def home(request):
         'featured_badges':   featured_badges,
         'active_challenges': active_challenges,
         'top_explorers':     top_explorers,
-        'total_places':      total_places,
-        'total_trails':      total_trails,
-        'total_tours':       total_tours,
-        'total_users':       total_users,
+        'next_places':       next_places,
+        **totals,
     })
 
 
@@ -251,19 +294,19 @@ def place_detail(request, slug):
             messages.error(request, "This place is not available.")
             return redirect("places:home")
 
+    # Precomputed by places/related.py — one indexed lookup on (place, rank)
     related_places = (
-        Place.objects.filter(status="approved", category__in=place.category.all())
-        .exclude(pk=place.pk)
-        .distinct()[:4]
+        Place.objects.filter(neighbour_of__place=place, status="approved")
+        .order_by("neighbour_of__rank")
+        .prefetch_related("category")[:4]
     )
 
     place_videos = place.videos.all().order_by("-created_at")
     place_images = place.images.all()
 
     if not request.user.is_staff:
-        from django.db.models import F
-        Place.objects.filter(pk=place.pk).update(visit_count=F('visit_count') + 1)
-        place.refresh_from_db(fields=['visit_count'])
+        record_visit(place.pk)
+    place.visit_count = live_visit_count(place)
 
     comments = place.comments.filter(parent=None).prefetch_related("replies")
 
@@ -341,6 +384,7 @@ def place_detail(request, slug):
         "is_favorited":  is_favorited,
         "user_checkin":  user_checkin,
         "related_places":related_places,
+        "also_visited":  also_visited(place, limit=4),
         "place_videos":  place_videos,
         "image_form":    PlaceImageForm(),
     }
@@ -436,16 +480,9 @@ def profile(request, username):
         .order_by("-created_at")
     )
 
-    if profile.points >= 1000:
-        new_level = 5
-    elif profile.points >= 500:
-        new_level = 4
-    elif profile.points >= 200:
-        new_level = 3
-    elif profile.points >= 50:
-        new_level = 2
-    else:
-        new_level = 1
+    new_level = next(
+        (level for threshold, level in LEVEL_THRESHOLDS if profile.points >= threshold), 1
+    )
 
     if profile.level != new_level:
         profile.level = new_level
@@ -488,9 +525,7 @@ def favorites(request):
 def notifications(request):
     notification_list = Notification.objects.filter(user=request.user).order_by("-created_at")
 
-    paginator           = Paginator(notification_list, 10)
-    page_number         = request.GET.get("page")
-    notifications_page  = paginator.get_page(page_number)
+    notifications_page  = paginate(request, notification_list, 10)
     unread_count        = notification_list.filter(is_read=False).count()
 
     return render(request, "notifications.html", {
@@ -516,7 +551,7 @@ def mark_notification_read(request, pk):
 def mark_all_notifications_read(request):
     updated_count = Notification.objects.filter(
         user=request.user, is_read=False
-    ).update(is_read=True)
+    ).update(is_read=True, updated_at=timezone.now())
     return JsonResponse({"success": True, "updated_count": updated_count})
 
 
@@ -606,9 +641,7 @@ def check_ins(request):
         .order_by("-earned_at")[:5]
     ]
 
-    paginator   = Paginator(checkins_qs, 20)
-    page_number = request.GET.get("page")
-    checkins    = paginator.get_page(page_number)
+    checkins = paginate(request, checkins_qs, 20)
 
     return render(request, "check_ins.html", {
         "checkins":           checkins,
@@ -653,7 +686,7 @@ def award_trail_completions(user, checked_place):
             _recalculate_level(profile)
             evaluate_badges_for_user(user)
 
-            if _can_notify(user):
+            if _can_notify(user, "challenge"):
                 Notification.objects.create(
                     user=user,
                     title="Trail Completed! 🎉",
@@ -704,10 +737,18 @@ def check_in(request, slug):
                     return redirect("places:place_detail", slug=place.slug)
 
             # ── Duplicate image hash check ────────────────────────
-            photo_file = request.FILES.get("photo_proof")
-            if photo_file:
-                photo_hash = compute_photo_hash(photo_file)
-                if CheckIn.objects.filter(photo_hash=photo_hash).exists():
+            # (hash, EXIF and dimensions come from the form's single read)
+            inspection = form.inspection
+            if inspection:
+                duplicate = CheckIn.objects.filter(photo_hash=inspection.sha256).exists()
+                if not duplicate:
+                    # Re-saved, resized or lightly cropped copies of a used photo
+                    checkin.photo_dhash = dhash(form.cleaned_data["photo_proof"])
+                    duplicate = (
+                        checkin.photo_dhash is not None
+                        and bool(find_near_duplicates(checkin.photo_dhash, user=request.user))
+                    )
+                if duplicate:
                     messages.error(
                         request,
                         "This photo has already been used for a check-in. "
@@ -721,10 +762,10 @@ def check_in(request, slug):
                         "verified_bonus_points": VERIFIED_BONUS_POINTS,
                         "max_points":            BASE_CHECKIN_POINTS + PHOTO_BONUS_POINTS + VERIFIED_BONUS_POINTS,
                     })
-                checkin.photo_hash = photo_hash
+                checkin.photo_hash = inspection.sha256
 
             # ── Trust score + points ──────────────────────────────
-            trust                  = compute_trust_score(checkin, place)
+            trust                  = compute_trust_score(checkin, place, inspection=inspection)
             checkin.points_awarded = trust["points"]
             checkin.trust_score    = trust["score"]
 
@@ -787,7 +828,12 @@ def trails(request):
         Trail.objects.filter(is_public=True)
         .annotate(
             place_count   = Count("places",          distinct=True),
-            checkin_count = Count("places__checkin", distinct=True),
+            checkin_count = Coalesce(Subquery(
+                TrailPlace.objects.filter(trail=OuterRef("pk"))
+                .order_by().values("trail")
+                .annotate(n=Sum("place__checkin_count")).values("n"),
+                output_field=IntegerField(),
+            ), Value(0)),
         )
         .select_related("created_by")
         .prefetch_related("places", "category")
@@ -796,11 +842,7 @@ def trails(request):
 
     search_query = request.GET.get("search", "")
     if search_query:
-        trails_qs = trails_qs.filter(
-            Q(name__icontains=search_query)
-            | Q(description__icontains=search_query)
-            | Q(category__name__icontains=search_query)
-        ).distinct()
+        trails_qs = search(trails_qs, search_query)
 
     difficulty = request.GET.get("difficulty", "")
     if difficulty and difficulty in ("easy", "moderate", "challenging"):
@@ -810,15 +852,17 @@ def trails(request):
     if category:
         trails_qs = trails_qs.filter(category__slug=category).distinct()
 
-    sort_by = request.GET.get("sort", "created_at")
-    if sort_by == "name":
+    sort_by = request.GET.get("sort", "relevance" if search_query else "created_at")
+    if sort_by == "relevance" and search_query:
+        pass  # search() already ordered by rank
+    elif sort_by == "name":
         trails_qs = trails_qs.order_by("name")
     elif sort_by == "places":
         trails_qs = trails_qs.order_by("-place_count")
     elif sort_by == "popularity":
         trails_qs = trails_qs.order_by("-checkin_count")
     elif sort_by == "difficulty":
-        from django.db.models import Case, When, IntegerField, Value
+        from django.db.models import Case, When
         trails_qs = trails_qs.annotate(
             diff_order=Case(
                 When(difficulty="easy",        then=Value(1)),
@@ -1284,7 +1328,7 @@ def _grant_challenge_reward(user, challenge):
     _recalculate_level(profile)
     evaluate_badges_for_user(user)
 
-    if _can_notify(user):
+    if _can_notify(user, "challenge"):
         Notification.objects.create(
             user=user,
             title="Challenge Completed! 🏆",
@@ -1469,7 +1513,7 @@ def evaluate_badges_for_user(user):
             continue
         if get_badge_progress(user, badge)["is_done"]:
             _, created = UserBadge.objects.get_or_create(user=user, badge=badge)
-            if created and _can_notify(user):
+            if created and _can_notify(user, "badge_earned"):
                 Notification.objects.create(
                     user=user,
                     title="Badge Earned! 🏅",
@@ -1556,9 +1600,8 @@ def vote_place(request, slug):
         vote.vote_type = vote_type
         vote.save()
 
-    place.approval_votes  = Vote.objects.filter(place=place, vote_type="up").count()
-    place.rejection_votes = Vote.objects.filter(place=place, vote_type="down").count()
-    place.save(update_fields=["approval_votes", "rejection_votes"])
+    # Counters are maintained by the Vote signals in places/signals.py
+    place.refresh_from_db(fields=["approval_votes", "rejection_votes"])
 
     return JsonResponse({
         "success":         True,
@@ -1622,21 +1665,30 @@ def update_place_status(request, slug):
 @login_required
 @user_passes_test(is_staff_or_superuser)
 def analytics(request):
-    month_ago = timezone.now() - timedelta(days=30)
+    # Headline numbers and trends come from the rollup tables
+    # (`manage.py rollup_stats`); only the two recent-activity lists hit
+    # the live tables, and those are LIMIT 10 index scans.
+    stats  = dashboard_stats()
+    latest = stats["latest"]
+    month  = stats["trends"][30]
     return render(request, "analytics.html", {
-        "total_places":           Place.objects.count(),
-        "approved_places":        Place.objects.filter(status="approved").count(),
-        "pending_places":         Place.objects.filter(status="pending").count(),
-        "total_users":            User.objects.count(),
-        "total_checkins":         CheckIn.objects.count(),
-        "recent_places":          Place.objects.order_by("-created_at")[:10],
+        "stats_as_of":            latest.updated_at if latest else None,
+        "total_places":           latest.total_places if latest else 0,
+        "approved_places":        latest.approved_places if latest else 0,
+        "pending_places":         latest.pending_places if latest else 0,
+        "total_users":            latest.total_users if latest else 0,
+        "total_checkins":         latest.total_checkins if latest else 0,
+        "recent_places":          Place.objects.select_related("created_by").prefetch_related("category").order_by("-created_at")[:10],
         "recent_checkins":        CheckIn.objects.select_related("user", "place").order_by("-created_at")[:10],
-        "category_labels":        list(Category.objects.values_list("name", flat=True)),
-        "category_data":          [cat.places.count() for cat in Category.objects.all()],
-        "new_users_this_month":   User.objects.filter(date_joined__gte=month_ago).count(),
-        "new_places_this_month":  Place.objects.filter(created_at__gte=month_ago).count(),
-        "new_checkins_this_month":CheckIn.objects.filter(created_at__gte=month_ago).count(),
-        "active_users":           CheckIn.objects.filter(created_at__gte=month_ago).values("user").distinct().count(),
+        "category_labels":        stats["category_labels"],
+        "category_data":          stats["category_data"],
+        "new_users_this_month":   month["new_users"],
+        "new_places_this_month":  month["new_places"],
+        "new_checkins_this_month":month["new_checkins"],
+        "active_users":           month["active_users"],
+        "user_engagement_rate":   round(100 * month["active_users"] / latest.total_users) if latest and latest.total_users else 0,
+        "trend_series":           stats["series"],
+        "trend_windows":          stats["trends"],
     })
 
 
@@ -1727,12 +1779,7 @@ def get_nearby_places(request):
                 })
 
         if request.user.is_authenticated and places:
-            recent = Notification.objects.filter(
-                user=request.user,
-                notification_type="nearby_place",
-                created_at__gte=timezone.now() - timedelta(hours=1),
-            ).exists()
-            if not recent:
+            if _can_notify(request.user, "nearby_place", max_per_hour=1):
                 Notification.objects.create(
                     user=request.user,
                     title="Nearby Places Alert",
@@ -1747,28 +1794,33 @@ def get_nearby_places(request):
 
 @login_required
 def search_results(request):
-    query      = request.GET.get("q", "")
-    category   = request.GET.get("category", "")
-    difficulty = request.GET.get("difficulty", "")
-    sort       = request.GET.get("sort", "name")
+    query    = request.GET.get("q", "")
+    sort     = request.GET.get("sort", "relevance" if query else "name")
+    bbox     = parse_bbox(request.GET.get("bbox"))
+    selected = parse_facet_filters(request.GET)
 
-    places = Place.objects.filter(status="approved")
+    places = filter_bbox(Place.objects.filter(status="approved"), bbox)
     if query:
-        places = places.filter(name__icontains=query)
-    if category:
-        places = places.filter(category__slug=category)
-    if difficulty:
-        places = places.filter(difficulty=difficulty)
+        places = search(places, query)   # ranked best match first
+    facets = facet_counts(places, selected)
+    places = apply_facet_filters(places, selected)
     if sort in ["name", "created_at", "visit_count"]:
         places = places.order_by(sort)
+    elif sort == "rating":
+        places = places.order_by("-rating_avg", "-rating_count")
 
-    paginator   = Paginator(places, 6)
+    paginator   = Paginator(places.prefetch_related("category"), 6)
     places_page = paginator.get_page(request.GET.get("page"))
+    if query:
+        places_page.object_list = add_headlines(list(places_page.object_list), query)
 
     return render(request, "search_results.html", {
         "places":     places_page,
         "query":      query,
-        "categories": Category.objects.all(),
+        "facets":     [
+            (FACETS[name][0], FACET_TITLES[name], buckets) for name, buckets in facets.items()
+        ],
+        "bbox":       request.GET.get("bbox", "") if bbox else "",
     })
 
 
@@ -1839,32 +1891,6 @@ def get_profile_completion(user, profile):
     return score, missing, completed
 
 
-def _resize_avatar(image_file, max_size=(400, 400), quality=85):
-    try:
-        img = Image.open(image_file)
-        if img.mode in ('RGBA', 'P', 'LA'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-
-        w, h = img.size
-        side = min(w, h)
-        left = (w - side) // 2
-        top  = (h - side) // 2
-        img  = img.crop((left, top, left + side, top + side))
-        img.thumbnail(max_size, Image.LANCZOS)
-
-        buf = BytesIO()
-        img.save(buf, format='JPEG', quality=quality, optimize=True)
-        return ContentFile(buf.getvalue())
-    except Exception:
-        return None
-
-
 ALLOWED_AVATAR_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/webp'}
 MAX_AVATAR_SIZE_MB   = 5
 
@@ -1876,6 +1902,7 @@ def edit_profile(request):
     score_before, _, _ = get_profile_completion(user, profile)
 
     if request.method == 'POST':
+        old_avatar   = profile.avatar.name or ''
         form         = UserProfileForm(request.POST, request.FILES, instance=profile)
         avatar_error = None
         avatar_file  = request.FILES.get('avatar')
@@ -1900,18 +1927,6 @@ def edit_profile(request):
         if form.is_valid():
             profile_obj = form.save(commit=False)
 
-            if avatar_file:
-                resized = _resize_avatar(avatar_file)
-                if resized:
-                    if profile_obj.avatar:
-                        try:
-                            old_path = profile_obj.avatar.path
-                            if os.path.isfile(old_path):
-                                os.remove(old_path)
-                        except (ValueError, OSError):
-                            pass
-                    profile_obj.avatar.save(f'avatar_{user.pk}.jpg', resized, save=True)
-
             user.first_name = request.POST.get('first_name', '').strip()
             user.last_name  = request.POST.get('last_name',  '').strip()
 
@@ -1931,6 +1946,10 @@ def edit_profile(request):
             profile_obj.save()
             form.save_m2m()
 
+            # Stored as uploaded; cropped and resized off-request, then swapped in
+            if avatar_file:
+                process_avatar_later(profile_obj, replaced=old_avatar)
+
             score_after, missing, completed = get_profile_completion(user, profile_obj)
             _award_profile_completion_points(user, profile_obj, score_before, score_after)
             evaluate_badges_for_user(user)
@@ -2084,8 +2103,7 @@ def place_checkins(request, slug):
     verified_checkins = checkins_list.filter(location_verified=True).count()
     photo_checkins    = checkins_list.exclude(photo_proof__isnull=True).exclude(photo_proof="").count()
 
-    paginator   = Paginator(checkins_list, 10)
-    checkins    = paginator.get_page(request.GET.get("page"))
+    checkins = paginate(request, checkins_list, 10)
 
     return render(request, "place_checkins.html", {
         "place":             place,
@@ -2142,6 +2160,7 @@ def about(request):
 # Tour views
 # ─────────────────────────────────────────────────────────
 
+@conditional_on(TourPackage, TourOffering, Trail, per_user=True)
 def tour_list(request):
     tours = TourPackage.objects.filter(is_active=True).prefetch_related('trails', 'offerings')
     return render(request, 'tours.html', {'tours': tours})
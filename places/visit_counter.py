@@ -0,0 +1,129 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Place
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL    = 10     # seconds — max age of an unflushed increment
+FLUSH_MAX_PENDING = 500    # total buffered visits that force an early flush
+
+
+# ─────────────────────────────────────────────────────────
+# Buffered visit counter
+# ─────────────────────────────────────────────────────────
+#
+# Page views used to do UPDATE … visit_count + 1 per request, which turns a
+# popular place's row into a lock hotspot. Instead each process counts views
+# in memory and writes them back as one UPDATE … CASE per flush. Counts on
+# screen are approximate: the database value plus this process's pending
+# views. A flush doesn't bump Place's cache version — that would expire
+# every Place-dependent section, ETag and search index every few seconds
+# — so cached pages show visit counts as of their last real change.
+
+_lock       = threading.Lock()
+_flush_lock = threading.Lock()    # one flush at a time (timer vs. atexit)
+_pending    = Counter()
+_timer      = None
+
+
+def _arm_timer(delay=FLUSH_INTERVAL):
+    # Caller holds _lock. An armed timer is only replaced to fire sooner.
+    global _timer
+    if _timer is not None:
+        if _timer.interval <= delay:
+            return
+        _timer.cancel()
+    _timer = threading.Timer(delay, _flush_from_timer)
+    _timer.daemon = True
+    _timer.start()
+
+
+def record_visit(place_id):
+    """
+    Count one view of `place_id`; flushed within FLUSH_INTERVAL seconds.
+    A full buffer wakes the timer thread instead of flushing here, so a
+    slow or failing write never holds up (or breaks) the page view.
+    """
+    with _lock:
+        _pending[place_id] += 1
+        total = sum(_pending.values())
+        _arm_timer(0 if total >= FLUSH_MAX_PENDING else FLUSH_INTERVAL)
+
+
+def pending_visits(place_id):
+    with _lock:
+        return _pending.get(place_id, 0)
+
+
+def live_visit_count(place):
+    """Approximate live count: stored value + increments not yet flushed."""
+    return place.visit_count + pending_visits(place.pk)
+
+
+def flush_visits():
+    """
+    Write all buffered increments in a single UPDATE. Returns rows updated.
+
+    The buffer is swapped out under the lock so views keep counting while
+    the query runs; if the write fails the increments are merged back and
+    retried on the next flush rather than dropped. Flushes run one at a
+    time, so the exit flush waits for a timer flush still writing.
+    """
+    with _flush_lock:
+        return _flush()
+
+
+def _flush():
+    global _timer
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+    if not batch:
+        return 0
+
+    try:
+        updated = Place.objects.filter(pk__in=batch).update(
+            visit_count=Case(
+                *[When(pk=pk, then=F('visit_count') + Value(n)) for pk, n in batch.items()],
+                default=F('visit_count'),
+                output_field=IntegerField(),
+            )
+        )
+    except Exception:
+        logger.exception("Visit counter flush failed; keeping %d place(s) buffered", len(batch))
+        with _lock:
+            _pending.update(batch)
+            _arm_timer()
+        raise
+    return updated
+
+
+def _flush_quietly():
+    try:
+        flush_visits()
+    except Exception:
+        pass  # already logged and re-buffered
+
+
+def _flush_from_timer():
+    global _timer
+    with _lock:
+        _timer = None
+    try:
+        _flush_quietly()
+    finally:
+        connection.close()  # timer threads own their DB connection
+
+
+# Graceful shutdown (gunicorn/uwsgi worker exit, runserver reload, Ctrl-C)
+# runs atexit hooks — push out whatever is still buffered.
+atexit.register(_flush_quietly)
@@ -0,0 +1,122 @@
+"""
+State for incremental exports (manage.py export_all_data --delta).
+
+Every export records, per sheet, the time it read rows up to. A delta
+export then writes only the rows of the DELTA_FIELDS models whose
+timestamp moved past the sheet's watermark, plus tombstones for the
+rows deleted since. Every other sheet is small, or has no timestamp to
+go by, and is written in full. `manage.py restore_export` replays a
+full export and the deltas after it.
+"""
+
+import datetime
+import operator
+from dataclasses import dataclass
+from functools import reduce
+
+from django.apps import apps
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ExportWatermark, Tombstone
+
+TOMBSTONE_SHEET = '_deleted'
+
+# A delta re-reads this much before the watermark, so a row (or
+# tombstone) whose transaction committed after the last export had read
+# past its timestamp is not lost. Restores upsert, so the overlap is
+# harmless.
+DELTA_OVERLAP = datetime.timedelta(minutes=5)
+
+# Sheet → the timestamp its delta filters on. updated_at (auto_now)
+# catches every save(); created_at only new rows, so it's used where rows
+# are not edited afterwards. Check-ins (verification, trust re-scores,
+# photo hashes) and notifications (read flags) are edited, so they carry
+# updated_at too. update() and bulk_update() skip auto_now, so every one
+# of them on these models sets updated_at itself (admin moderation,
+# importers, media migration) — except the place counters: ratings,
+# check-ins and votes are recomputed by restore_export, visit counts are
+# caught up by the next full export.
+DELTA_FIELDS = {
+    'Place':                   'updated_at',
+    'TourPackage':             'updated_at',
+    'PlaceImage':              'created_at',
+    'PlaceVideo':              'created_at',
+    'CheckIn':                 'updated_at',
+    'TrailCompletion':         'completed_at',
+    'Comment':                 'created_at',
+    'Favorite':                'created_at',
+    'TrailFavorite':           'created_at',
+    'UserBadge':               'earned_at',
+    'UserChallengeCompletion': 'completed_at',
+    'Notification':            'updated_at',
+}
+
+
+def tracked_models():
+    """The models whose deletions are recorded as tombstones."""
+    return [apps.get_model('places', name) for name in DELTA_FIELDS]
+
+
+@dataclass
+class SheetPlan:
+    sheet:    str
+    model:    type
+    mode:     str           # 'full', 'changes' or 'tombstones'
+    since:    object        # datetime the changes start after, or None
+    queryset: object
+
+
+def plan_export(sheets, delta=False, since=None):
+    """
+    What each of [(sheet, model)] exports: (plans, until).
+
+    A full export reads every row. With `delta`, a DELTA_FIELDS sheet
+    reads what changed since its watermark (or since `since`, which
+    overrides the watermarks), and a TOMBSTONE_SHEET plan is added for
+    the deletions; sheets with no watermark yet are read in full.
+    """
+    until = timezone.now()
+    marks = ExportWatermark.objects.in_bulk(field_name='sheet')
+    plans = []
+    gone  = []
+    for sheet, model in sheets:
+        field = DELTA_FIELDS.get(sheet) if delta else None
+        mark  = marks.get(sheet)
+        start = since or (mark.exported_until - DELTA_OVERLAP if mark else None)
+        if not (field and start):
+            plans.append(SheetPlan(sheet, model, 'full', None, model.objects.order_by('pk')))
+            continue
+
+        changed = model.objects.filter(**{f'{field}__gt': start, f'{field}__lte': until})
+        plans.append(SheetPlan(sheet, model, 'changes', start, changed.order_by('pk')))
+        gone.append(Q(model=model._meta.label_lower, deleted_at__gt=start, deleted_at__lte=until))
+
+    if gone:
+        plans.append(SheetPlan(
+            TOMBSTONE_SHEET, Tombstone, 'tombstones', None,
+            Tombstone.objects.filter(reduce(operator.or_, gone)).order_by('pk'),
+        ))
+    return plans, until
+
+
+def advance_watermarks(plans, summary, until):
+    """
+    After an export: move every sheet that was written completely up to
+    `until`, and drop the tombstones that are now behind its watermark.
+    A sheet that failed keeps its watermark, so the next delta covers it.
+    """
+    written = {sheet for sheet, result in summary if isinstance(result, int)}
+    if any(plan.mode == 'tombstones' for plan in plans) and TOMBSTONE_SHEET not in written:
+        # Without the deletions the changed sheets are incomplete
+        written -= {plan.sheet for plan in plans if plan.mode == 'changes'}
+
+    tracked = {model._meta.label_lower for model in tracked_models()}
+    for plan in plans:
+        if plan.mode == 'tombstones' or plan.sheet not in written:
+            continue
+        ExportWatermark.objects.update_or_create(sheet=plan.sheet, defaults={'exported_until': until})
+        label = plan.model._meta.label_lower
+        if label in tracked:
+            # The next delta of this sheet starts at until - DELTA_OVERLAP
+            Tombstone.objects.filter(model=label, deleted_at__lte=until - DELTA_OVERLAP).delete()